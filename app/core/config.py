@@ -8,6 +8,15 @@ class Settings(BaseSettings):
     debug: bool = False
 
     database_url: str
+    # asyncio driver URL; derived from database_url when unset (sqlite -> aiosqlite, postgresql -> asyncpg)
+    async_database_url: str | None = None
+
+    # SQLite "production" profile (opt-in): WAL and tuned pragmas on connect, and every background
+    # write serialized through one dedicated writer connection; "default" leaves SQLite as is
+    sqlite_profile: str = "default"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
 
     # Polling and timeout configurations
     http_timeout_seconds: float = 5.0
@@ -16,11 +25,107 @@ class Settings(BaseSettings):
     poll_timeout_seconds: int = 20
     slow_threshold_ms: int = 2000
 
+    # Body reads: prefix drained when no keyword is set, and cap for keyword scans
+    body_drain_bytes: int = 16 * 1024
+    max_body_bytes: int = 1024 * 1024
+
+    # Per-origin request cap, keep-alive pool ceiling and host circuit breaker
+    per_host_concurrency: int = 4
+    max_keepalive_connections: int = 1024
+    host_breaker_threshold: int = 3
+    host_breaker_cooldown_seconds: float = 30.0
+
+    # Record DNS/connect/TLS/TTFB/download timings for every check
+    phase_timing_enabled: bool = True
+
+    # Checker DNS cache; "dnspython" honours record TTLs, "system" uses getaddrinfo
+    dns_cache_enabled: bool = True
+    dns_resolver: str = "system"
+    dns_cache_ttl_seconds: float = 60.0  # used when the resolver reports no TTL
+    dns_negative_ttl_seconds: float = 30.0
+    dns_cache_size: int = 10_000
+
+    # Checker worker processes; 0 runs every check on the app's own event loop
+    checker_workers: int = 0
+
+    # Retries may add at most this fraction of extra requests, plus a small reserve
+    retry_budget_ratio: float = 0.1
+    retry_budget_reserve: int = 10
+
+    # Status websocket: publish changes at most once per interval, fully reload every so often,
+    # and resync (rather than buffer) clients that fall this many messages behind
+    ws_publish_interval_seconds: float = 1.0
+    ws_full_refresh_seconds: float = 60.0
+    ws_client_queue_size: int = 32
+
+    # Result writer: bounded queue drained in micro-batches by size or time
+    result_queue_size: int = 10_000
+    result_batch_size: int = 500
+    result_flush_interval_seconds: float = 1.0
+
+    # Write-behind journal for batches the database rejects, replayed in order once it is back
+    # (opt-in: empty path disables it; use a data directory); appends are fsynced at most once per interval
+    result_journal_path: str = ""
+    result_journal_fsync_interval_seconds: float = 1.0
+    result_journal_max_bytes: int = 512 * 1024 * 1024
+    result_journal_replay_batch_size: int = 5000
+    result_journal_retry_seconds: float = 5.0
+
+    # Status history storage: "full" writes every check, "changes" writes interval rows only
+    # on a state change, a latency move beyond the band (fraction of the mean), or a heartbeat
+    history_mode: str = "full"
+    history_latency_band: float = 0.5
+    history_heartbeat_seconds: int = 3600
+
+    # Retention cleanup, run as its own periodic job
+    retention_days: int = 30
+    cleanup_interval_seconds: int = 3600
+    cleanup_chunk_size: int = 5000
+    cleanup_chunk_pause_seconds: float = 0.05
+
+    # Cold archive (opt-in): rows older than archive_after_days move out of service_status into
+    # compressed per-day columnar segments under archive_dir, kept archive_retention_days. The history
+    # and export endpoints read service_status only, so archived days are served by /status/archive
+    archive_dir: str = ""
+    archive_after_days: int = 7
+    archive_retention_days: int = 365
+    archive_row_group_size: int = 16_384
+
+    # History API: largest page size, and rows fetched per round trip when streaming an export
+    history_page_max: int = 1000
+    export_chunk_size: int = 1000
+
+    # Bulk service import: records validated and inserted per write transaction, and per request
+    bulk_import_batch_size: int = 1000
+    bulk_import_max_items: int = 50_000
+
+    # On-demand batch checks: most services one POST /services/check may select
+    check_batch_max_services: int = 1000
+
+    # Uptime/latency rollups: minute, hour and day buckets kept this long, compacted with cleanup
+    rollup_minute_retention_hours: int = 48
+    rollup_hour_retention_days: int = 90
+    rollup_day_retention_days: int = 730
+    rollup_sketch_accuracy: float = 0.01
+
     # JWT authentication settings
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24
 
+    # bcrypt cost (hashes at another cost are rehashed on the next login), worker processes for
+    # hashing (0 uses threads) run at this niceness, and how many hash/verify calls may be in
+    # flight before 429s
+    bcrypt_rounds: int = 12
+    password_workers: int = 2
+    password_worker_nice: int = 10
+    password_queue_size: int = 16
+
+    # Validated token -> user snapshot cache for authenticated routes (size 0 disables it);
+    # entries also expire with their token and are dropped when the user row changes
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: float = 60.0
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
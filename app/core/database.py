@@ -1,13 +1,68 @@
 # app/core/database.py
 """Database engine and session utilities."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import Column, Table, create_engine, event, inspect, literal
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.core.config import settings
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+# asyncio drivers for the sync dialects we support
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver."""
+    scheme, separator, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{dialect}'; set ASYNC_DATABASE_URL")
+    return ASYNC_DRIVERS[dialect] + separator + rest
+
+
+def sqlite_pragmas() -> list[str]:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+    ]
+
+
+def tune_sqlite(engine: Engine, immediate: bool = False) -> None:
+    """Apply the production pragmas on every new connection.
+
+    With ``immediate`` the driver's implicit BEGIN is replaced by BEGIN
+    IMMEDIATE, so a writer takes the write lock up front (waiting up to
+    ``busy_timeout``) instead of failing when it upgrades a read transaction.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        if immediate:
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+    if immediate:
+
+        @event.listens_for(engine, "begin")
+        def _on_begin(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+is_sqlite = settings.database_url.startswith("sqlite")
+tuned_sqlite = is_sqlite and settings.sqlite_profile == "production"
 
 # SQLite-specific connection argument for multi-threading
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+connect_args = {"check_same_thread": False} if is_sqlite else {}
 
 # SQLAlchemy engine with connection pooling and pre-ping
 engine = create_engine(
@@ -20,4 +75,73 @@ engine = create_engine(
 # Session factory for DB interactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
+# Async engine for code running on the event loop (scheduler, websocket, async routes)
+async_engine = create_async_engine(
+    settings.async_database_url or async_url(settings.database_url),
+    pool_pre_ping=True,
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if tuned_sqlite:
+    tune_sqlite(engine)
+    tune_sqlite(async_engine.sync_engine)
+
+    # One long-lived writer connection: background writers queue for it instead of
+    # contending for SQLite's lock, while reads keep using the pooled engines above
+    async_write_engine = create_async_engine(
+        settings.async_database_url or async_url(settings.database_url),
+        pool_size=1,
+        max_overflow=0,
+        pool_recycle=-1,
+    )
+    tune_sqlite(async_write_engine.sync_engine, immediate=True)
+    AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_write_engine = async_engine
+    AsyncWriteSessionLocal = AsyncSessionLocal
+
 Base = declarative_base()  # Base class for ORM models
+
+
+def _add_column_ddl(table: Table, column: Column, dialect: Dialect) -> str:
+    quote = dialect.identifier_preparer.quote
+    ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect=dialect)}"
+    if column.default is not None and column.default.is_scalar:
+        default = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        ddl += f" DEFAULT {default}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    return ddl
+
+
+def upgrade_schema(bind: Engine) -> list[str]:
+    """Add the columns and indexes that ``create_all`` cannot add to existing tables.
+
+    ``create_all`` only creates missing tables, so a database created by an
+    earlier release lacks columns added since (e.g. ``interval_seconds`` or
+    the phase timings). Each missing column is added with its scalar default,
+    which also fills existing rows. Safe to run on every start; returns what
+    it changed.
+    """
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    changes: list[str] = []
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    ddl = _add_column_ddl(table, column, bind.dialect)
+                    logger.info("[Schema] %s", ddl)
+                    conn.exec_driver_sql(ddl)
+                    changes.append(ddl)
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    logger.info("[Schema] Creating index %s", index.name)
+                    index.create(conn)
+                    changes.append(f"CREATE INDEX {index.name}")
+    return changes
@@ -1,15 +1,18 @@
 # app/core/dependencies.py
 """Core dependencies for authentication, authorization, and database access."""
 
-from typing import Generator
+import time
+from typing import AsyncGenerator, Generator
 
 from fastapi import Depends, HTTPException, status
 from jose import ExpiredSignatureError, JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import SessionLocal
-from app.core.security import oauth2_scheme
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.security import oauth2_scheme, password_pool
+from app.core.user_cache import CurrentUser, user_cache
 from app.models.user import User
 
 
@@ -22,8 +25,22 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Extracts and validates the current user from the JWT token."""
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Provides an async database session for each request on the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> CurrentUser:
+    """Extracts and validates the current user from the JWT token.
+
+    Tokens seen recently are answered from ``user_cache`` without decoding or querying.
+    """
+    cached = user_cache.get(token)
+    if cached is not None:
+        return cached
+    generation = user_cache.generation
+
     # Define a generic credentials error to reuse
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,12 +64,23 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     user = db.query(User).filter(User.email == user_email).first()
     if user is None:
         raise credentials_exception
-    return user
+    current_user = CurrentUser.from_user(user)
+    lifetime = payload["exp"] - time.time() if "exp" in payload else user_cache.ttl
+    user_cache.put(token, current_user, lifetime, generation)
+    return current_user
+
+
+async def require_password_capacity() -> None:
+    """Rejects with 429 when the password pool is saturated, before the form is even parsed.
+
+    Async on purpose: a sync dependency would cost a threadpool hop per rejected request.
+    """
+    password_pool.check_capacity()
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Ensures the current user has admin privileges."""
-    if not getattr(current_user, "is_admin", False):
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required",
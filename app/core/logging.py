@@ -7,3 +7,6 @@ logging.basicConfig(
     level=logging.INFO,  # Log level set to INFO
     format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
 )
+
+# httpx logs every request at INFO; at checker volumes that is mostly noise
+logging.getLogger("httpx").setLevel(logging.WARNING)
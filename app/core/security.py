@@ -1,16 +1,22 @@
 # app/core/security.py
 
+import asyncio
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional
 
+from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from passlib.context import CryptContext
 
 from .config import settings
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context using bcrypt; hashes at another cost are flagged for rehashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 # OAuth2 scheme for token extraction from requests
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -26,6 +32,75 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)  # Checks if password matches
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash was made with another scheme or cost than configured."""
+    return pwd_context.needs_update(hashed_password)
+
+
+class PasswordPool:
+    """Runs bcrypt in worker processes, off the event loop and the route threadpool.
+
+    At most ``max_pending`` hashes and verifications are queued or running;
+    past that, ``hash()`` and ``verify()`` fail at once with 429, so a login
+    storm is shed instead of queueing behind itself. ``workers=0`` uses the
+    default thread executor instead of processes (still bounded).
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._pending = 0
+        self.stats: Counter[str] = Counter()
+
+    def start(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                # Lower priority: when cores are short, serving requests wins over hashing
+                initializer=os.nice,
+                initargs=(settings.password_worker_nice,),
+            )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def check_capacity(self) -> None:
+        """Raise 429 now if the pool is full, before the caller does any other work."""
+        if self._pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many password checks in progress, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        self.check_capacity()
+        self.start()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self._pending -= 1
+            self.stats["completed"] += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": self._pending, "workers": self.workers}
+
+
+password_pool = PasswordPool(workers=settings.password_workers, max_pending=settings.password_queue_size)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Creates a JWT access token with optional expiration."""
     to_encode = data.copy()  # Clone the input data
@@ -0,0 +1,147 @@
+# app/core/user_cache.py
+"""Validated bearer token -> user snapshot cache, so authenticated requests skip the user query."""
+
+from __future__ import annotations
+
+import threading
+import time
+import typing
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """The fields authenticated routes use, detached from any session."""
+
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> CurrentUser:
+        return cls(user.id, user.username, user.email, bool(user.is_active), bool(user.is_admin))
+
+
+class UserCache:
+    """Bounded LRU of token -> (expires_at, CurrentUser).
+
+    An entry lives at most ``ttl`` seconds and never past the token's own
+    ``exp``, so a hit skips both the JWT decode and the user query. Entries
+    are dropped when an update or delete of their user row commits (session
+    events below). ``put`` takes the ``generation`` read before the query and
+    ignores the entry if an invalidation happened since, so a lookup that
+    raced an update cannot cache the old row. Sync routes call this from
+    the threadpool, hence the lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: typing.Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, CurrentUser]] = OrderedDict()
+        self._tokens_by_email: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.stats: Counter[str] = Counter()
+
+    def get(self, token: str) -> CurrentUser | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry[0] <= self._clock():
+                self._remove(token)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(token)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, token: str, user: CurrentUser, lifetime: float, generation: int) -> None:
+        """Cache ``user`` for ``token`` for ``lifetime`` seconds, capped at ``ttl``."""
+        lifetime = min(lifetime, self.ttl)
+        if self.maxsize <= 0 or lifetime <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._remove(token)
+            while len(self._entries) >= self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+            self._entries[token] = (self._clock() + lifetime, user)
+            self._tokens_by_email.setdefault(user.email, set()).add(token)
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self.generation += 1
+            for token in self._tokens_by_email.pop(email, ()):
+                self._entries.pop(token, None)
+                self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tokens_by_email.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_email.get(entry[1].email)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_email[entry[1].email]
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds)
+
+
+# Emails whose cache entries go once the session's transaction commits
+_CHANGED_EMAILS = "user_cache_changed_emails"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_changed_user(mapper, connection, target: User) -> None:
+    # Tokens carry the email as "sub"; a changed email invalidates the old one too
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    session = object_session(target)
+    if session is None:
+        for email in emails:
+            user_cache.invalidate(email)
+        return
+    session.info.setdefault(_CHANGED_EMAILS, set()).update(emails)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    # Only now is the new row what a concurrent miss reads, so a miss racing the
+    # update either sees it or has its put() refused by the bumped generation
+    for email in session.info.pop(_CHANGED_EMAILS, ()):
+        user_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    session.info.pop(_CHANGED_EMAILS, None)
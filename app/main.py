@@ -6,32 +6,68 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.core.database import Base, engine
+from app.core.database import Base, SessionLocal, engine, upgrade_schema
+from app.core.security import password_pool
+from app.repositories.service import backfill_current_statuses
 from app.routers import auth, dashboard, health, service, ws_dashboard
 from app.services import checker
+from app.services.broadcast import status_hub
+from app.services.cleanup import run_retention_job
 from app.services.scheduler import poll_services
+from app.services.workers import start_checker_pool, stop_checker_pool
+from app.services.writer import result_writer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    # columns added since an existing database was created
+    upgrade_schema(engine)
+    with SessionLocal() as db:
+        backfill_current_statuses(db)
+
+    # optional checker worker processes (CHECKER_WORKERS > 0)
+    await start_checker_pool()
+
+    # bcrypt runs in its own processes, never on the loop or the route threadpool
+    password_pool.start()
+
+    # start the result writer before the scheduler that feeds it
+    writer_task = asyncio.create_task(result_writer.run())
 
     # start background polling and keep a reference to cancel later
     scheduler_task = asyncio.create_task(poll_services())  # store reference
     app.state.scheduler_task = scheduler_task  # save in app.state
 
+    # retention cleanup runs on its own cadence
+    cleanup_task = asyncio.create_task(run_retention_job())
+
+    # one publisher feeds every status websocket
+    broadcast_task = asyncio.create_task(status_hub.run())
+
     try:
         yield
     finally:
-        # cancel scheduler first so it stops cleanly
-        scheduler_task.cancel()
+        # cancel scheduler and cleanup first so they stop cleanly
+        for task in (scheduler_task, cleanup_task, broadcast_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        # then stop the writer, which flushes any queued results
+        writer_task.cancel()
         try:
-            await scheduler_task
+            await writer_task
         except asyncio.CancelledError:
             pass
 
+        await stop_checker_pool()
+        password_pool.close()
+
         # close the shared HTTP client
-        await checker.client.aclose()  # <<< existing, but now after cancel
+        await checker.close_clients()
 
 
 app = FastAPI(title="Service Uptime API", lifespan=lifespan)
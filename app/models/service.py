@@ -7,12 +7,16 @@ import enum
 from datetime import datetime
 
 from sqlalchemy import (
+    JSON,
+    BigInteger,
     Boolean,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     UniqueConstraint,
 )
@@ -48,6 +52,9 @@ class Service(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     keyword: Mapped[str | None] = mapped_column(String, nullable=True)
+    interval_seconds: Mapped[int] = mapped_column(Integer, default=60, nullable=False)
+    timeout: Mapped[float | None] = mapped_column(Float, nullable=True)  # falls back to http_timeout_seconds
+    retries: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     owner: Mapped["User"] = relationship(back_populates="services")  # noqa: F821
@@ -56,25 +63,89 @@ class Service(Base):
         cascade="all, delete",
         passive_deletes=True,
     )
+    current_status: Mapped["ServiceCurrentStatus | None"] = relationship(
+        back_populates="service",
+        cascade="all, delete",
+        passive_deletes=True,
+    )
 
 
 class ServiceStatus(Base):
     """Result of a single status check for a service."""
 
     __tablename__ = "service_status"
+    # History reads filter by service and walk checked_at; also serves service_id lookups
+    __table_args__ = (Index("ix_service_status_service_id_checked_at", "service_id", "checked_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     service_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("services.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     status: Mapped[ServiceState] = mapped_column(Enum(ServiceState), nullable=False)
     response_time: Mapped[float | None] = mapped_column(Float, nullable=True)
-    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # In change-only history mode a row covers samples from checked_at (first seen) to last_seen
+    last_seen: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    sample_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
+    # Phase timings of the measured attempt in ms; NULL when skipped (e.g. reused connection)
+    dns_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    connect_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    tls_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ttfb_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    download_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     service: Mapped[Service] = relationship(
         back_populates="statuses",
         passive_deletes=True,
     )
+
+
+class ServiceCurrentStatus(Base):
+    """Latest check result per service, kept in step with service_status by the result writer."""
+
+    __tablename__ = "service_current_status"
+
+    service_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("services.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    status: Mapped[ServiceState] = mapped_column(Enum(ServiceState), nullable=False)
+    response_time: Mapped[float | None] = mapped_column(Float, nullable=True)
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    service: Mapped[Service] = relationship(
+        back_populates="current_status",
+        passive_deletes=True,
+    )
+
+
+class ServiceRollup(Base):
+    """Aggregated check results for one service over one time bucket.
+
+    ``resolution`` is the bucket width in seconds (minute, hour or day) and
+    ``bucket_start`` its start as a Unix timestamp. Buckets merge by adding
+    counts and sums, taking min/max and merging the latency sketches.
+    """
+
+    __tablename__ = "service_rollups"
+    # Compaction drops whole resolutions past their retention
+    __table_args__ = (Index("ix_service_rollups_resolution_bucket_start", "resolution", "bucket_start"),)
+
+    service_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("services.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    resolution: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket_start: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    status_counts: Mapped[dict[str, int]] = mapped_column(JSON, nullable=False)
+    latency_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    latency_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    latency_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    latency_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+    latency_sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
@@ -0,0 +1,65 @@
+# app/repositories/rollup.py
+
+from sqlalchemy import delete, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.service import ServiceRollup
+from app.repositories.service import UPSERT_INSERTS
+
+ROLLUP_KEY = (ServiceRollup.service_id, ServiceRollup.resolution, ServiceRollup.bucket_start)
+ROLLUP_VALUES = ("status_counts", "latency_count", "latency_sum", "latency_min", "latency_max", "latency_sketch")
+
+# Keys per IN (...) lookup, well under SQLite's bound-parameter limit
+KEY_CHUNK = 300
+
+
+async def get_rollups_by_key_async(keys: list[tuple[int, int, int]], db: AsyncSession) -> list[ServiceRollup]:
+    rollups = []
+    for offset in range(0, len(keys), KEY_CHUNK):
+        result = await db.scalars(
+            select(ServiceRollup).where(tuple_(*ROLLUP_KEY).in_(keys[offset : offset + KEY_CHUNK]))
+        )
+        rollups.extend(result.all())
+    return rollups
+
+
+async def get_rollups_in_ranges_async(
+    service_id: int, ranges: list[tuple[int, int, int]], db: AsyncSession
+) -> list[ServiceRollup]:
+    """Buckets of ``service_id`` matching any (resolution, start, end) range; end is exclusive."""
+    if not ranges:
+        return []
+    result = await db.scalars(
+        select(ServiceRollup).where(
+            ServiceRollup.service_id == service_id,
+            or_(
+                *(
+                    (ServiceRollup.resolution == resolution)
+                    & (ServiceRollup.bucket_start >= start)
+                    & (ServiceRollup.bucket_start < end)
+                    for resolution, start, end in ranges
+                )
+            ),
+        )
+    )
+    return list(result.all())
+
+
+async def upsert_rollups_async(rows: list[dict], db: AsyncSession) -> None:
+    """Write fully merged bucket rows, replacing any stored values."""
+    if not rows:
+        return
+    stmt = UPSERT_INSERTS[db.bind.dialect.name](ServiceRollup.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[column.key for column in ROLLUP_KEY],
+        set_={column: stmt.excluded[column] for column in ROLLUP_VALUES},
+    )
+    await db.execute(stmt, rows)
+
+
+async def delete_rollups_before_async(resolution: int, before: int, db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(ServiceRollup).where(ServiceRollup.resolution == resolution, ServiceRollup.bucket_start < before),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
@@ -1,10 +1,20 @@
 # app/repositories/service.py
 
+import asyncio
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import ColumnElement, bindparam, func, insert, select, tuple_
+from sqlalchemy import delete as sql_delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.service import Service, ServiceStatus
+from app.models.service import Service, ServiceCurrentStatus, ServiceStatus
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE / DO NOTHING
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+CURRENT_STATUS_COLUMNS = ("service_id", "status", "response_time", "checked_at")
 
 
 def get_service_by_url_and_user(url: str, user_id: int, db: Session) -> Service | None:
@@ -19,14 +29,29 @@ def get_service_by_id(service_id: str, db: Session) -> Optional[Service]:
     return db.query(Service).filter(Service.id == service_id).first()
 
 
-def get_status_history(service_id: int, db: Session):
-    return (
-        db.query(ServiceStatus)
-        .filter(ServiceStatus.service_id == service_id)
-        .order_by(ServiceStatus.checked_at.desc())
-        .limit(10)
-        .all()
-    )
+def _history_filter(service_id: int, start: datetime | None, end: datetime | None) -> list[ColumnElement[bool]]:
+    conditions = [ServiceStatus.service_id == service_id]
+    if start is not None:
+        conditions.append(ServiceStatus.checked_at >= start)
+    if end is not None:
+        conditions.append(ServiceStatus.checked_at < end)
+    return conditions
+
+
+def get_status_history(
+    service_id: int,
+    db: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    before: tuple[datetime, int] | None = None,
+    limit: int = 10,
+) -> list[ServiceStatus]:
+    """Newest-first page of history; ``before`` is the (checked_at, id) keyset of the previous page's last row."""
+    stmt = select(ServiceStatus).where(*_history_filter(service_id, start, end))
+    if before is not None:
+        stmt = stmt.where(tuple_(ServiceStatus.checked_at, ServiceStatus.id) < tuple_(*before))
+    stmt = stmt.order_by(ServiceStatus.checked_at.desc(), ServiceStatus.id.desc()).limit(limit)
+    return list(db.scalars(stmt).all())
 
 
 def save_service(service: Service, db: Session) -> Service:
@@ -51,3 +76,186 @@ def update(service: Service, db: Session) -> Service:
 def delete(service: Service, db: Session) -> None:
     db.delete(service)
     db.commit()
+
+
+# Async variants for callers running on the event loop
+
+
+async def get_service_by_id_async(service_id: int, db: AsyncSession) -> Optional[Service]:
+    return await db.get(Service, service_id)
+
+
+async def get_active_services_async(db: AsyncSession) -> list[Service]:
+    result = await db.scalars(select(Service).where(Service.is_active.is_(True)))
+    return list(result.all())
+
+
+async def find_user_services_async(
+    user_id: int,
+    db: AsyncSession,
+    ids: list[int] | None = None,
+    name_like: str | None = None,
+    active_only: bool = False,
+    limit: int | None = None,
+) -> list[Service]:
+    """The user's services, optionally narrowed to ``ids``, a LIKE pattern on the name, or active ones."""
+    stmt = select(Service).where(Service.user_id == user_id)
+    if ids is not None:
+        stmt = stmt.where(Service.id.in_(ids))
+    if name_like is not None:
+        stmt = stmt.where(Service.name.like(name_like, escape="\\"))
+    if active_only:
+        stmt = stmt.where(Service.is_active.is_(True))
+    result = await db.scalars(stmt.order_by(Service.id).limit(limit))
+    return list(result.all())
+
+
+async def stream_status_history_async(
+    service_id: int, start: datetime | None, end: datetime | None, chunk_size: int, db: AsyncSession
+):
+    """Oldest-first history rows as a server-side cursor, ``chunk_size`` rows at a time.
+
+    Yields lists of Core rows (the ServiceStatus columns); nothing beyond the
+    current chunk is held in memory.
+    """
+    table = ServiceStatus.__table__
+    result = await db.stream(
+        select(table)
+        .where(*_history_filter(service_id, start, end))
+        .order_by(table.c.checked_at, table.c.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for rows in result.partitions():
+        yield rows
+
+
+async def get_existing_service_urls_async(user_id: int, urls: list[str], db: AsyncSession) -> set[str]:
+    """Which of ``urls`` the user already monitors, in one lookup on the (url, user_id) unique index."""
+    result = await db.scalars(select(Service.url).where(Service.user_id == user_id, Service.url.in_(urls)))
+    return set(result.all())
+
+
+async def insert_services_async(rows: list[dict], db: AsyncSession) -> dict[str, int]:
+    """Bulk-insert services in one executemany, skipping (url, user_id) pairs that exist.
+
+    Returns url -> id for the rows actually inserted.
+    """
+    if not rows:
+        return {}
+    stmt = UPSERT_INSERTS[db.bind.dialect.name](Service.__table__).on_conflict_do_nothing(
+        index_elements=["url", "user_id"]
+    )
+    result = await db.execute(stmt.returning(Service.id, Service.url), rows)
+    return {url: service_id for service_id, url in result.all()}
+
+
+async def get_latest_status_async(service_id: int, db: AsyncSession) -> ServiceStatus | None:
+    """The service's newest history row; in change-only mode, the interval still open."""
+    return await db.scalar(
+        select(ServiceStatus)
+        .where(ServiceStatus.service_id == service_id)
+        .order_by(ServiceStatus.checked_at.desc(), ServiceStatus.id.desc())
+        .limit(1)
+    )
+
+
+async def insert_statuses_async(rows: list[dict], db: AsyncSession) -> None:
+    """Bulk-insert status rows with a Core executemany; no ORM objects are built."""
+    if rows:
+        await db.execute(insert(ServiceStatus.__table__), rows)
+
+
+async def extend_statuses_async(updates: list[dict], db: AsyncSession) -> None:
+    """Move stored interval rows forward (last_seen, sample_count, mean response_time)."""
+    if not updates:
+        return
+    table = ServiceStatus.__table__
+    await db.execute(
+        table.update()
+        .where(table.c.service_id == bindparam("b_service_id"), table.c.checked_at == bindparam("b_first_seen"))
+        .values(
+            last_seen=bindparam("last_seen"),
+            sample_count=bindparam("sample_count"),
+            response_time=bindparam("response_time"),
+        ),
+        updates,
+    )
+
+
+async def delete_statuses_in_chunks_async(
+    where: ColumnElement[bool], chunk_size: int, pause_seconds: float, db: AsyncSession
+) -> int:
+    """Delete matching statuses over primary-key ranges of at most ``chunk_size`` rows.
+
+    Each chunk is its own short transaction, with a pause between chunks so
+    other writers are never locked out for long. Returns the rows removed.
+    """
+    deleted = 0
+    while True:
+        # Upper primary key of the next chunk; None means the rest fits in one chunk
+        upper_id = await db.scalar(
+            select(ServiceStatus.id).where(where).order_by(ServiceStatus.id).offset(chunk_size - 1).limit(1)
+        )
+        stmt = sql_delete(ServiceStatus).where(where)
+        if upper_id is not None:
+            stmt = stmt.where(ServiceStatus.id <= upper_id)
+        result = await db.execute(stmt, execution_options={"synchronize_session": False})
+        await db.commit()
+        deleted += result.rowcount
+        if upper_id is None:
+            return deleted
+        await asyncio.sleep(pause_seconds)
+
+
+def _latest_per_service(rows: list[dict]) -> list[dict]:
+    # One row per service so a single multi-row upsert never touches a key twice
+    latest: dict[int, dict] = {}
+    for row in rows:
+        current = latest.get(row["service_id"])
+        if current is None or row["checked_at"] >= current["checked_at"]:
+            latest[row["service_id"]] = row
+    return [{column: row[column] for column in CURRENT_STATUS_COLUMNS} for row in latest.values()]
+
+
+async def upsert_current_statuses_async(rows: list[dict], db: AsyncSession) -> None:
+    """Point each service's current status at the newest of ``rows`` (older results never win)."""
+    if not rows:
+        return
+    stmt = UPSERT_INSERTS[db.bind.dialect.name](ServiceCurrentStatus.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["service_id"],
+        set_={column: stmt.excluded[column] for column in CURRENT_STATUS_COLUMNS[1:]},
+        where=ServiceCurrentStatus.__table__.c.checked_at <= stmt.excluded.checked_at,
+    )
+    await db.execute(stmt, _latest_per_service(rows))
+
+
+def backfill_current_statuses(db: Session) -> int:
+    """Seed service_current_status from history when it is empty (one-off, O(history))."""
+    if db.scalar(select(func.count()).select_from(ServiceCurrentStatus)):
+        return 0
+    latest_time = (
+        select(ServiceStatus.service_id, func.max(ServiceStatus.checked_at).label("checked_at"))
+        .group_by(ServiceStatus.service_id)
+        .subquery()
+    )
+    # Highest id among rows sharing the latest timestamp, so ties yield one row per service
+    latest_ids = (
+        select(func.max(ServiceStatus.id))
+        .join(
+            latest_time,
+            (ServiceStatus.service_id == latest_time.c.service_id)
+            & (ServiceStatus.checked_at == latest_time.c.checked_at),
+        )
+        .group_by(ServiceStatus.service_id)
+    )
+    result = db.execute(
+        insert(ServiceCurrentStatus).from_select(
+            list(CURRENT_STATUS_COLUMNS),
+            select(*(getattr(ServiceStatus, column) for column in CURRENT_STATUS_COLUMNS)).where(
+                ServiceStatus.id.in_(latest_ids)
+            ),
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -2,6 +2,8 @@
 
 from typing import Optional
 
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.user import User
@@ -20,3 +22,26 @@ def save_user(user: User, db: Session) -> User:
     db.commit()
     db.refresh(user)
     return user
+
+
+# Async variants for callers running on the event loop
+
+
+async def get_user_by_username_async(username: str, db: AsyncSession) -> Optional[User]:
+    return await db.scalar(select(User).where(User.username == username))
+
+
+async def get_user_by_email_async(email: str, db: AsyncSession) -> Optional[User]:
+    return await db.scalar(select(User).where(User.email == email))
+
+
+async def save_user_async(user: User, db: AsyncSession) -> User:
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def update_password_hash_async(user_id: int, hashed_password: str, db: AsyncSession) -> None:
+    await db.execute(update(User).where(User.id == user_id).values(hashed_password=hashed_password))
+    await db.commit()
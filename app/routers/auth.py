@@ -2,9 +2,9 @@
 
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_db
+from app.core.dependencies import get_async_db, require_password_capacity
 from app.schemas.auth import RegisterIn, RegisterOut, TokenOut
 from app.services.auth import login_for_access_token
 from app.services.user import register_user
@@ -12,16 +12,18 @@ from app.services.user import register_user
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/register", response_model=RegisterOut)
-def register(data: RegisterIn, db: Session = Depends(get_db)) -> RegisterOut:
-    registered_user = register_user(data, db)
+@router.post("/register", response_model=RegisterOut, dependencies=[Depends(require_password_capacity)])
+async def register(data: RegisterIn, db: AsyncSession = Depends(get_async_db)) -> RegisterOut:
+    """Hashes the password on the password worker pool; 429 when it is saturated."""
+    registered_user = await register_user(data, db)
     return RegisterOut.model_validate(registered_user)
 
 
-@router.post("/login", response_model=TokenOut)
-def login(
+@router.post("/login", response_model=TokenOut, dependencies=[Depends(require_password_capacity)])
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> TokenOut:
-    access_token = login_for_access_token(form_data.username, form_data.password, db)
+    """Verifies the password on the password worker pool; 429 when it is saturated."""
+    access_token = await login_for_access_token(form_data.username, form_data.password, db)
     return TokenOut(access_token=access_token, token_type="bearer")
@@ -1,23 +1,31 @@
 # app/routers/dashboard.py
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_db
+from app.core.database import AsyncSessionLocal
 from app.services.dashboard import (
-    get_services_with_latest_status as latest_service_statuses,
+    get_services_with_latest_status_async as latest_service_statuses,
 )
+from app.services.status_cache import CachedBody, if_none_match, status_cache
 
 router = APIRouter(prefix="/status", tags=["Public"])
 templates = Jinja2Templates(directory="app/templates")
 
 
-@router.get("/api")
-def dashboard_api(db: Session = Depends(get_db)):
-    """Return latest status for each service as JSON."""
-    services = latest_service_statuses(db)
-    return [
+def _cached_response(request: Request, entry: CachedBody, media_type: str) -> Response:
+    # no-cache: clients and proxies may store the body but must revalidate it with the ETag
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if if_none_match(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type=media_type, headers=headers)
+
+
+async def _api_body() -> bytes:
+    async with AsyncSessionLocal() as db:
+        services = await latest_service_statuses(db)
+    payload = [
         {
             "id": s.id,
             "name": s.name,
@@ -28,11 +36,12 @@ def dashboard_api(db: Session = Depends(get_db)):
         }
         for s, st in services
     ]
+    return JSONResponse(jsonable_encoder(payload)).body
 
 
-@router.get("/dashboard", response_class=HTMLResponse)
-def show_dashboard(request: Request, db: Session = Depends(get_db)):
-    services = latest_service_statuses(db)
+async def _dashboard_body() -> bytes:
+    async with AsyncSessionLocal() as db:
+        services = await latest_service_statuses(db)
     rows = [
         {
             "id": s.id,
@@ -44,10 +53,21 @@ def show_dashboard(request: Request, db: Session = Depends(get_db)):
         }
         for s, st in services
     ]
-    return templates.TemplateResponse(
-        "dashboard.html",
-        {"request": request, "services": rows},
-    )
+    # The page does not depend on the request, so it is rendered once per generation
+    return templates.get_template("dashboard.html").render(services=rows).encode()
+
+
+@router.get("/api")
+async def dashboard_api(request: Request):
+    """Return latest status for each service as JSON."""
+    entry = await status_cache.get("api", _api_body)
+    return _cached_response(request, entry, "application/json")
+
+
+@router.get("/dashboard", response_class=HTMLResponse)
+async def show_dashboard(request: Request):
+    entry = await status_cache.get("dashboard", _dashboard_body)
+    return _cached_response(request, entry, "text/html; charset=utf-8")
 
 
 def color_map(status: str) -> str:
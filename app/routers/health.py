@@ -4,7 +4,13 @@ import time
 from fastapi import APIRouter
 
 from app.core.config import settings
-from app.services import scheduler
+from app.core.security import password_pool
+from app.core.user_cache import user_cache
+from app.services import checker, scheduler, workers
+from app.services.broadcast import status_hub
+from app.services.dns import dns_cache
+from app.services.status_cache import status_cache
+from app.services.writer import result_writer
 
 router = APIRouter()
 
@@ -27,3 +33,19 @@ async def health_check() -> dict:
         "last_scheduler_run": last_run,
         "seconds_since_last_run": round(seconds_since_last, 2),
     }
+
+
+@router.get("/metrics", summary="Checker and Pipeline Counters")
+async def metrics() -> dict:
+    """Returns in-process counters for the checker pipeline."""
+    return {
+        "checker": checker.checker_stats(workers.worker_counters()),
+        "dns": dns_cache.snapshot(),
+        "workers": workers.pool_stats(),
+        "writer": {"queued": result_writer.pending},
+        "journal": result_writer.journal_stats(),
+        "broadcast": status_hub.snapshot_stats(),
+        "status_cache": status_cache.snapshot(),
+        "user_cache": user_cache.snapshot(),
+        "passwords": password_pool.snapshot(),
+    }
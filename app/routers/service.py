@@ -1,24 +1,40 @@
 # app/routers/service.py
 
 import logging
+from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.core.config import settings
+from app.core.dependencies import get_async_db, get_current_user, get_db
+from app.core.user_cache import CurrentUser
 from app.schemas.service import (
+    ServiceArchiveOut,
+    ServiceBulkOut,
+    ServiceCheckIn,
     ServiceIn,
     ServiceOut,
     ServiceStatusOut,
     ServiceUpdate,
+    ServiceUptimeOut,
 )
+from app.services.batch_check import MEDIA_TYPES as CHECK_MEDIA_TYPES
+from app.services.bulk import import_services
+from app.services.export import MEDIA_TYPES
 from app.services.service import (
     check_service_status as check_status,
 )
 from app.services.service import (
+    check_services_now,
     delete_service,
+    get_archived_statuses,
+    get_service_status_export,
     get_service_status_history,
+    get_service_uptime,
     list_services,
     register_service_url,
     update_service,
@@ -33,16 +49,53 @@ router = APIRouter(prefix="/services", tags=["Services"])
 def register_service(
     data: ServiceIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ) -> ServiceOut:
     registered_service = register_service_url(data, current_user.id, db)
     return ServiceOut.model_validate(registered_service)
 
 
+@router.post("/bulk", response_model=ServiceBulkOut)
+async def register_services_in_bulk(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> ServiceBulkOut:
+    """Register many services from a JSON array, NDJSON or CSV body, chosen by ``Content-Type``.
+
+    CSV needs a header row naming the ``ServiceIn`` fields (``name`` and ``url``
+    at least). Each record gets a result by its 0-based ``index`` in the body:
+    ``created``, ``exists``, ``duplicate`` or ``invalid`` with its errors.
+    """
+    media_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+    return await import_services(media_type, request.stream(), current_user.id)
+
+
+@router.post("/check", response_class=StreamingResponse)
+async def check_services_in_batch(
+    data: ServiceCheckIn,
+    format: Literal["ndjson", "sse"] = "ndjson",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> StreamingResponse:
+    """Check the selected services now, streaming each result as NDJSON or server-sent events.
+
+    Select by ``ids``, by a ``name`` pattern (``*`` and ``?`` wildcards), or
+    neither for all of your services; ``active_only`` skips paused ones.
+    Events: ``missing`` for unknown ids, ``result`` per service as it lands,
+    then ``done`` once every result is stored.
+    """
+    chunks = await check_services_now(data, current_user.id, format, db)
+    return StreamingResponse(
+        chunks,
+        media_type=CHECK_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/", response_model=list[ServiceOut])
 def view_services(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ) -> list[ServiceOut]:
     return list_services(current_user.id, db)
 
@@ -52,7 +105,7 @@ def update_service_details(
     data: ServiceUpdate,
     service_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     updated_service = update_service(data, service_id, db)
     return ServiceOut.model_validate(updated_service)
@@ -62,7 +115,7 @@ def update_service_details(
 def delete_active_service(
     service_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     return delete_service(service_id, db)
 
@@ -70,8 +123,8 @@ def delete_active_service(
 @router.get("/{service_id}/status", response_model=ServiceStatusOut)
 async def check_service_status(
     service_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ) -> ServiceStatusOut:
     service_status = await check_status(service_id, db)
     return ServiceStatusOut.model_validate(service_status)
@@ -80,7 +133,68 @@ async def check_service_status(
 @router.get("/{service_id}/status/history", response_model=list[ServiceStatusOut])
 def view_service_status_history(
     service_id: int,
+    request: Request,
+    response: Response,
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(default=10, ge=1, le=settings.history_page_max),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ) -> list[ServiceStatusOut]:
-    return get_service_status_history(service_id, db)
+    """Newest-first history within [from, to), ``limit`` rows per page.
+
+    When more rows remain, the ``X-Next-Cursor`` header carries the cursor for
+    the next page (also given as a ``Link: <...>; rel="next"`` URL).
+    """
+    statuses, next_cursor = get_service_status_history(service_id, db, start, end, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return statuses
+
+
+@router.get("/{service_id}/status/history/export", response_class=StreamingResponse)
+async def export_service_status_history(
+    service_id: int,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream the full history within [from, to), oldest first, as NDJSON or CSV."""
+    chunks = await get_service_status_export(service_id, start, end, format, db)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="service-{service_id}-history.{format}"'},
+    )
+
+
+@router.get("/{service_id}/uptime", response_model=ServiceUptimeOut)
+async def view_service_uptime(
+    service_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> ServiceUptimeOut:
+    """Uptime and latency percentiles over [start, end) (default: the last 24 hours), from rollups."""
+    return ServiceUptimeOut.model_validate(await get_service_uptime(service_id, start, end, db))
+
+
+@router.get("/{service_id}/status/archive", response_model=ServiceArchiveOut)
+async def view_archived_status_history(
+    service_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    fields: list[str] | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+) -> ServiceArchiveOut:
+    """Archived history over [start, end) (default: the last 30 days), read from the segment files.
+
+    Pass ``fields`` (repeatable) to read only those columns, e.g. ``?fields=status&fields=response_time``.
+    """
+    return ServiceArchiveOut.model_validate(await get_archived_statuses(service_id, start, end, fields, db))
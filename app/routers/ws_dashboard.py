@@ -1,37 +1,33 @@
 # app/routers/ws_dashboard.py
-import json
-from asyncio import sleep
-
+import anyio
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.core.database import SessionLocal
-from app.services.dashboard import (
-    get_services_with_latest_status as latest_service_statuses,
-)
+from app.services.broadcast import status_hub
 
 router = APIRouter(prefix="/ws", tags=["Dashboard"])
 
 
 @router.websocket("/status")
 async def ws_status(websocket: WebSocket):
+    """Sends a ``snapshot`` message on connect, then ``delta`` messages as services change."""
     await websocket.accept()
-    db = SessionLocal()
-    try:
-        while True:
-            rows = latest_service_statuses(db)
-            payload = [
-                {
-                    "id": svc.id,
-                    "name": svc.name,
-                    "status": st.status.value,
-                    "response_time": st.response_time,
-                    "checked_at": st.checked_at.isoformat(),
-                }
-                for svc, st in rows
-            ]
-            await websocket.send_text(json.dumps(payload))
-            await sleep(5)
-    except WebSocketDisconnect:
-        print("Client disconnected")
-    finally:
-        db.close()
+    async with status_hub.subscribe() as subscriber, anyio.create_task_group() as task_group:
+
+        async def send() -> None:
+            try:
+                await websocket.send_text(await status_hub.snapshot())
+                while True:
+                    await websocket.send_text(await subscriber.get())
+            except WebSocketDisconnect:
+                task_group.cancel_scope.cancel()
+
+        async def watch_disconnect() -> None:
+            # Clients send nothing; reading is how a disconnect is noticed between updates
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                task_group.cancel_scope.cancel()
+
+        task_group.start_soon(send)
+        task_group.start_soon(watch_disconnect)
@@ -1,22 +1,55 @@
 # app/schemas/service.py
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
+from app.core.config import settings
 from app.models.service import ServiceState
 
+# A service is checked at most once per poll timeout, the longest a check can run
+MIN_INTERVAL_SECONDS = settings.poll_timeout_seconds
+
 
 class ServiceIn(BaseModel):
     name: str
     url: HttpUrl
     keyword: Optional[str] = None
+    interval_seconds: int = Field(default=60, ge=MIN_INTERVAL_SECONDS)
+    timeout: Optional[float] = Field(default=None, gt=0)
+    retries: int = Field(default=3, ge=1)
 
 
 class ServiceUpdate(BaseModel):
     name: Optional[str] = None
     is_active: Optional[bool] = True
+    interval_seconds: Optional[int] = Field(default=None, ge=MIN_INTERVAL_SECONDS)
+    timeout: Optional[float] = Field(default=None, gt=0)
+    retries: Optional[int] = Field(default=None, ge=1)
+
+
+class ServiceBulkItemOut(BaseModel):
+    index: int
+    status: Literal["created", "exists", "duplicate", "invalid"]
+    id: Optional[int] = None
+    url: Optional[str] = None
+    errors: Optional[list[str]] = None
+
+
+class ServiceBulkOut(BaseModel):
+    created: int
+    exists: int
+    duplicate: int
+    invalid: int
+    results: list[ServiceBulkItemOut]
+
+
+class ServiceCheckIn(BaseModel):
+    ids: Optional[list[int]] = None
+    # Shell-style pattern on the service name, e.g. "checkout-*"
+    name: Optional[str] = None
+    active_only: bool = False
 
 
 class ServiceOut(BaseModel):
@@ -25,6 +58,9 @@ class ServiceOut(BaseModel):
     url: str
     is_active: bool
     user_id: int
+    interval_seconds: int
+    timeout: Optional[float] = None
+    retries: int
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -35,6 +71,13 @@ class ServiceStatusOut(BaseModel):
     status: ServiceState
     response_time: Optional[float] = None
     checked_at: datetime
+    last_seen: Optional[datetime] = None
+    sample_count: int = 1
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    download_ms: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -49,3 +92,27 @@ class ServiceDashboardOut(BaseModel):
     average_response_time_ms: float | None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ServiceUptimeOut(BaseModel):
+    service_id: int
+    start: datetime
+    end: datetime
+    checks: int
+    status_counts: dict[str, int]
+    uptime_percent: Optional[float] = None
+    average_response_time_ms: Optional[float] = None
+    min_response_time_ms: Optional[float] = None
+    max_response_time_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+
+
+class ServiceArchiveOut(BaseModel):
+    service_id: int
+    start: datetime
+    end: datetime
+    fields: list[str]
+    segments_scanned: int
+    rows: list[dict[str, Any]]
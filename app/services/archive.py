@@ -0,0 +1,195 @@
+# app/services/archive.py
+"""Cold history archive: aged status rows move into per-day columnar segment files.
+
+Segments live at ``<archive_dir>/YYYY/MM/DD/<first id>-<last id>.seg`` (see
+``segments`` for the file format), so a range read only opens the day
+directories it covers and skips segments by their footer bounds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import shutil
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, AsyncWriteSessionLocal
+from app.core.logging import logging
+from app.models.service import ServiceStatus
+from app.repositories.service import delete_statuses_in_chunks_async
+from app.services.segments import COLUMNS, FLOAT_COLUMNS, Segment, SegmentWriter
+
+logger = logging.getLogger(__name__)
+
+# Fields a read can ask for (every row belongs to the requested service)
+ARCHIVE_FIELDS = tuple(name for name in COLUMNS if name != "service_id")
+
+_table = ServiceStatus.__table__
+_SOURCE_COLUMNS = [_table.c[name] for name in COLUMNS]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _ms(value: datetime) -> int:
+    return round(_as_utc(value).timestamp() * 1000)
+
+
+def _from_ms(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000, timezone.utc)
+
+
+def _row_group(rows) -> dict[str, list]:
+    columns: dict[str, list] = {name: [] for name in COLUMNS}
+    for row in rows:
+        checked_at = _ms(row.checked_at)
+        columns["service_id"].append(row.service_id)
+        columns["checked_at"].append(checked_at)
+        columns["last_seen"].append(-1 if row.last_seen is None else _ms(row.last_seen) - checked_at)
+        columns["sample_count"].append(row.sample_count or 1)
+        columns["status"].append(row.status.value)
+        for name in FLOAT_COLUMNS:
+            value = getattr(row, name)
+            columns[name].append(math.nan if value is None else value)
+    return columns
+
+
+def _day_dir(directory: str | Path, day: date) -> Path:
+    return Path(directory) / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}"
+
+
+async def _archive_window(where, path: Path, row_group_size: int, db: AsyncSession) -> None:
+    """Stream the rows matching ``where`` into a new segment at ``path``."""
+    writer = await asyncio.to_thread(SegmentWriter, path)
+    try:
+        result = await db.stream(
+            select(*_SOURCE_COLUMNS)
+            .where(where)
+            .order_by(_table.c.service_id, _table.c.checked_at)
+            .execution_options(yield_per=row_group_size)
+        )
+        async for rows in result.partitions(row_group_size):
+            await asyncio.to_thread(lambda: writer.write_row_group(_row_group(rows)))
+        await asyncio.to_thread(writer.close)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+
+
+async def archive_old_statuses(
+    days: int = settings.archive_after_days,
+    directory: str = settings.archive_dir,
+    row_group_size: int = settings.archive_row_group_size,
+    db: AsyncSession | None = None,
+) -> tuple[int, float]:
+    """Move ServiceStatus rows older than ``days`` into the archive, one segment per UTC day.
+
+    Rows are streamed from a read session and encoded off the event loop; only
+    after the segment is fsynced and renamed into place are the same rows
+    (bounded by the day's highest id at the time) deleted from the hot table
+    in chunks. Rows that land in an archived day later get their own segment
+    on the next run. Returns the number of rows moved and the seconds taken.
+    """
+    owns_session = db is None
+    read_db = db or AsyncSessionLocal()
+    write_db = db or AsyncWriteSessionLocal()
+    start = time.perf_counter()
+    moved = 0
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        while True:
+            oldest = await read_db.scalar(select(func.min(_table.c.checked_at)).where(_table.c.checked_at < cutoff))
+            if oldest is None:
+                break
+            day = _as_utc(oldest).date()
+            day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            window = and_(
+                _table.c.checked_at >= day_start, _table.c.checked_at < min(day_start + timedelta(days=1), cutoff)
+            )
+            first_id, last_id = (
+                await read_db.execute(select(func.min(_table.c.id), func.max(_table.c.id)).where(window))
+            ).one()
+            window = and_(window, _table.c.id <= last_id)
+
+            await _archive_window(
+                window, _day_dir(directory, day) / f"{first_id}-{last_id}.seg", row_group_size, read_db
+            )
+            await read_db.commit()  # end the read transaction before deleting
+            deleted = await delete_statuses_in_chunks_async(
+                window, settings.cleanup_chunk_size, settings.cleanup_chunk_pause_seconds, write_db
+            )
+            if not deleted:
+                break
+            moved += deleted
+
+        if moved:
+            logger.info(f"[Archive] Moved {moved} status records to {directory} in {time.perf_counter() - start:.2f}s.")
+    except Exception:
+        await read_db.rollback()
+        await write_db.rollback()
+        logger.exception("[Archive] Failed to archive old statuses.")
+    finally:
+        if owns_session:
+            await read_db.close()
+            await write_db.close()
+    return moved, time.perf_counter() - start
+
+
+def read_archive(
+    service_id: int, start: datetime, end: datetime, fields: list[str], directory: str = settings.archive_dir
+) -> tuple[list[dict], int]:
+    """Archived rows of one service with start <= checked_at < end, oldest first.
+
+    Only the day directories in range are listed, segments are skipped by
+    their footer bounds, and only ``fields`` (plus ``checked_at`` for ordering)
+    are decompressed. Returns the rows and the number of segments read.
+    """
+    start_ms, end_ms = _ms(start), _ms(end)
+    wanted = list(dict.fromkeys(["checked_at", *fields]))
+    columns: dict[str, list] = {name: [] for name in wanted}
+    scanned = 0
+    day, last_day = _as_utc(start).date(), _as_utc(end).date()
+    while day <= last_day:
+        for path in sorted(_day_dir(directory, day).glob("*.seg")):
+            with Segment(path) as segment:
+                if not segment.overlaps(service_id, start_ms, end_ms):
+                    continue
+                scanned += 1
+                for name, values in segment.read(service_id, start_ms, end_ms, wanted).items():
+                    columns[name].extend(values)
+        day += timedelta(days=1)
+
+    order = sorted(range(len(columns["checked_at"])), key=columns["checked_at"].__getitem__)
+    for name in ("checked_at", "last_seen"):
+        if name in columns:
+            columns[name] = [None if value is None else _from_ms(value) for value in columns[name]]
+    return [{name: columns[name][index] for name in fields} for index in order], scanned
+
+
+def prune_archive(retention_days: int = settings.archive_retention_days, directory: str = settings.archive_dir) -> int:
+    """Remove day directories older than ``retention_days``; returns how many were removed."""
+    oldest_kept = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+    removed = 0
+    for day_dir in sorted(Path(directory).glob("[0-9]*/[0-9]*/[0-9]*")):
+        year, month, day = day_dir.parts[-3:]
+        try:
+            expired = date(int(year), int(month), int(day)) < oldest_kept
+        except ValueError:
+            continue
+        if expired:
+            shutil.rmtree(day_dir)
+            removed += 1
+    for parent in sorted(Path(directory).glob("[0-9]*/[0-9]*"), reverse=True) + sorted(Path(directory).glob("[0-9]*")):
+        if parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+    if removed:
+        logger.info(f"[Archive] Pruned {removed} archived days past retention.")
+    return removed
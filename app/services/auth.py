@@ -1,27 +1,44 @@
 # app/services/auth.py
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import AsyncWriteSessionLocal
 from app.core.logging import logging
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, password_needs_rehash, password_pool
 from app.models.user import User
-from app.repositories.user import get_user_by_username
+from app.repositories.user import get_user_by_username_async, update_password_hash_async
 
 logger = logging.getLogger(__name__)
 
 
-def authenticate_user(username: str, password: str, db: Session) -> User:
-    user = get_user_by_username(username, db)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(username: str, password: str, db: AsyncSession) -> User:
+    user = await get_user_by_username_async(username, db)
+    # Hand the connection back before the slow bcrypt check
+    await db.close()
+    if not user or not await password_pool.verify(password, user.hashed_password):
         logger.warning(f"Authentication failed for username='{username}'")
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if password_needs_rehash(user.hashed_password):
+        await rehash_password(user, password)
     logger.info(f"User authenticated: username='{username}'")
     return user
 
 
-def login_for_access_token(username: str, password: str, db: Session) -> str:
-    user = authenticate_user(username, password, db)
+async def rehash_password(user: User, password: str) -> None:
+    """Re-hash at the configured cost; skipped (until the next login) when the pool is saturated."""
+    try:
+        hashed_password = await password_pool.hash(password)
+    except HTTPException:
+        return
+    async with AsyncWriteSessionLocal() as db:
+        await update_password_hash_async(user.id, hashed_password, db)
+    user.hashed_password = hashed_password
+    logger.info(f"Password rehashed at the configured cost for user='{user.username}'")
+
+
+async def login_for_access_token(username: str, password: str, db: AsyncSession) -> str:
+    user = await authenticate_user(username, password, db)
     token = create_access_token(data={"sub": (user.email)})
     logger.info(f"Access token issued for user='{user.username}'")
     return token
@@ -0,0 +1,65 @@
+# app/services/batch_check.py
+"""On-demand checks of many services, streamed back as NDJSON or SSE as each result lands."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from collections import Counter
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+from app.models.service import Service
+from app.services.scheduler import iter_service_checks
+from app.services.writer import CheckResult, result_writer
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def _event(kind: str, payload: dict, fmt: str) -> bytes:
+    if fmt == "sse":
+        return f"event: {kind}\ndata: {json.dumps(payload)}\n\n".encode()
+    return (json.dumps({"type": kind, **payload}) + "\n").encode()
+
+
+def _result(service: Service, result: CheckResult) -> dict:
+    return {
+        "service_id": service.id,
+        "name": service.name,
+        "url": service.url,
+        "status": result.status.value,
+        "response_time": result.response_time,
+        "checked_at": result.checked_at.isoformat(),
+    }
+
+
+async def stream_checks(services: list[Service], missing: list[int], fmt: str) -> AsyncIterator[bytes]:
+    """Check ``services`` now and yield one event per result as its URL completes.
+
+    Checks go through the scheduler's path: one request per unique URL under
+    the checker's concurrency limits, with ``poll_timeout_seconds`` for the
+    whole batch. Requested ids that matched nothing come first as ``missing``
+    events. Once every result is out, all of them go to the result writer as
+    one write, queued behind what the scheduler produced, and a ``done``
+    event reports the counts and whether they were committed (False when the
+    writer journaled them during an outage). The write is shielded, so a
+    client that disconnects early still gets the finished checks stored.
+    """
+    for service_id in missing:
+        yield _event("missing", {"service_id": service_id, "detail": "Service not registered"}, fmt)
+    results: list[CheckResult] = []
+    counts: Counter[str] = Counter()
+    stored = False
+    try:
+        # aclosing cancels the checks still running as soon as the client goes away,
+        # instead of whenever the abandoned generator is garbage collected
+        async with contextlib.aclosing(iter_service_checks(services, datetime.now(timezone.utc))) as checks:
+            async for service, result in checks:
+                results.append(result)
+                counts[result.status.value] += 1
+                yield _event("result", _result(service, result), fmt)
+    finally:
+        if results:
+            stored = await asyncio.shield(asyncio.ensure_future(result_writer.write(results)))
+    yield _event("done", {"checked": len(results), "status_counts": dict(counts), "stored": stored}, fmt)
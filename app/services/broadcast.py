@@ -0,0 +1,191 @@
+# app/services/broadcast.py
+"""Status broadcast hub: one publisher computes dashboard updates and fans them out to websockets."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging import logging
+from app.services.dashboard import (
+    get_services_with_latest_status_async,
+    get_services_with_latest_status_for_async,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _entry(service, status) -> dict:
+    return {
+        "id": service.id,
+        "name": service.name,
+        "status": status.status.value,
+        "response_time": status.response_time,
+        "checked_at": status.checked_at.isoformat(),
+    }
+
+
+class Subscriber:
+    """One websocket's bounded outbox.
+
+    When a slow client lets ``maxsize`` messages pile up, its queued deltas
+    are discarded and it is resynchronised with a fresh snapshot instead, so
+    a stalled client never holds back the publisher or grows without bound.
+    """
+
+    def __init__(self, hub: StatusHub, maxsize: int) -> None:
+        self._hub = hub
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self._resync = False
+
+    def offer(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._resync = True
+            self._hub.stats["resyncs"] += 1
+            # Wake a reader blocked in get(); the placeholder is replaced by the snapshot
+            self._queue.put_nowait("")
+
+    async def get(self) -> str:
+        message = await self._queue.get()
+        if self._resync:
+            self._resync = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return await self._hub.snapshot()
+        return message
+
+
+class StatusHub:
+    """Keeps the dashboard state in memory and publishes changes once per cycle.
+
+    The result writer calls ``notify()`` with the services it just stored.
+    ``run()`` wakes at most every ``publish_interval`` seconds, reloads only
+    those services' current status in one query, and sends every subscriber
+    the same pre-serialized delta. A full reload every ``full_refresh_interval``
+    seconds also catches renamed and deleted services. New subscribers get the
+    cached snapshot, serialized once per change. Nothing is queried while no
+    one is subscribed.
+    """
+
+    def __init__(self, publish_interval: float, full_refresh_interval: float, client_queue_size: int) -> None:
+        self.publish_interval = publish_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.client_queue_size = client_queue_size
+        self._state: dict[int, dict] = {}
+        self._loaded = False
+        self._snapshot: str | None = None
+        self._changed: set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._load_lock = asyncio.Lock()
+        self._subscribers: set[Subscriber] = set()
+        self.stats: Counter[str] = Counter()
+
+    def notify(self, service_ids: Iterable[int]) -> None:
+        """Mark services as changed; cheap enough to call after every write."""
+        if self._subscribers:
+            self._changed.update(service_ids)
+            self._wakeup.set()
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[Subscriber]:
+        subscriber = Subscriber(self, self.client_queue_size)
+        self._subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._loaded = False  # stop tracking; reload on the next subscriber
+
+    async def snapshot(self) -> str:
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self._reload()
+        if self._snapshot is None:
+            services = sorted(self._state.values(), key=lambda entry: entry["name"])
+            self._snapshot = json.dumps({"type": "snapshot", "services": services})
+        return self._snapshot
+
+    async def _reload(self) -> tuple[list[dict], list[int]]:
+        """Replace the state with a full query; returns what changed."""
+        self._changed.clear()
+        async with AsyncSessionLocal() as db:
+            rows = await get_services_with_latest_status_async(db)
+        self.stats["queries"] += 1
+        state = {service.id: _entry(service, status) for service, status in rows}
+        changed = [entry for service_id, entry in state.items() if self._state.get(service_id) != entry]
+        removed = [service_id for service_id in self._state if service_id not in state]
+        self._state, self._loaded, self._snapshot = state, True, None
+        return changed, removed
+
+    async def _load_changes(self) -> tuple[list[dict], list[int]]:
+        service_ids, self._changed = self._changed, set()
+        async with AsyncSessionLocal() as db:
+            rows = await get_services_with_latest_status_for_async(service_ids, db)
+        self.stats["queries"] += 1
+        changed = []
+        for service, status in rows:
+            entry = _entry(service, status)
+            if self._state.get(service.id) != entry:
+                self._state[service.id] = entry
+                changed.append(entry)
+        if changed:
+            self._snapshot = None
+        return changed, []
+
+    def publish(self, changed: list[dict], removed: list[int]) -> None:
+        if not (changed or removed):
+            return
+        message = json.dumps({"type": "delta", "services": changed, "removed": removed})
+        for subscriber in list(self._subscribers):
+            subscriber.offer(message)
+        self.stats["deltas"] += 1
+        self.stats["messages"] += len(self._subscribers)
+
+    async def _cycle(self, full: bool) -> None:
+        async with self._load_lock:
+            if full:
+                self.publish(*await self._reload())
+            elif self._changed:
+                self.publish(*await self._load_changes())
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Fresh primitives for this event loop (the hub outlives app restarts in tests)
+        self._wakeup, self._load_lock = asyncio.Event(), asyncio.Lock()
+        next_full = loop.time() + self.full_refresh_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_full - loop.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            full = loop.time() >= next_full
+            if full:
+                next_full = loop.time() + self.full_refresh_interval
+            if self._subscribers and self._loaded:
+                try:
+                    await self._cycle(full)
+                except Exception:
+                    logger.exception("[Broadcast] Failed to publish status changes.")
+            await asyncio.sleep(self.publish_interval)
+
+    def snapshot_stats(self) -> dict:
+        return {**self.stats, "subscribers": len(self._subscribers), "services": len(self._state)}
+
+
+status_hub = StatusHub(
+    publish_interval=settings.ws_publish_interval_seconds,
+    full_refresh_interval=settings.ws_full_refresh_seconds,
+    client_queue_size=settings.ws_client_queue_size,
+)
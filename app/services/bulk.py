@@ -0,0 +1,178 @@
+# app/services/bulk.py
+"""Bulk service import from a JSON array, NDJSON or CSV request body."""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections import Counter
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.database import AsyncWriteSessionLocal
+from app.repositories.service import get_existing_service_urls_async, insert_services_async
+from app.schemas.service import ServiceIn
+from app.services.status_cache import status_cache
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Incremental decode, so a multi-byte character split across chunks survives
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def _parse_json(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    body = b"".join([chunk async for chunk in chunks])
+    try:
+        items = json.loads(body or b"[]")
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON body: {error}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array of services")
+    for item in items:
+        yield item
+
+
+async def _parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            # Passed on as the item itself, so one bad line fails alone
+            yield ValueError(f"Invalid JSON: {error}")
+
+
+async def _parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    header = None
+    record = ""
+    async for line in _lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue  # a quoted field runs onto the next line
+        if not record.strip():
+            record = ""
+            continue
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            if not {"name", "url"} <= set(header):
+                raise HTTPException(status_code=422, detail="CSV header must include name and url columns")
+            continue
+        # Empty cells are left out so the field defaults apply
+        yield {name: value for name, value in zip(header, values) if value != ""}
+    if record.strip():
+        yield ValueError("Unterminated quoted field")
+
+
+PARSERS = {"application/json": _parse_json, "application/x-ndjson": _parse_ndjson, "text/csv": _parse_csv}
+
+
+def _errors(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    ]
+
+
+async def _store_batch(
+    batch: list[tuple[int, ServiceIn]], user_id: int, seen: set[str], results: list[dict], counts: Counter
+) -> None:
+    """Insert one batch: a single lookup for existing URLs, then a single executemany."""
+    async with AsyncWriteSessionLocal() as db:
+        existing = await get_existing_service_urls_async(user_id, list({str(data.url) for _, data in batch}), db)
+        rows, pending = [], []
+        for index, data in batch:
+            url = str(data.url)
+            if url in existing:
+                status = "exists"
+            elif url in seen:
+                status = "duplicate"
+            else:
+                seen.add(url)
+                rows.append({**data.model_dump(), "url": url, "user_id": user_id})
+                pending.append((index, url))
+                continue
+            counts[status] += 1
+            results.append({"index": index, "status": status, "url": url})
+        created = await insert_services_async(rows, db)
+        await db.commit()
+    for index, url in pending:
+        # Missing from RETURNING: another request registered it since the lookup
+        status = "created" if url in created else "exists"
+        counts[status] += 1
+        results.append({"index": index, "status": status, "id": created.get(url), "url": url})
+
+
+async def import_services(
+    media_type: str,
+    chunks: AsyncIterator[bytes],
+    user_id: int,
+    batch_size: int = settings.bulk_import_batch_size,
+    max_items: int = settings.bulk_import_max_items,
+) -> dict:
+    """Register every service in a JSON array, NDJSON or CSV body for ``user_id``.
+
+    Records are validated as they are read and stored ``batch_size`` at a
+    time, each batch in its own short write transaction, so the body is never
+    held in memory (JSON arrays aside) and the writer connection is never held
+    while the client is still uploading. Every record gets a result: created
+    (with its id), exists (already registered), duplicate (earlier in this
+    body) or invalid (with its errors). Re-sending a body is safe: what was
+    stored comes back as ``exists``. A body over ``max_items`` records is
+    rejected with 413 once the limit is reached; batches stored before then
+    are kept.
+    """
+    parse = PARSERS.get(media_type)
+    if parse is None:
+        raise HTTPException(status_code=415, detail=f"Send one of: {', '.join(PARSERS)}")
+    results: list[dict] = []
+    counts: Counter[str] = Counter()
+    seen: set[str] = set()
+    batch: list[tuple[int, ServiceIn]] = []
+    index = 0
+    try:
+        async for item in parse(chunks):
+            if index >= max_items:
+                raise HTTPException(status_code=413, detail=f"At most {max_items} services per request")
+            errors = [str(item)] if isinstance(item, ValueError) else None
+            if errors is None:
+                try:
+                    batch.append((index, ServiceIn.model_validate(item)))
+                except ValidationError as error:
+                    errors = _errors(error)
+            if errors:
+                counts["invalid"] += 1
+                results.append({"index": index, "status": "invalid", "errors": errors})
+            index += 1
+            if len(batch) >= batch_size:
+                await _store_batch(batch, user_id, seen, results, counts)
+                batch = []
+        if batch:
+            await _store_batch(batch, user_id, seen, results, counts)
+    finally:
+        if counts["created"]:
+            status_cache.bump()
+    results.sort(key=lambda result: result["index"])
+    return {
+        "created": counts["created"],
+        "exists": counts["exists"],
+        "duplicate": counts["duplicate"],
+        "invalid": counts["invalid"],
+        "results": results,
+    }
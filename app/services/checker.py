@@ -4,25 +4,164 @@ import asyncio
 import logging
 import random
 import ssl
+import time
+from collections import Counter
+from collections.abc import Iterable
 from datetime import datetime, timezone
+from typing import NamedTuple
 
 import httpx
 
 from app.core.config import settings
 from app.models.service import ServiceState
+from app.services.dns import build_transport, dns_cache
+from app.services.hosts import HostCircuitBreaker, HostLimiter, host_of
+from app.services.matcher import compile_keywords
+from app.services.timing import NO_PHASES, PHASES, Phases, PhaseTimer, current_timer
 
 logger = logging.getLogger(__name__)
 
-# HTTP client with no redirect following so 3xx codes are captured
-_limits = httpx.Limits(max_connections=None, max_keepalive_connections=20)
-client = httpx.AsyncClient(
-    timeout=settings.http_timeout_seconds,
-    limits=_limits,
-    headers={"User-Agent": "Mozilla/5.0 (compatible; ServiceUptimeBot/1.0)"},
-    follow_redirects=False,  # <<< important
-)
+MIN_KEEPALIVE_CONNECTIONS = 20
+
+
+def _build_client(max_keepalive_connections: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=max_keepalive_connections)
+    # HTTP client with no redirect following so 3xx codes are captured
+    return httpx.AsyncClient(
+        timeout=settings.http_timeout_seconds,
+        limits=limits,
+        transport=build_transport(dns_cache, limits) if settings.dns_cache_enabled else None,
+        headers={"User-Agent": "Mozilla/5.0 (compatible; ServiceUptimeBot/1.0)"},
+        follow_redirects=False,  # <<< important
+    )
+
+
+_keepalive_size = MIN_KEEPALIVE_CONNECTIONS
+client = _build_client(_keepalive_size)
+_retired_clients: list[httpx.AsyncClient] = []
 
 semaphore = asyncio.Semaphore(settings.poll_concurrency)
+host_limiter = HostLimiter(settings.per_host_concurrency)
+host_breaker = HostCircuitBreaker(settings.host_breaker_threshold, settings.host_breaker_cooldown_seconds)
+
+# Counters for first attempts, retries and retries refused by the budget
+stats: Counter[str] = Counter()
+
+# Running totals of phase timings (ms) and how many probes measured each phase
+_phase_totals = [0.0] * len(PHASES)
+_phase_counts = [0] * len(PHASES)
+
+
+class Probe(NamedTuple):
+    code: int | None
+    latency: float | None
+    found: frozenset[str]
+    phases: Phases
+
+
+def _record_phases(phases: Phases) -> None:
+    for index, value in enumerate(phases):
+        if value is not None:
+            _phase_totals[index] += value
+            _phase_counts[index] += 1
+
+
+class RetryBudget:
+    """Token bucket that caps retries at a fraction of first attempts.
+
+    Every first attempt deposits ``ratio`` tokens and every retry spends one,
+    with the balance capped at ``reserve``. During a mass outage retries are
+    therefore limited to roughly ``ratio`` extra load instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float, reserve: int) -> None:
+        self.ratio = ratio
+        self.reserve = reserve
+        # Balance kept in thousandths of a retry so repeated deposits stay exact
+        self._deposit = round(ratio * 1000)
+        self._cap = reserve * 1000
+        self._balance = self._cap
+
+    def record_request(self) -> None:
+        self._balance = min(self._balance + self._deposit, self._cap)
+
+    def try_spend(self) -> bool:
+        if self._balance < 1000:
+            return False
+        self._balance -= 1000
+        return True
+
+
+retry_budget = RetryBudget(settings.retry_budget_ratio, settings.retry_budget_reserve)
+
+
+async def configure_pool(origins: set[str]) -> None:
+    """Size the keep-alive pool to the monitored origins and drop stale per-host state.
+
+    The pool grows in powers of two (capped at ``max_keepalive_connections``)
+    so it is rebuilt only when the origin count changes substantially. The
+    replaced client is closed on the next call, long after its requests finished.
+    """
+    global client, _keepalive_size
+    host_limiter.retain(origins)
+
+    while _retired_clients:
+        await _retired_clients.pop().aclose()
+
+    size = MIN_KEEPALIVE_CONNECTIONS
+    while size < len(origins):
+        size *= 2
+    size = min(size, settings.max_keepalive_connections)
+    if size != _keepalive_size:
+        logger.info("[Pool] Resizing keep-alive pool %d → %d for %d origins", _keepalive_size, size, len(origins))
+        _retired_clients.append(client)
+        client = _build_client(size)
+        _keepalive_size = size
+
+
+async def close_clients() -> None:
+    while _retired_clients:
+        await _retired_clients.pop().aclose()
+    await client.aclose()
+
+
+def counters() -> dict:
+    """This process's raw checker counters; worker processes send them to the parent to merge."""
+    return {
+        "stats": dict(stats),
+        "phase_totals": list(_phase_totals),
+        "phase_counts": list(_phase_counts),
+        "open_hosts": host_breaker.open_hosts,
+        "keepalive_pool_size": _keepalive_size,
+    }
+
+
+def checker_stats(workers: Iterable[dict] = ()) -> dict:
+    """Snapshot of the checker counters, including retry amplification.
+
+    ``workers`` are :func:`counters` reported by worker processes; they are
+    added to this process's own, so the snapshot covers every probe.
+    """
+    merged = [counters(), *workers]
+    totals: Counter[str] = Counter()
+    for part in merged:
+        totals.update(part["stats"])
+    phase_totals = [sum(part["phase_totals"][i] for part in merged) for i in range(len(PHASES))]
+    phase_counts = [sum(part["phase_counts"][i] for part in merged) for i in range(len(PHASES))]
+    requests = totals["requests"]
+    return {
+        "requests": requests,
+        "retries": totals["retries"],
+        "retries_denied": totals["retries_denied"],
+        "retry_amplification": round((requests + totals["retries"]) / requests, 4) if requests else 1.0,
+        "breaker_rejections": totals["breaker_rejections"],
+        "open_hosts": sum(part["open_hosts"] for part in merged),
+        "keepalive_pool_size": sum(part["keepalive_pool_size"] for part in merged),
+        "phase_avg_ms": {
+            phase: round(phase_totals[i] / phase_counts[i], 3) if phase_counts[i] else None
+            for i, phase in enumerate(PHASES)
+        },
+    }
 
 
 def classify_status(
@@ -31,12 +170,15 @@ def classify_status(
     keyword: str | None,
     response: str | None,
     slow_threshold_ms: int,
+    keyword_found: bool | None = None,
 ) -> ServiceState:
     if code is None:
         return ServiceState.UNREACHABLE
 
     if 200 <= code < 300:
-        if keyword and keyword not in (response or ""):
+        if keyword_found is None:
+            keyword_found = keyword in (response or "") if keyword else True
+        if keyword and not keyword_found:
             return ServiceState.INVALID_CONTENT
         if response_time is not None and response_time > slow_threshold_ms:
             return ServiceState.SLOW
@@ -51,31 +193,128 @@ def classify_status(
     return ServiceState.DOWN
 
 
-async def _perform_request(url: str, retries: int = 3, base_delay: float = 0.5):
+async def _read_body(response: httpx.Response, keywords: frozenset[str]) -> frozenset[str]:
+    """Read only as much of the streamed body as the verdict needs.
+
+    Without keywords (or for non-2xx responses) at most ``body_drain_bytes``
+    are read, enough for short bodies to leave the connection reusable. With
+    keywords, chunks are scanned as they arrive until every keyword is found
+    or ``max_body_bytes`` is hit. Returns the keywords that were found.
+    """
+    read = 0
+    if not keywords or not response.is_success:
+        async for chunk in response.aiter_bytes():
+            read += len(chunk)
+            if read >= settings.body_drain_bytes:
+                break
+        return frozenset()
+
+    scan = compile_keywords(keywords, response.encoding or "utf-8").scanner()
+    async for chunk in response.aiter_bytes():
+        if scan.feed(chunk):
+            break
+        read += len(chunk)
+        if read >= settings.max_body_bytes:
+            logger.debug("[BodyCap] %s: stopped scanning after %d bytes", response.url, read)
+            break
+    return frozenset(scan.found)
+
+
+async def _perform_request(
+    url: str,
+    retries: int = 3,
+    base_delay: float = 0.5,
+    timeout: float | None = None,
+    keywords: frozenset[str] = frozenset(),
+):
+    """Fetch ``url`` with retries; returns a Probe for the last attempt.
+
+    The concurrency slot is held only while a request is in flight; backoff
+    sleeps happen outside it, and each retry must be paid for by the budget.
+    """
     attempt = 0
     last_latency: float | None = None
-    loop = asyncio.get_running_loop()
+    host = host_of(url)
 
     while attempt < retries:
-        start = loop.time()
-        try:
-            response = await client.get(url)
-            latency = (loop.time() - start) * 1000
-            return response.status_code, latency, response.text
-        except httpx.TimeoutException:
-            last_latency = (loop.time() - start) * 1000
-            logger.warning("[Timeout] %s attempt %d/%d after %.2f ms", url, attempt + 1, retries, last_latency)
-        except (httpx.RequestError, ssl.SSLError) as error:
-            logger.warning("[RequestError] %s attempt %d: %s", url, attempt + 1, error)
-        except Exception:
-            logger.exception("[Unhandled] %s attempt %d", url, attempt + 1)
+        if not host_breaker.allow(host):
+            stats["breaker_rejections"] += 1
+            logger.debug("[Breaker] %s: host %s is failing, skipping", url, host)
+            break
+        if attempt == 0:
+            stats["requests"] += 1
+            retry_budget.record_request()
+        elif retry_budget.try_spend():
+            stats["retries"] += 1
+        else:
+            stats["retries_denied"] += 1
+            logger.debug("[RetryBudget] %s giving up after %d attempts", url, attempt)
+            break
+
+        timer = PhaseTimer() if settings.phase_timing_enabled else None
+        extensions = {"trace": timer.trace} if timer else None
+
+        # Wait for the per-host slot before taking a global one
+        async with host_limiter.for_url(url), semaphore:
+            token = current_timer.set(timer)
+            start = time.perf_counter()
+            try:
+                async with client.stream(
+                    "GET", url, timeout=timeout or settings.http_timeout_seconds, extensions=extensions
+                ) as response:
+                    found = await _read_body(response, keywords)
+                finished = time.perf_counter()
+                host_breaker.record_success(host)
+                phases = timer.phases(finished) if timer else NO_PHASES
+                _record_phases(phases)
+                return Probe(response.status_code, (finished - start) * 1000, found, phases)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as error:
+                # DNS and TCP/TLS connect failures count against the whole host
+                last_latency = (time.perf_counter() - start) * 1000
+                host_breaker.record_failure(host)
+                logger.warning("[ConnectError] %s attempt %d/%d: %s", url, attempt + 1, retries, error)
+            except httpx.TimeoutException:
+                last_latency = (time.perf_counter() - start) * 1000
+                host_breaker.record_success(host)
+                logger.warning("[Timeout] %s attempt %d/%d after %.2f ms", url, attempt + 1, retries, last_latency)
+            except (httpx.RequestError, ssl.SSLError) as error:
+                logger.warning("[RequestError] %s attempt %d: %s", url, attempt + 1, error)
+            except Exception:
+                logger.exception("[Unhandled] %s attempt %d", url, attempt + 1)
+            finally:
+                current_timer.reset(token)
 
         attempt += 1
-        delay = base_delay * (2 ** (attempt - 1)) + random.uniform(0, 0.3)
-        logger.debug("[Backoff] %s retrying in %.2fs", url, delay)
-        await asyncio.sleep(delay)
+        if attempt < retries:
+            delay = base_delay * (2 ** (attempt - 1)) + random.uniform(0, 0.3)
+            logger.debug("[Backoff] %s retrying in %.2fs", url, delay)
+            await asyncio.sleep(delay)
+
+    return Probe(None, last_latency, frozenset(), NO_PHASES)
+
+
+async def probe_url(
+    url: str,
+    keywords: frozenset[str] = frozenset(),
+    retries: int = 3,
+    delay: float = 0.5,
+    timeout: float | None = None,
+) -> Probe:
+    """Fetch a URL once and report status code, latency, keywords found and phase timings."""
+    logger.debug("[Start] %s at %s", url, datetime.now(timezone.utc).isoformat())
+    return await _perform_request(url, retries, delay, timeout, keywords)
+
+
+def log_verdict(url: str, code: int | None, status: ServiceState, elapsed: float | None, keyword: str | None) -> None:
+    if status is ServiceState.INVALID_CONTENT:
+        logger.warning("[ContentMismatch] %s missing '%s'", url, keyword)
+    elif status is not ServiceState.UP:
+        logger.warning("[Status] %s returned %s → %s", url, code or "N/A", status)
 
-    return None, last_latency, None
+    if elapsed:
+        logger.debug("[End] %s → %s (%.2f ms)", url, status, elapsed)
+    else:
+        logger.debug("[End] %s → %s", url, status)
 
 
 async def check_service(
@@ -84,27 +323,15 @@ async def check_service(
     delay: float = 0.5,
     keyword: str | None = None,
     slow_threshold_ms: int = 2000,
-) -> tuple[ServiceState, float | None]:
-    """Check the health of a service and return its state and latency."""
-    async with semaphore:
-        start = datetime.now(timezone.utc)
-        logger.debug("[Start] %s at %s", url, start.isoformat())
-
-        try:
-            code, elapsed, text = await _perform_request(url, retries, delay)
-            status = classify_status(code, elapsed, keyword, text, slow_threshold_ms)
-
-            if status is ServiceState.INVALID_CONTENT:
-                logger.warning("[ContentMismatch] %s missing '%s'", url, keyword)
-            elif status is not ServiceState.UP:
-                logger.warning("[Status] %s returned %s → %s", url, code or "N/A", status)
-
-            if elapsed:
-                logger.debug("[End] %s → %s (%.2f ms)", url, status, elapsed)
-            else:
-                logger.debug("[End] %s → %s", url, status)
-
-            return status, elapsed
-        except Exception:
-            logger.exception("[Fatal] %s", url)
-            return ServiceState.DOWN, None
+    timeout: float | None = None,
+) -> tuple[ServiceState, float | None, Phases]:
+    """Check the health of a service and return its state, latency and phase timings."""
+    try:
+        keywords = frozenset([keyword]) if keyword else frozenset()
+        code, elapsed, found, phases = await probe_url(url, keywords, retries, delay, timeout)
+        status = classify_status(code, elapsed, keyword, None, slow_threshold_ms, keyword_found=keyword in found)
+        log_verdict(url, code, status, elapsed, keyword)
+        return status, elapsed, phases
+    except Exception:
+        logger.exception("[Fatal] %s", url)
+        return ServiceState.DOWN, None, NO_PHASES
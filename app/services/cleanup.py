@@ -1,43 +1,100 @@
 # app/services/cleanup.py
+import asyncio
+import time
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.database import AsyncWriteSessionLocal
 from app.core.logging import logging
 from app.models.service import ServiceStatus
+from app.repositories.rollup import delete_rollups_before_async
+from app.repositories.service import delete_statuses_in_chunks_async
+from app.services.archive import archive_old_statuses, prune_archive
+from app.services.rollups import RESOLUTIONS, retention_seconds
 
 logger = logging.getLogger(__name__)
 
 
-def cleanup_old_statuses(days: int = 30):
-    """Delete old ServiceStatus rows beyond retention period."""
-    db: Session = SessionLocal()
+async def cleanup_old_statuses(
+    days: int = settings.retention_days,
+    chunk_size: int = settings.cleanup_chunk_size,
+    pause_seconds: float = settings.cleanup_chunk_pause_seconds,
+    db: AsyncSession | None = None,
+) -> tuple[int, float]:
+    """Delete ServiceStatus rows beyond the retention period.
+
+    Rows are removed with set-based DELETEs over primary-key ranges of at most
+    ``chunk_size`` rows, each in its own short transaction on the writer
+    session, pausing between chunks so the result writer is never locked out
+    for long. Returns the number of rows removed and the seconds taken.
+    """
+    owns_session = db is None
+    db = db or AsyncWriteSessionLocal()
+    start = time.perf_counter()
+    deleted_count = 0
     try:
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-
-        # Fetch records to delete
-        old_statuses = (
-            db.query(ServiceStatus)
-            .filter(ServiceStatus.checked_at < cutoff)
-            .all()
+        deleted_count = await delete_statuses_in_chunks_async(
+            ServiceStatus.checked_at < cutoff, chunk_size, pause_seconds, db
         )
-        deleted_count = len(old_statuses)
-
-        # Delete each record explicitly
-        for status in old_statuses:
-            db.delete(status)
-
-        db.commit()
 
+        elapsed = time.perf_counter() - start
         if deleted_count:
-            logger.info(
-                f"[Cleanup] Deleted {deleted_count} old service status records."
-            )
+            logger.info(f"[Cleanup] Deleted {deleted_count} old service status records in {elapsed:.2f}s.")
         else:
             logger.info("[Cleanup] No old service status records found.")
     except Exception:
-        db.rollback()
+        await db.rollback()
         logger.exception("[Cleanup] Failed to delete old statuses.")
     finally:
-        db.close()
+        if owns_session:
+            await db.close()
+
+    return deleted_count, time.perf_counter() - start
+
+
+async def compact_rollups(now: float | None = None, db: AsyncSession | None = None) -> int:
+    """Drop rollup buckets past their resolution's retention.
+
+    Hour and day buckets are maintained alongside minute buckets as results
+    are written, so aged minute (then hour) buckets are already summarised
+    by the coarser ones and can simply be removed.
+    """
+    owns_session = db is None
+    db = db or AsyncWriteSessionLocal()
+    now = time.time() if now is None else now
+    deleted_count = 0
+    try:
+        for resolution in RESOLUTIONS:
+            deleted_count += await delete_rollups_before_async(resolution, int(now) - retention_seconds(resolution), db)
+            await db.commit()
+        if deleted_count:
+            logger.info(f"[Cleanup] Compacted {deleted_count} aged rollup buckets.")
+    except Exception:
+        await db.rollback()
+        logger.exception("[Cleanup] Failed to compact rollups.")
+    finally:
+        if owns_session:
+            await db.close()
+    return deleted_count
+
+
+async def run_retention_job():
+    """Run retention cleanup every ``cleanup_interval_seconds``, independent of polling.
+
+    With an archive configured, aged rows are moved into it before the hot table is cleaned up.
+    A failing pass is logged and retried on the next interval; when archiving fails, nothing
+    is deleted in that pass, so no row leaves the hot table unarchived.
+    """
+    while True:
+        try:
+            if settings.archive_dir:
+                await archive_old_statuses()
+                await asyncio.to_thread(prune_archive)
+            await cleanup_old_statuses()
+            await compact_rollups()
+        except Exception:
+            logger.exception("[Cleanup] Retention pass failed; retrying in %ss.", settings.cleanup_interval_seconds)
+        await asyncio.sleep(settings.cleanup_interval_seconds)
@@ -1,30 +1,28 @@
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from collections.abc import Iterable
 
-from app.models.service import Service, ServiceStatus
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.models.service import Service, ServiceCurrentStatus
 
-def get_services_with_latest_status(db: Session):
-    # Subquery to find the latest check time per service
-    # subquery to get max checked_at per service_id
-    latest_time = (
-        db.query(
-            ServiceStatus.service_id,
-            func.max(ServiceStatus.checked_at).label("latest_time"),
-        )
-        .group_by(ServiceStatus.service_id)
-        .subquery()
-    )
 
-    # join ServiceStatus to that subquery to get the newest row for each service
+def _latest_status_query():
+    # One current-status row per service, joined on its primary key; history is not scanned
     return (
-        db.query(Service, ServiceStatus)
-        .join(ServiceStatus, ServiceStatus.service_id == Service.id)
-        .join(
-            latest_time,
-            (ServiceStatus.service_id == latest_time.c.service_id)
-            & (ServiceStatus.checked_at == latest_time.c.latest_time),
-        )
+        select(Service, ServiceCurrentStatus)
+        .join(ServiceCurrentStatus, ServiceCurrentStatus.service_id == Service.id)
         .order_by(Service.name)
-        .all()
     )
+
+
+def get_services_with_latest_status(db: Session):
+    return db.execute(_latest_status_query()).all()
+
+
+async def get_services_with_latest_status_async(db: AsyncSession):
+    return (await db.execute(_latest_status_query())).all()
+
+
+async def get_services_with_latest_status_for_async(service_ids: Iterable[int], db: AsyncSession):
+    return (await db.execute(_latest_status_query().where(Service.id.in_(list(service_ids))))).all()
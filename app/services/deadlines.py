@@ -0,0 +1,82 @@
+# app/services/deadlines.py
+"""Min-heap of next-due times that drives per-service check scheduling."""
+
+from __future__ import annotations
+
+import heapq
+import zlib
+
+
+def phase_offset(key: str, interval: float) -> float:
+    """Stable offset in [0, interval) derived from the key.
+
+    Hashing the URL spreads services evenly across their interval instead of
+    firing them in one burst, and services sharing a URL (and interval) land
+    on the same instant so the scheduler can still deduplicate their probes.
+    """
+    return (zlib.crc32(key.encode()) / 2**32) * interval
+
+
+class DeadlineHeap:
+    """Tracks when each service is next due, ordered by due time.
+
+    Due times are phase-locked: the next deadline is always the previous one
+    plus the interval, so the schedule does not drift by however long a check
+    took. Entries for removed or re-scheduled services are dropped lazily.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int]] = []
+        self._due: dict[int, float] = {}
+        self._intervals: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def sync(self, schedule: dict[int, tuple[str, float]], now: float) -> None:
+        """Reconcile with the current service set: ``{service_id: (url, interval)}``."""
+        for service_id in self._due.keys() - schedule.keys():
+            del self._due[service_id]
+            del self._intervals[service_id]
+
+        for service_id, (url, interval) in schedule.items():
+            previous = self._intervals.get(service_id)
+            if previous == interval:
+                continue
+            first_due = now + (phase_offset(url, interval) - now) % interval
+            if previous is not None:
+                # Keep the sooner deadline so shortening an interval takes effect right away
+                first_due = min(first_due, self._due[service_id])
+            self._intervals[service_id] = interval
+            self._push(service_id, first_due)
+
+        # Compact once stale entries outnumber live ones
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, sid) for sid, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def pop_due(self, now: float) -> list[int]:
+        """Return every service due at or before ``now`` and schedule its next run."""
+        due_ids: list[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            due, service_id = heapq.heappop(self._heap)
+            if self._due.get(service_id) != due:
+                continue  # stale entry (removed or re-scheduled)
+            interval = self._intervals[service_id]
+            next_due = due + interval
+            if next_due <= now:
+                # We fell behind by more than an interval; skip missed slots, keep the phase
+                next_due += ((now - next_due) // interval + 1) * interval
+            self._push(service_id, next_due)
+            due_ids.append(service_id)
+        return due_ids
+
+    def next_due(self) -> float | None:
+        """Earliest pending deadline, or None when nothing is scheduled."""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, service_id: int, due: float) -> None:
+        self._due[service_id] = due
+        heapq.heappush(self._heap, (due, service_id))
@@ -0,0 +1,285 @@
+# app/services/dns.py
+"""Caching DNS resolution for the checker's HTTP transport."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import ipaddress
+import socket
+import time
+import typing
+from collections import Counter
+
+import httpcore
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logging
+from app.services.timing import current_timer
+
+logger = logging.getLogger(__name__)
+
+# A resolver maps a hostname to (addresses, ttl seconds or None when unknown).
+# It raises LookupError when the name does not exist (cached negatively).
+Resolver = typing.Callable[[str], typing.Awaitable[tuple[list[str], float | None]]]
+
+
+async def system_resolver(host: str) -> tuple[list[str], float | None]:
+    """Resolve through getaddrinfo (honours /etc/hosts); reports no TTL."""
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except socket.gaierror as error:
+        raise LookupError(f"{host}: {error}") from error
+    return list(dict.fromkeys(info[4][0] for info in infos)), None
+
+
+async def dnspython_resolver(host: str) -> tuple[list[str], float | None]:
+    """Resolve A then AAAA records with dnspython, reporting the record TTL."""
+    import dns.asyncresolver
+    import dns.resolver
+
+    for record_type in ("A", "AAAA"):
+        try:
+            answer = await dns.asyncresolver.resolve(host, record_type)
+        except dns.resolver.NoAnswer:
+            continue
+        except dns.resolver.NXDOMAIN as error:
+            raise LookupError(f"{host}: {error}") from error
+        return [record.address for record in answer], answer.rrset.ttl
+    raise LookupError(f"{host}: no A or AAAA records")
+
+
+class DnsCache:
+    """In-memory hostname cache with TTLs, negative caching and single-flight lookups.
+
+    Concurrent lookups for the same uncached name share one resolver call.
+    Failed lookups (``LookupError``) are remembered for ``negative_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver,
+        default_ttl: float,
+        negative_ttl: float,
+        maxsize: int,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.resolver = resolver
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        # host -> (expires_at, addresses, error); error is set for negative entries
+        self._entries: dict[str, tuple[float, list[str], str | None]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats: Counter[str] = Counter()
+
+    async def resolve(self, host: str) -> list[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        entry = self._entries.get(host)
+        if entry is not None and entry[0] > self._clock():
+            expires_at, addresses, error = entry
+            if error is not None:
+                self.stats["negative_hits"] += 1
+                raise LookupError(error)
+            self.stats["hits"] += 1
+            return addresses
+
+        inflight = self._inflight.get(host)
+        if inflight is None:
+            self.stats["misses"] += 1
+            # The lookup runs as its own task so a cancelled caller cannot abort it for the others
+            inflight = self._inflight[host] = asyncio.ensure_future(self._lookup(host))
+            inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(inflight)
+
+    async def _lookup(self, host: str) -> list[str]:
+        try:
+            addresses, ttl = await self.resolver(host)
+        except LookupError as error:
+            self._store(host, self.negative_ttl, [], str(error))
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._inflight.pop(host, None)
+        self._store(host, self.default_ttl if ttl is None else ttl, addresses, None)
+        return addresses
+
+    def _store(self, host: str, ttl: float, addresses: list[str], error: str | None) -> None:
+        self._entries.pop(host, None)
+        if len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]  # oldest insertion
+        self._entries[host] = (self._clock() + ttl, addresses, error)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round((lookups - self.stats["misses"]) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that resolves hostnames through a DnsCache.
+
+    TLS still uses the request's hostname for SNI and certificate checks; only
+    the TCP connect goes to a cached address (tried in order). The lookup and
+    the connect share the pool's connect timeout.
+    """
+
+    def __init__(self, cache: DnsCache, backend: httpcore.AsyncNetworkBackend | None = None) -> None:
+        self.cache = cache
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        timer = current_timer.get()
+        started = time.perf_counter()
+        try:
+            # The lookup counts against the connect timeout; it keeps running for other callers
+            addresses = await asyncio.wait_for(self.cache.resolve(host), timeout)
+        except LookupError as error:
+            raise httpcore.ConnectError(str(error)) from error
+        except asyncio.TimeoutError as error:
+            raise httpcore.ConnectTimeout(f"{host}: DNS lookup timed out") from error
+        finally:
+            elapsed = time.perf_counter() - started
+            if timer is not None:
+                timer.dns = elapsed * 1000
+        if timeout is not None:
+            timeout = max(timeout - elapsed, 0.0)
+
+        last_error: Exception | None = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as error:
+                last_error = error
+        raise last_error or httpcore.ConnectError(f"{host}: no addresses")
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# httpcore errors and the httpx errors callers expect, most specific first
+_HTTPX_ERRORS: tuple[tuple[type[Exception], type[httpx.HTTPError]], ...] = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextlib.contextmanager
+def _httpx_errors() -> typing.Iterator[None]:
+    try:
+        yield
+    except Exception as error:
+        for source, target in _HTTPX_ERRORS:
+            if isinstance(error, source):
+                raise target(str(error)) from error
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: typing.AsyncIterable[bytes]) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> typing.AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport over an httpcore connection pool that resolves hostnames through a DnsCache."""
+
+    def __init__(self, cache: DnsCache, limits: httpx.Limits, http2: bool = False) -> None:
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=CachingNetworkBackend(cache),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+def build_transport(cache: DnsCache, limits: httpx.Limits, http2: bool = False) -> CachingTransport:
+    """Transport whose connection pool resolves hostnames through ``cache``."""
+    return CachingTransport(cache, limits, http2=http2)
+
+
+dns_cache = DnsCache(
+    dnspython_resolver if settings.dns_resolver == "dnspython" else system_resolver,
+    default_ttl=settings.dns_cache_ttl_seconds,
+    negative_ttl=settings.dns_negative_ttl_seconds,
+    maxsize=settings.dns_cache_size,
+)
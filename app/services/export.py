@@ -0,0 +1,60 @@
+# app/services/export.py
+"""Streaming NDJSON/CSV export of status history."""
+
+from __future__ import annotations
+
+import csv
+import enum
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.repositories.service import stream_status_history_async
+from app.schemas.service import ServiceStatusOut
+
+EXPORT_COLUMNS = tuple(ServiceStatusOut.model_fields)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _ndjson(rows) -> bytes:
+    lines = (json.dumps({name: _plain(row._mapping[name]) for name in EXPORT_COLUMNS}) for row in rows)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(row._mapping[name]) for name in EXPORT_COLUMNS] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def export_status_history(
+    service_id: int,
+    start: datetime | None,
+    end: datetime | None,
+    fmt: str,
+    chunk_size: int = settings.export_chunk_size,
+) -> AsyncIterator[bytes]:
+    """Yield the history of one service, oldest first, as NDJSON or CSV chunks.
+
+    Rows come off a server-side cursor ``chunk_size`` at a time and each chunk
+    is encoded and handed to the response before the next one is fetched, so
+    memory stays flat however long the range is. The generator opens its own
+    session because it outlives the request's dependencies.
+    """
+    encode = _csv if fmt == "csv" else _ndjson
+    if fmt == "csv":
+        yield (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+    async with AsyncSessionLocal() as db:
+        async for rows in stream_status_history_async(service_id, start, end, chunk_size, db):
+            yield encode(rows)
@@ -0,0 +1,100 @@
+# app/services/history.py
+"""Change-only encoding of status history into interval rows."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+
+class Interval:
+    """An open history row: consecutive samples with the same state and similar latency."""
+
+    __slots__ = ("status", "first_seen", "last_seen", "sample_count", "latency_sum", "latency_count", "stored")
+
+    def __init__(self, row: dict) -> None:
+        self.status = row["status"]
+        self.first_seen: datetime = row["checked_at"]
+        self.last_seen: datetime = row["checked_at"]
+        self.sample_count = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.stored = False  # True once the row exists in service_status
+        self.add(row)
+
+    def add(self, row: dict) -> None:
+        self.last_seen = row["checked_at"]
+        self.sample_count += 1
+        if row["response_time"] is not None:
+            self.latency_sum += row["response_time"]
+            self.latency_count += 1
+
+    @property
+    def mean_latency(self) -> float | None:
+        return self.latency_sum / self.latency_count if self.latency_count else None
+
+
+class ChangeEncoder:
+    """Turns per-check rows into interval rows (``checked_at`` is the interval's first sample).
+
+    A sample extends its service's open interval unless the state changed,
+    its latency is outside ``latency_band`` (a fraction of the interval's mean
+    latency), or the interval already spans ``heartbeat_seconds``; in those
+    cases it opens a new interval. Open intervals live in memory, so after a
+    restart (or ``clear()``) each service simply starts a fresh one.
+    """
+
+    def __init__(self, latency_band: float, heartbeat_seconds: float) -> None:
+        self.latency_band = latency_band
+        self.heartbeat_seconds = heartbeat_seconds
+        self._open: dict[int, Interval] = {}
+
+    def _continues(self, interval: Interval, row: dict) -> bool:
+        if row["status"] != interval.status:
+            return False
+        if (row["checked_at"] - interval.first_seen).total_seconds() >= self.heartbeat_seconds:
+            return False
+        mean, latency = interval.mean_latency, row["response_time"]
+        if mean is None or latency is None:
+            return mean is None and latency is None
+        return abs(latency - mean) <= self.latency_band * mean
+
+    def encode(self, rows: list[dict]) -> tuple[list[dict], list[dict]]:
+        """Split a batch into new interval rows to insert and stored intervals to extend."""
+        touched: dict[int, tuple[int, Interval]] = {}  # id(interval) -> (service_id, interval)
+        new_rows: list[tuple[dict, Interval]] = []
+        for row in sorted(rows, key=lambda row: row["checked_at"]):
+            service_id = row["service_id"]
+            interval = self._open.get(service_id)
+            if interval is not None and self._continues(interval, row):
+                interval.add(row)
+            else:
+                interval = self._open[service_id] = Interval(row)
+                new_rows.append((row, interval))
+            touched[id(interval)] = (service_id, interval)
+
+        inserts = [
+            {
+                **row,
+                "response_time": interval.mean_latency,
+                "last_seen": interval.last_seen,
+                "sample_count": interval.sample_count,
+            }
+            for row, interval in new_rows
+        ]
+        updates = [
+            {
+                "b_service_id": service_id,
+                "b_first_seen": interval.first_seen,
+                "last_seen": interval.last_seen,
+                "sample_count": interval.sample_count,
+                "response_time": interval.mean_latency,
+            }
+            for service_id, interval in touched.values()
+            if interval.stored
+        ]
+        for _, interval in touched.values():
+            interval.stored = True
+        return inserts, updates
+
+    def clear(self) -> None:
+        self._open.clear()
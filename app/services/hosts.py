@@ -0,0 +1,85 @@
+# app/services/hosts.py
+"""Per-host concurrency caps and a host-level circuit breaker for the checker."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+def origin_of(url: str) -> str:
+    """``scheme://host:port`` key used to group URLs by upstream."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+class HostLimiter:
+    """One semaphore per origin so a single host cannot take every connection."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def for_url(self, url: str) -> asyncio.Semaphore:
+        origin = origin_of(url)
+        semaphore = self._semaphores.get(origin)
+        if semaphore is None:
+            semaphore = self._semaphores[origin] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    def retain(self, origins: set[str]) -> None:
+        """Forget idle semaphores for origins no longer monitored."""
+        for origin in list(self._semaphores):
+            if origin not in origins and not self._semaphores[origin].locked():
+                del self._semaphores[origin]
+
+
+class HostCircuitBreaker:
+    """Opens per host after repeated DNS/connect failures.
+
+    While open, probes for any URL on that host fail fast instead of each
+    going through its own retries. After ``cooldown`` seconds one probe is let
+    through (half-open); success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+        self._probing: dict[str, float] = {}  # host -> when its half-open trial started
+
+    def allow(self, host: str) -> bool:
+        open_until = self._open_until.get(host)
+        if open_until is None:
+            return True
+        now = time.monotonic()
+        if now < open_until:
+            return False
+        # Half-open: a single trial request (re-allowed if a trial never reported back)
+        if now - self._probing.get(host, float("-inf")) < self.cooldown:
+            return False
+        self._probing[host] = now
+        return True
+
+    def record_success(self, host: str) -> None:
+        self._failures.pop(host, None)
+        self._open_until.pop(host, None)
+        self._probing.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if failures >= self.failure_threshold or host in self._probing:
+            self._open_until[host] = time.monotonic() + self.cooldown
+            self._probing.pop(host, None)
+
+    @property
+    def open_hosts(self) -> int:
+        now = time.monotonic()
+        return sum(1 for until in self._open_until.values() if until > now)
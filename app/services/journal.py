@@ -0,0 +1,166 @@
+# app/services/journal.py
+"""Write-behind journal: an append-only NDJSON file of result batches awaiting the database."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from app.core.logging import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResultJournal:
+    """Append-only journal of batches, one JSON array of records per line.
+
+    Appends are flushed to the OS on every write and fsynced at most once per
+    ``fsync_interval`` seconds. Replay reads from a persisted offset (the
+    ``.offset`` sidecar) and the file is truncated once everything has been
+    consumed. Delivery is at-least-once: a crash between the database commit
+    and the offset update replays that chunk again. A torn last line (crash
+    mid-write) is cut off when the journal is opened. Records the database
+    rejected for good are kept in the ``.rejected`` sidecar for inspection.
+    """
+
+    def __init__(self, path: str | os.PathLike, fsync_interval: float, max_bytes: int) -> None:
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self._offset_path = self.path.with_name(self.path.name + ".offset")
+        self.rejected_path = self.path.with_name(self.path.name + ".rejected")
+        self._file = None  # opened on first append so an idle journal leaves no file behind
+        self._read_offset = 0
+        self._end = 0
+        self._last_fsync = 0.0
+        self._lock = asyncio.Lock()  # serializes appends with truncation
+        self.pending = 0  # records appended but not yet consumed
+        self.stats: Counter[str] = Counter()
+        self.replay_rate = 0.0
+
+    @property
+    def backlog(self) -> bool:
+        return self._end > self._read_offset
+
+    async def open(self) -> None:
+        """Load the replay offset and count what a previous run left behind."""
+        await asyncio.to_thread(self._open)
+        if self.pending:
+            logger.info("[Journal] %d results from a previous run are waiting to be replayed.", self.pending)
+
+    def _open(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self._read_offset = int(self._offset_path.read_text())
+        except (FileNotFoundError, ValueError):
+            self._read_offset = 0
+        end = self._read_offset
+        with open(self.path, "rb") as journal:
+            journal.seek(end)
+            for line in journal:
+                try:
+                    records = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    records = None
+                if records is None:
+                    break
+                self.pending += len(records)
+                end += len(line)
+        if end < self.path.stat().st_size:
+            logger.warning("[Journal] Truncating a torn record at byte %d.", end)
+            os.truncate(self.path, end)
+        self._end = end
+
+    async def append(self, records: list[list]) -> bool:
+        """Append one batch; returns False (and drops it) when the journal is full."""
+        line = json.dumps(records, separators=(",", ":")).encode() + b"\n"
+        async with self._lock:
+            if self._end + len(line) > self.max_bytes:
+                self.stats["dropped"] += len(records)
+                return False
+            await asyncio.to_thread(self._write, line)
+            self._end += len(line)
+        self.pending += len(records)
+        self.stats["appended"] += len(records)
+        return True
+
+    def _write(self, line: bytes) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+        self._file.write(line)
+        self._file.flush()
+        now = time.monotonic()
+        if now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+            self.stats["fsyncs"] += 1
+
+    async def read(self, limit: int) -> tuple[list[list], int]:
+        """Up to about ``limit`` records from the replay offset, and the offset after them."""
+        return await asyncio.to_thread(self._read, self._read_offset, self._end, limit)
+
+    def _read(self, start: int, end: int, limit: int) -> tuple[list[list], int]:
+        records: list[list] = []
+        offset = start
+        with open(self.path, "rb") as journal:
+            journal.seek(start)
+            while offset < end and len(records) < limit:
+                line = journal.readline()
+                offset += len(line)
+                records.extend(json.loads(line))
+        return records, offset
+
+    async def consume(self, offset: int, count: int, seconds: float, rejected: list[list] = ()) -> None:
+        """Mark records up to ``offset`` as done; ``seconds`` is how long storing them took.
+
+        ``rejected`` are the records among them the database refused; they are
+        appended to the rejected file rather than counted as replayed.
+        """
+        async with self._lock:
+            if rejected:
+                await asyncio.to_thread(self._write_rejected, rejected)
+            self._read_offset = offset
+            self.pending -= count
+            self.stats["replayed"] += count - len(rejected)
+            self.stats["rejected"] += len(rejected)
+            self.replay_rate = count / seconds if seconds > 0 else 0.0
+            if self._read_offset >= self._end:
+                await asyncio.to_thread(self._reset)
+            else:
+                await asyncio.to_thread(self._offset_path.write_text, str(offset))
+
+    def _write_rejected(self, records: list[list]) -> None:
+        with open(self.rejected_path, "a") as rejected:
+            rejected.writelines(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+
+    def _reset(self) -> None:
+        if self._file is not None:
+            self._file.truncate(0)
+        elif self.path.exists():
+            os.truncate(self.path, 0)
+        self._offset_path.unlink(missing_ok=True)
+        self._read_offset = self._end = 0
+
+    async def close(self) -> None:
+        if self._file is not None:
+            await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "pending_results": self.pending,
+            "pending_bytes": self._end - self._read_offset,
+            "replay_rate": round(self.replay_rate, 1),
+        }
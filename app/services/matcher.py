@@ -0,0 +1,92 @@
+# app/services/matcher.py
+"""Streaming multi-keyword matching over response body chunks."""
+
+from __future__ import annotations
+
+import codecs
+from functools import lru_cache
+
+# Encodings that write this text as plain ASCII bytes can be searched as bytes
+_ASCII_PROBE = "\n <Az09>"
+
+
+class KeywordSet:
+    """Immutable set of keywords encoded for one body encoding.
+
+    Built once per distinct (keywords, encoding) pair and cached, so the
+    scheduler does not re-encode the same keywords for every probe. For
+    encodings that are not ASCII-compatible (UTF-16, UTF-32, ...) the body is
+    decoded instead: their byte order and BOM come from the body itself.
+    """
+
+    def __init__(self, keywords: frozenset[str], encoding: str) -> None:
+        self.encoding = encoding if not _ascii_compatible(encoding) else None
+        self.needles: tuple[tuple[str, bytes | str], ...] = tuple(
+            sorted(
+                ((keyword, keyword if self.encoding else _encode(keyword, encoding)) for keyword in keywords),
+                key=lambda kn: -len(kn[1]),
+            )
+        )
+        self.overlap = max((len(needle) for _, needle in self.needles), default=1) - 1
+
+    def scanner(self) -> KeywordScan:
+        return KeywordScan(self)
+
+
+class KeywordScan:
+    """Per-response scan state: which keywords were seen so far.
+
+    Each chunk is searched together with the last ``overlap`` bytes of the
+    previous one, so a keyword split across chunks is still found. Each
+    pending needle is looked up with ``bytes.find`` (memchr-backed), which for
+    the handful of keywords sharing a URL is much faster in CPython than
+    stepping a byte-at-a-time automaton in Python. Bodies that are decoded
+    are searched the same way, as text.
+    """
+
+    def __init__(self, keyword_set: KeywordSet) -> None:
+        self._pending = list(keyword_set.needles)
+        self._overlap = keyword_set.overlap
+        self._decoder = None
+        self._tail: bytes | str = b""
+        if keyword_set.encoding:
+            self._decoder = codecs.getincrementaldecoder(keyword_set.encoding)(errors="replace")
+            self._tail = ""
+        self.found: set[str] = set()
+
+    @property
+    def done(self) -> bool:
+        return not self._pending
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan the next chunk; returns True once every keyword has been found."""
+        window = self._tail + (self._decoder.decode(chunk) if self._decoder else chunk)
+        still_pending = []
+        for keyword, needle in self._pending:
+            if needle in window:
+                self.found.add(keyword)
+            else:
+                still_pending.append((keyword, needle))
+        self._pending = still_pending
+        self._tail = window[-self._overlap :] if self._overlap else window[:0]
+        return not self._pending
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    try:
+        return _ASCII_PROBE.encode(encoding) == _ASCII_PROBE.encode("ascii")
+    except LookupError:
+        return True  # unknown encodings fall back to UTF-8 in _encode
+
+
+def _encode(keyword: str, encoding: str) -> bytes:
+    try:
+        return keyword.encode(encoding)
+    except (LookupError, UnicodeEncodeError):
+        return keyword.encode("utf-8")
+
+
+@lru_cache(maxsize=4096)
+def compile_keywords(keywords: frozenset[str], encoding: str = "utf-8") -> KeywordSet:
+    """Return the cached KeywordSet for these keywords and body encoding."""
+    return KeywordSet(keywords, encoding)
@@ -0,0 +1,206 @@
+# app/services/rollups.py
+"""Per-service uptime and latency rollups in minute, hour and day buckets."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.service import ServiceRollup, ServiceState
+from app.repositories.rollup import get_rollups_by_key_async, get_rollups_in_ranges_async, upsert_rollups_async
+from app.services.sketch import DDSketch
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+RESOLUTIONS = (DAY, HOUR, MINUTE)  # coarsest first
+
+# States that count towards uptime: the service answered with a healthy response
+UP_STATES = frozenset({ServiceState.UP.value, ServiceState.SLOW.value})
+
+
+def retention_seconds(resolution: int) -> int:
+    return {
+        MINUTE: settings.rollup_minute_retention_hours * HOUR,
+        HOUR: settings.rollup_hour_retention_days * DAY,
+        DAY: settings.rollup_day_retention_days * DAY,
+    }[resolution]
+
+
+def _pick(choose, current: float | None, value: float | None) -> float | None:
+    if current is None or value is None:
+        return value if current is None else current
+    return choose(current, value)
+
+
+class Bucket:
+    """In-memory aggregate of check results; the mergeable form of a ServiceRollup row."""
+
+    __slots__ = ("status_counts", "latency_count", "latency_sum", "latency_min", "latency_max", "sketch")
+
+    def __init__(self) -> None:
+        self.status_counts: dict[str, int] = {}
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_min: float | None = None
+        self.latency_max: float | None = None
+        self.sketch = DDSketch(settings.rollup_sketch_accuracy)
+
+    def add(self, status: ServiceState, response_time: float | None) -> None:
+        self.status_counts[status.value] = self.status_counts.get(status.value, 0) + 1
+        if response_time is None:
+            return
+        self.latency_count += 1
+        self.latency_sum += response_time
+        self.latency_min = _pick(min, self.latency_min, response_time)
+        self.latency_max = _pick(max, self.latency_max, response_time)
+        self.sketch.add(response_time)
+
+    def merge(self, other: Bucket) -> None:
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+        self.latency_count += other.latency_count
+        self.latency_sum += other.latency_sum
+        self.latency_min = _pick(min, self.latency_min, other.latency_min)
+        self.latency_max = _pick(max, self.latency_max, other.latency_max)
+        self.sketch.merge(other.sketch)
+
+    @classmethod
+    def from_rollup(cls, rollup: ServiceRollup) -> Bucket:
+        bucket = cls()
+        bucket.status_counts = dict(rollup.status_counts)
+        bucket.latency_count = rollup.latency_count
+        bucket.latency_sum = rollup.latency_sum
+        bucket.latency_min = rollup.latency_min
+        bucket.latency_max = rollup.latency_max
+        bucket.sketch = DDSketch.from_bytes(rollup.latency_sketch, settings.rollup_sketch_accuracy)
+        return bucket
+
+    def to_row(self, service_id: int, resolution: int, bucket_start: int) -> dict:
+        return {
+            "service_id": service_id,
+            "resolution": resolution,
+            "bucket_start": bucket_start,
+            "status_counts": self.status_counts,
+            "latency_count": self.latency_count,
+            "latency_sum": self.latency_sum,
+            "latency_min": self.latency_min,
+            "latency_max": self.latency_max,
+            "latency_sketch": self.sketch.to_bytes(),
+        }
+
+
+class OpenBuckets:
+    """Write-through cache of the buckets the result writer is still filling.
+
+    Holds the merged state of recently written buckets so a batch only reads
+    buckets it has not seen yet (e.g. after a restart). Buckets that closed
+    more than a full period ago are dropped. Must be cleared when a write
+    fails, since it may then be ahead of the database.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[tuple[int, int, int], Bucket] = {}
+        self._pruned_minute = 0
+
+    def __contains__(self, key: tuple[int, int, int]) -> bool:
+        return key in self._buckets
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def merge(self, key: tuple[int, int, int], bucket: Bucket) -> Bucket:
+        cached = self._buckets.get(key)
+        if cached is None:
+            self._buckets[key] = bucket
+            return bucket
+        cached.merge(bucket)
+        return cached
+
+    def prune(self, now: int) -> None:
+        minute = now - now % MINUTE
+        if minute == self._pruned_minute:
+            return
+        self._pruned_minute = minute
+        for key in [key for key in self._buckets if key[2] + 2 * key[1] <= now]:
+            del self._buckets[key]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+open_buckets = OpenBuckets()
+
+
+async def record_rollups_async(rows: list[dict], db: AsyncSession) -> None:
+    """Fold status rows into their minute, hour and day buckets within the caller's transaction.
+
+    Buckets are merged in memory and written back whole. The result writer is
+    the only producer, so this read-merge-write is never raced, and buckets
+    already in ``open_buckets`` need no read at all.
+    """
+    batch: dict[tuple[int, int, int], Bucket] = {}
+    latest = 0
+    for row in rows:
+        timestamp = int(row["checked_at"].timestamp())
+        latest = max(latest, timestamp)
+        for resolution in RESOLUTIONS:
+            key = (row["service_id"], resolution, timestamp - timestamp % resolution)
+            bucket = batch.get(key)
+            if bucket is None:
+                bucket = batch[key] = Bucket()
+            bucket.add(row["status"], row["response_time"])
+
+    missing = [key for key in batch if key not in open_buckets]
+    for stored in await get_rollups_by_key_async(missing, db):
+        open_buckets.merge((stored.service_id, stored.resolution, stored.bucket_start), Bucket.from_rollup(stored))
+    await upsert_rollups_async([open_buckets.merge(key, bucket).to_row(*key) for key, bucket in batch.items()], db)
+    open_buckets.prune(latest)
+
+
+def plan_window(
+    start: int, end: int, now: int, resolutions: tuple[int, ...] = RESOLUTIONS
+) -> list[tuple[int, int, int]]:
+    """Cover ``[start, end)`` with the fewest buckets as (resolution, start, end) ranges.
+
+    Whole days are read from day buckets, the remainder from hours and the
+    edges from minutes. Where the finer buckets have already been compacted
+    away, the edge is rounded out to the enclosing coarser bucket.
+    """
+    if start >= end:
+        return []
+    resolution, finer = resolutions[0], resolutions[1:]
+    if not finer or start < now - retention_seconds(finer[0]):
+        return [(resolution, start - start % resolution, end + (-end % resolution))]
+    first, last = start + (-start % resolution), end - end % resolution
+    if first >= last:
+        return plan_window(start, end, now, finer)
+    return [*plan_window(start, first, now, finer), (resolution, first, last), *plan_window(last, end, now, finer)]
+
+
+async def window_stats(service_id: int, start: datetime, end: datetime, db: AsyncSession) -> dict:
+    """Uptime and latency summary of ``service_id`` between ``start`` and ``end``."""
+    ranges = plan_window(int(start.timestamp()), int(end.timestamp()), int(time.time()))
+    total = Bucket()
+    for rollup in await get_rollups_in_ranges_async(service_id, ranges, db):
+        total.merge(Bucket.from_rollup(rollup))
+
+    checks = sum(total.status_counts.values())
+    up = sum(count for status, count in total.status_counts.items() if status in UP_STATES)
+    covered_from = min((range_start for _, range_start, _ in ranges), default=int(start.timestamp()))
+    covered_to = max((range_end for _, _, range_end in ranges), default=int(end.timestamp()))
+    return {
+        "service_id": service_id,
+        "start": datetime.fromtimestamp(covered_from, timezone.utc),
+        "end": datetime.fromtimestamp(covered_to, timezone.utc),
+        "checks": checks,
+        "status_counts": total.status_counts,
+        "uptime_percent": round(100 * up / checks, 3) if checks else None,
+        "average_response_time_ms": total.latency_sum / total.latency_count if total.latency_count else None,
+        "min_response_time_ms": total.latency_min,
+        "max_response_time_ms": total.latency_max,
+        "p50_ms": total.sketch.quantile(0.50),
+        "p95_ms": total.sketch.quantile(0.95),
+        "p99_ms": total.sketch.quantile(0.99),
+    }
@@ -1,115 +1,217 @@
 import asyncio
 import time
 from collections import Counter, defaultdict
-
-from sqlalchemy.orm import Session
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
 
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal
 from app.core.logging import logging
-from app.models.service import Service, ServiceState, ServiceStatus
-from app.services.checker import check_service
-from app.services.cleanup import cleanup_old_statuses
+from app.models.service import Service, ServiceState
+from app.repositories.service import get_active_services_async
+from app.services.checker import Probe, classify_status, log_verdict
+from app.services.deadlines import DeadlineHeap
+from app.services.hosts import origin_of
+from app.services.timing import NO_PHASES
+from app.services.workers import configure_pool, probe_url
+from app.services.writer import CheckResult, result_writer
 
 logger = logging.getLogger(__name__)
 
 last_scheduler_run: float | None = None
 
 
-async def store_results_batch(
-    results: list[tuple[int, ServiceState, float | None]],
-):
-    """Persist multiple service check results in one transaction."""
-
-    def _store():
-        db: Session = SessionLocal()
-        try:
-            for service_id, status, response_time in results:
-                db.add(
-                    ServiceStatus(
-                        service_id=service_id,
-                        status=status,
-                        response_time=response_time,
-                    )
-                )
-            db.commit()
-        except Exception:
-            db.rollback()
-            logger.exception("Failed to persist some statuses.")
-        finally:
-            db.close()
-
-    await asyncio.to_thread(_store)
-
-
-async def poll_services():
-    global last_scheduler_run
-    while True:
-        logger.info("[Scheduler] Checking services...")
-        start = time.perf_counter()
-
-        # Fetch active services
-        db = SessionLocal()
-        try:
-            services = db.query(Service).filter(Service.is_active.is_(True)).all()
-        except Exception as e:
-            logger.exception("[Scheduler Error] Failed to fetch services: %s", e)
-            services = []
-        finally:
-            db.close()
-
-        if not services:
-            logger.info("[Scheduler] No active services to check.")
-            await asyncio.sleep(settings.poll_interval_seconds)
-            continue
-
-        # Group services by URL
-        url_to_services = defaultdict(list)
-        for service in services:
-            url_to_services[service.url].append(service)
-
-        try:
-            # Run checks once per unique URL
-            check_tasks = [
-                check_service(
-                    url,
-                    keyword=url_to_services[url][0].keyword,
-                    slow_threshold_ms=settings.slow_threshold_ms,
-                )
-                for url in url_to_services
-            ]
-            url_results = await asyncio.wait_for(
-                asyncio.gather(*check_tasks, return_exceptions=True),
-                timeout=settings.poll_timeout_seconds,
+async def _fetch_active_services() -> dict[int, Service] | None:
+    """The active services by id, or None when the database could not be read."""
+    try:
+        async with AsyncSessionLocal() as db:
+            services = await get_active_services_async(db)
+    except Exception as e:
+        logger.exception("[Scheduler Error] Failed to fetch services: %s", e)
+        return None
+    return {service.id: service for service in services}
+
+
+async def refresh_services(services: dict[int, Service], deadlines: DeadlineHeap, now: float) -> dict[int, Service]:
+    """Reload the active services into ``deadlines`` and return them.
+
+    When the database cannot be read the current services and schedule are
+    kept, so a database outage never stops probing (results go to the
+    journal meanwhile).
+    """
+    fetched = await _fetch_active_services()
+    if fetched is None:
+        logger.warning("[Scheduler] Keeping the %d known services until the database is back.", len(services))
+        return services
+    deadlines.sync({s.id: (s.url, float(s.interval_seconds)) for s in fetched.values()}, now)
+    await configure_pool({origin_of(s.url) for s in fetched.values()})
+    if not fetched:
+        logger.info("[Scheduler] No active services to check.")
+    return fetched
+
+
+async def _probe_group(url: str, group: list[Service]) -> tuple[str, Probe | None]:
+    """Probe ``url`` once for every service sharing it, with the most lenient of their settings."""
+    try:
+        probe = await probe_url(
+            url,
+            keywords=frozenset(s.keyword for s in group if s.keyword),
+            retries=max(s.retries for s in group),
+            timeout=max((s.timeout or settings.http_timeout_seconds) for s in group),
+        )
+    except Exception as exc:
+        logger.exception("[Check Error] %s: %s", url, exc)
+        probe = None
+    return url, probe
+
+
+def _judge(
+    url: str, group: list[Service], probe: Probe | None, checked_at: datetime
+) -> list[tuple[Service, CheckResult]]:
+    """Each service's own verdict on a shared probe (None means the probe itself failed)."""
+    results = []
+    phases = NO_PHASES
+    for service in group:
+        if probe is None:
+            status, response_time = ServiceState.ERROR, None
+        else:
+            code, response_time, found, phases = probe
+            status = classify_status(
+                code,
+                response_time,
+                service.keyword,
+                None,
+                settings.slow_threshold_ms,
+                keyword_found=service.keyword in found,
             )
+            log_verdict(url, code, status, response_time, service.keyword)
+        results.append((service, CheckResult(service.id, status, response_time, phases, checked_at)))
+    return results
+
+
+def _salvage(tasks: list[asyncio.Task], unjudged: dict[str, list[Service]]) -> list[tuple[str, Probe]]:
+    """Probes for the URLs still unjudged at the deadline.
+
+    Keeps results that finished right at the deadline but were not consumed
+    yet; the rest count as unreachable.
+    """
+    finished = dict(task.result() for task in tasks if task.done() and not task.cancelled())
+    unreachable = Probe(None, None, frozenset(), NO_PHASES)
+    return [(url, finished[url] if url in finished else unreachable) for url in unjudged]
+
+
+async def iter_service_checks(
+    services: list[Service], checked_at: datetime
+) -> AsyncIterator[tuple[Service, CheckResult]]:
+    """Check ``services`` (one request per unique URL), yielding each result as its URL completes.
+
+    Each URL is fetched once and its body scanned for every distinct keyword
+    of the services sharing it, so each service gets its own verdict. Checks
+    still running after ``poll_timeout_seconds`` are cancelled and reported
+    as UNREACHABLE, so one slow upstream never holds back the rest. Closing
+    the generator early cancels the checks still running.
+    """
+    # Group services by URL
+    unjudged = defaultdict(list)
+    for service in services:
+        unjudged[service.url].append(service)
+
+    tasks = [asyncio.create_task(_probe_group(url, group)) for url, group in unjudged.items()]
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=settings.poll_timeout_seconds):
+            url, probe = await next_done
+            for item in _judge(url, unjudged.pop(url), probe, checked_at):
+                yield item
+    except asyncio.TimeoutError:
+        logger.warning(
+            "[Scheduler] %d of %d checks still running after %ss; recording them as unreachable.",
+            len(unjudged),
+            len(tasks),
+            settings.poll_timeout_seconds,
+        )
+        for url, probe in _salvage(tasks, unjudged):
+            for item in _judge(url, unjudged.pop(url), probe, checked_at):
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def check_due_services(services: list[Service]) -> Counter:
+    """Check a batch of due services, handing results to the result writer as each URL completes.
+
+    Every result of the batch shares the batch's ``checked_at``.
+    """
+    status_counter = Counter()
+    async for _, result in iter_service_checks(services, datetime.now(timezone.utc)):
+        status_counter[result.status] += 1
+        await result_writer.put(result)
+    return status_counter
+
+
+def take_due_services(
+    deadlines: DeadlineHeap, services: dict[int, Service], checking: set[int], now: float
+) -> list[Service]:
+    """The services due at ``now``, minus those whose previous check is still running.
+
+    A service still being checked skips its slot instead of stacking another
+    probe (and another result row) on a slow or hanging URL.
+    """
+    due: list[Service] = []
+    for service_id in deadlines.pop_due(now):
+        if service_id in checking:
+            logger.debug("[Scheduler] Service %d is still being checked; skipping this slot.", service_id)
+        else:
+            due.append(services[service_id])
+    return due
 
-            # Prepare batch results
-            results_batch = []
-            status_counter = Counter()
-
-            for url, result in zip(url_to_services.keys(), url_results):
-                if isinstance(result, Exception):
-                    logger.exception("[Check Error] %s: %s", url, result)
-                    status, response_time = ServiceState.ERROR, None
-                else:
-                    status, response_time = result
 
-                status_counter[status] += len(url_to_services[url])
-                for service in url_to_services[url]:
-                    results_batch.append((service.id, status, response_time))
-
-            # Store all results in one DB commit
-            await store_results_batch(results_batch)
+async def poll_services():
+    """Dispatch each active service's check when it is due, per its own interval.
 
-            elapsed = time.perf_counter() - start
-            status_summary = ", ".join(f"{count} {status}" for status, count in status_counter.items())
-            logger.info(f"[Scheduler] Checked {len(services)} services in {elapsed:.2f}s → {status_summary}")
+    The active service set is reloaded every ``poll_interval_seconds``; between
+    reloads the loop sleeps until the next deadline in the heap.
+    """
+    global last_scheduler_run
+    loop = asyncio.get_running_loop()
+    deadlines = DeadlineHeap()
+    services: dict[int, Service] = {}
+    # Running batches and the service ids each one is checking
+    in_flight: dict[asyncio.Task, list[int]] = {}
+    checking: set[int] = set()
+    status_counter = Counter()
+    next_refresh = loop.time()
+
+    def _on_batch_done(task: asyncio.Task) -> None:
+        global last_scheduler_run
+        checking.difference_update(in_flight.pop(task))
+        if not task.cancelled() and task.exception() is None:
+            status_counter.update(task.result())
             last_scheduler_run = time.time()
 
-        except asyncio.TimeoutError:
-            logger.warning("[Scheduler] Timeout while checking services.")
-
-        # Perform cleanup at the end of each poll
-        await asyncio.to_thread(cleanup_old_statuses, days=30)
-
-        await asyncio.sleep(settings.poll_interval_seconds)
+    try:
+        while True:
+            now = loop.time()
+            if now >= next_refresh:
+                if status_counter:
+                    status_summary = ", ".join(f"{count} {status}" for status, count in status_counter.items())
+                    logger.info(f"[Scheduler] Checked {sum(status_counter.values())} services → {status_summary}")
+                    status_counter.clear()
+
+                services = await refresh_services(services, deadlines, now)
+                last_scheduler_run = time.time()
+                next_refresh = loop.time() + settings.poll_interval_seconds
+
+            due = take_due_services(deadlines, services, checking, loop.time())
+            if due:
+                task = asyncio.create_task(check_due_services(due))
+                in_flight[task] = [service.id for service in due]
+                checking.update(in_flight[task])
+                task.add_done_callback(_on_batch_done)
+
+            next_due = deadlines.next_due()
+            wake_at = next_refresh if next_due is None else min(next_due, next_refresh)
+            await asyncio.sleep(max(0.0, wake_at - loop.time()))
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,200 @@
+# app/services/segments.py
+"""Compressed columnar segment files for archived status history.
+
+Layout: ``MAGIC``, then one zlib-compressed chunk per column per row group,
+then a JSON footer, its length (uint32, little endian) and ``MAGIC`` again.
+The footer holds the column types, the segment's min/max ``service_id`` and
+``checked_at``, and per row group the same bounds plus each chunk's offset.
+Rows are sorted by (service_id, checked_at), so a reader skips row groups by
+their bounds and bisects inside the ones it keeps; only the requested
+columns are decompressed, straight out of a read-only memory map.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+
+MAGIC = b"SUSEG1\n"
+TRAILER = struct.Struct("<I")
+
+# column -> array typecode; timestamps are epoch milliseconds
+COLUMNS = {
+    "service_id": "q",
+    "checked_at": "q",  # delta-encoded within a row group
+    "last_seen": "q",  # offset from checked_at, -1 when unset
+    "sample_count": "q",
+    "status": "B",  # index into the footer's status dictionary
+    "response_time": "d",  # NaN when unset
+    "dns_ms": "d",
+    "connect_ms": "d",
+    "tls_ms": "d",
+    "ttfb_ms": "d",
+    "download_ms": "d",
+}
+FLOAT_COLUMNS = tuple(name for name, typecode in COLUMNS.items() if typecode == "d")
+
+
+def _encode(typecode: str, values: list) -> bytes:
+    data = array(typecode, values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return zlib.compress(data.tobytes(), 6)
+
+
+def _decode(typecode: str, chunk: bytes) -> array:
+    data = array(typecode)
+    data.frombytes(zlib.decompress(chunk))
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data
+
+
+class SegmentWriter:
+    """Streams row groups into ``path`` (written as ``path.tmp`` and renamed on ``close``).
+
+    Each row group is a dict of equal-length column lists in the encoded form
+    of ``COLUMNS`` except for ``checked_at`` (absolute ms) and ``status``
+    (strings); rows must already be sorted by (service_id, checked_at).
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._tmp, "wb")
+        self._file.write(MAGIC)
+        self._statuses: dict[str, int] = {}
+        self._row_groups: list[dict] = []
+
+    def write_row_group(self, columns: dict[str, list]) -> None:
+        service_ids, checked_at = columns["service_id"], columns["checked_at"]
+        columns = {
+            **columns,
+            "checked_at": [checked_at[0], *(b - a for a, b in itertools.pairwise(checked_at))],
+            "status": [self._statuses.setdefault(status, len(self._statuses)) for status in columns["status"]],
+        }
+        chunks = {}
+        for name, typecode in COLUMNS.items():
+            chunk = _encode(typecode, columns[name])
+            chunks[name] = [self._file.tell(), len(chunk)]
+            self._file.write(chunk)
+        self._row_groups.append(
+            {
+                "rows": len(service_ids),
+                "service_id": [service_ids[0], service_ids[-1]],
+                "checked_at": [min(checked_at), max(checked_at)],
+                "chunks": chunks,
+            }
+        )
+
+    def close(self) -> None:
+        groups = self._row_groups
+        footer = json.dumps(
+            {
+                "columns": COLUMNS,
+                "statuses": list(self._statuses),
+                "rows": sum(group["rows"] for group in groups),
+                "service_id": [groups[0]["service_id"][0], groups[-1]["service_id"][1]] if groups else None,
+                "checked_at": (
+                    [min(g["checked_at"][0] for g in groups), max(g["checked_at"][1] for g in groups)]
+                    if groups
+                    else None
+                ),
+                "row_groups": groups,
+            },
+            separators=(",", ":"),
+        ).encode()
+        self._file.write(footer)
+        self._file.write(TRAILER.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class Segment:
+    """Read-only view of one segment file through a memory map."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        tail = len(self._map) - len(MAGIC)
+        if self._map[: len(MAGIC)] != MAGIC or self._map[tail:] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a segment file")
+        (length,) = TRAILER.unpack(self._map[tail - TRAILER.size : tail])
+        self.footer = json.loads(self._map[tail - TRAILER.size - length : tail - TRAILER.size])
+
+    def __enter__(self) -> Segment:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def overlaps(self, service_id: int, start_ms: int, end_ms: int) -> bool:
+        bounds = self.footer["service_id"], self.footer["checked_at"]
+        return _overlaps(*bounds, service_id, start_ms, end_ms) if bounds[0] else False
+
+    def _column(self, group: dict, name: str) -> array:
+        offset, length = group["chunks"][name]
+        return _decode(self.footer["columns"][name], self._map[offset : offset + length])
+
+    def read(self, service_id: int, start_ms: int, end_ms: int, fields: list[str]) -> dict[str, list]:
+        """Columns in ``fields`` for one service's rows with start_ms <= checked_at < end_ms.
+
+        Timestamps come back as epoch ms, ``status`` as its string and unset
+        values as None.
+        """
+        out: dict[str, list] = {name: [] for name in fields}
+        for group in self.footer["row_groups"]:
+            if not _overlaps(group["service_id"], group["checked_at"], service_id, start_ms, end_ms):
+                continue
+            service_ids = self._column(group, "service_id")
+            low, high = bisect.bisect_left(service_ids, service_id), bisect.bisect_right(service_ids, service_id)
+            checked_at = list(itertools.accumulate(self._column(group, "checked_at")))
+            # Within one service the rows are in checked_at order
+            first = bisect.bisect_left(checked_at, start_ms, low, high)
+            low, high = first, bisect.bisect_left(checked_at, end_ms, first, high)
+            if low == high:
+                continue
+            for name in fields:
+                out[name].extend(self._values(group, name, checked_at, low, high))
+        return out
+
+    def _values(self, group: dict, name: str, checked_at: list[int], low: int, high: int) -> list:
+        if name == "checked_at":
+            return checked_at[low:high]
+        values = self._column(group, name)[low:high]
+        if name == "status":
+            statuses = self.footer["statuses"]
+            return [statuses[code] for code in values]
+        if name == "last_seen":
+            return [None if offset < 0 else at + offset for at, offset in zip(checked_at[low:high], values)]
+        if name in FLOAT_COLUMNS:
+            return [None if math.isnan(value) else value for value in values]
+        return values.tolist()
+
+
+def _overlaps(service_bounds: list, time_bounds: list, service_id: int, start_ms: int, end_ms: int) -> bool:
+    return (
+        service_bounds[0] <= service_id <= service_bounds[1] and time_bounds[0] < end_ms and time_bounds[1] >= start_ms
+    )
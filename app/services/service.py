@@ -1,21 +1,37 @@
 # app/services/service.py
 
+import asyncio
+import base64
+import binascii
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.service import Service, ServiceState, ServiceStatus
 from app.repositories.service import (
     delete,
+    find_user_services_async,
+    get_latest_status_async,
     get_service_by_id,
+    get_service_by_id_async,
     get_service_by_url_and_user,
     get_services_by_user_id,
     get_status_history,
     save_service,
-    save_status,
     update,
 )
-from app.schemas.service import ServiceIn, ServiceOut, ServiceUpdate
+from app.schemas.service import ServiceCheckIn, ServiceIn, ServiceOut, ServiceUpdate
+from app.services.archive import ARCHIVE_FIELDS, read_archive
+from app.services.batch_check import stream_checks
 from app.services.checker import check_service
+from app.services.export import export_status_history
+from app.services.rollups import window_stats
+from app.services.status_cache import status_cache
+from app.services.writer import CheckResult, result_writer
 
 
 def register_service_url(
@@ -26,8 +42,17 @@ def register_service_url(
         raise HTTPException(
             status_code=400, detail="Service already regsitered"
         )
-    new_service = Service(name=data.name, url=str(data.url), user_id=user_id, keyword=data.keyword)
+    new_service = Service(
+        name=data.name,
+        url=str(data.url),
+        user_id=user_id,
+        keyword=data.keyword,
+        interval_seconds=data.interval_seconds,
+        timeout=data.timeout,
+        retries=data.retries,
+    )
     saved_service = save_service(new_service, db)
+    status_cache.bump()
     return saved_service
 
 
@@ -47,6 +72,7 @@ def update_service(
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(service, field, value)
     updated_service = update(service, db)
+    status_cache.bump()
     return updated_service
 
 
@@ -54,29 +80,155 @@ def delete_service(service_id: int, db: Session) -> None:
     service = get_service_by_id(service_id, db)
     if not service:
         raise HTTPException(status_code=404, detail="Service not registered")
-    return delete(service, db)
+    delete(service, db)
+    status_cache.bump()
 
 
-async def check_service_status(service_id: int, db: Session):
-    service = get_service_by_id(service_id, db)
+async def check_service_status(service_id: int, db: AsyncSession):
+    service = await get_service_by_id_async(service_id, db)
     if not service:
         raise HTTPException(status_code=404, detail="Service not registered")
-    status_str, response_time = await check_service(service.url)
+    status_str, response_time, phases = await check_service(
+        service.url,
+        retries=service.retries,
+        keyword=service.keyword,
+        slow_threshold_ms=settings.slow_threshold_ms,
+        timeout=service.timeout,
+    )
     try:
         status_enum = ServiceState(status_str)
     except ValueError:
         raise HTTPException(
             status_code=500, detail=f"Invalid status: {status_str}"
         )
-    new_status = ServiceStatus(
-        status=status_enum, response_time=response_time, service_id=service_id
+    result = CheckResult(
+        service_id,
+        status_enum,
+        response_time,
+        phases,
+        datetime.now(timezone.utc),
+    )
+    # Same write path as scheduled checks (rollups, change-only history,
+    # journal); shielded so a client that hangs up still gets it stored
+    stored = await asyncio.shield(
+        asyncio.ensure_future(result_writer.write([result]))
+    )
+    if not stored:
+        raise HTTPException(
+            status_code=503,
+            detail="Database unavailable; the result was journaled",
+        )
+    return await get_latest_status_async(service_id, db)
+
+
+def _name_like(pattern: str) -> str:
+    """Shell-style ``*``/``?`` pattern to an escaped SQL LIKE pattern."""
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "%").replace("?", "_")
+
+
+async def check_services_now(data: ServiceCheckIn, user_id: int, fmt: str, db: AsyncSession) -> AsyncIterator[bytes]:
+    """Select the user's services to check; the returned stream runs the checks."""
+    limit = settings.check_batch_max_services
+    if data.ids is not None and len(data.ids) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} services per check")
+    services = await find_user_services_async(
+        user_id,
+        db,
+        ids=data.ids,
+        name_like=_name_like(data.name) if data.name else None,
+        active_only=data.active_only,
+        limit=limit + 1,
     )
-    saved_status = save_status(new_status, db)
-    return saved_status
+    if not services:
+        raise HTTPException(status_code=404, detail="No matching services")
+    if len(services) > limit:
+        raise HTTPException(status_code=400, detail=f"More than {limit} services match; narrow the selection")
+    missing = sorted(set(data.ids or ()) - {service.id for service in services})
+    return stream_checks(services, missing, fmt)
+
+
+def encode_cursor(status: ServiceStatus) -> str:
+    return base64.urlsafe_b64encode(f"{status.checked_at.isoformat()}|{status.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        checked_at, _, status_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(checked_at), int(status_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _check_range(start: datetime | None, end: datetime | None) -> None:
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
 
 
-def get_service_status_history(service_id: int, db: Session):
+def get_service_status_history(
+    service_id: int,
+    db: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 10,
+) -> tuple[list[ServiceStatus], str | None]:
+    """One newest-first page of history and the cursor for the next page (None on the last)."""
     service = get_service_by_id(service_id, db)
     if not service:
         raise HTTPException(status_code=404, detail="Service not registered")
-    return get_status_history(service_id, db)
+    _check_range(start, end)
+    before = decode_cursor(cursor) if cursor else None
+    statuses = get_status_history(service_id, db, start, end, before, limit)
+    return statuses, encode_cursor(statuses[-1]) if len(statuses) == limit else None
+
+
+async def get_service_status_export(
+    service_id: int, start: datetime | None, end: datetime | None, fmt: str, db: AsyncSession
+) -> AsyncIterator[bytes]:
+    service = await get_service_by_id_async(service_id, db)
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not registered")
+    _check_range(start, end)
+    return export_status_history(service_id, start, end, fmt)
+
+
+async def get_service_uptime(
+    service_id: int, start: datetime | None, end: datetime | None, db: AsyncSession
+) -> dict:
+    service = await get_service_by_id_async(service_id, db)
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not registered")
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return await window_stats(service_id, start, end, db)
+
+
+async def get_archived_statuses(
+    service_id: int, start: datetime | None, end: datetime | None, fields: list[str] | None, db: AsyncSession
+) -> dict:
+    service = await get_service_by_id_async(service_id, db)
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not registered")
+    if not settings.archive_dir:
+        raise HTTPException(status_code=404, detail="Archive is disabled")
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    fields = fields or list(ARCHIVE_FIELDS)
+    unknown = sorted(set(fields) - set(ARCHIVE_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # Segment reads are file I/O and decompression; keep them off the event loop
+    rows, scanned = await asyncio.to_thread(read_archive, service_id, start, end, fields)
+    return {
+        "service_id": service_id,
+        "start": start,
+        "end": end,
+        "fields": fields,
+        "segments_scanned": scanned,
+        "rows": rows,
+    }
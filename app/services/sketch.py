@@ -0,0 +1,86 @@
+# app/services/sketch.py
+"""DDSketch: a mergeable quantile sketch with relative-error guarantees."""
+
+from __future__ import annotations
+
+import math
+import struct
+from itertools import chain
+
+
+class DDSketch:
+    """Quantile sketch over non-negative values (latencies in ms).
+
+    Values are counted in logarithmic bins so any quantile is returned within
+    ``relative_accuracy`` of the true value, and two sketches built with the
+    same accuracy merge by adding bin counts. When more than ``max_bins`` bins
+    are in use the lowest ones are collapsed, which only affects the lowest
+    quantiles.
+    """
+
+    __slots__ = ("relative_accuracy", "max_bins", "_gamma", "_log_gamma", "bins", "zero_count", "count")
+
+    MIN_VALUE = 1e-6  # smaller values land in the zero bin
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: DDSketch) -> None:
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = keys[: len(keys) - self.max_bins + 1]
+        self.bins[excess[-1]] = sum(self.bins.pop(key) for key in excess[:-1]) + self.bins[excess[-1]]
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self._gamma**key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+    def to_bytes(self) -> bytes:
+        """Little-endian ``zero_count`` followed by (key, count) int32 pairs."""
+        keys = sorted(self.bins)
+        return struct.pack(
+            f"<i{2 * len(keys)}i", self.zero_count, *chain.from_iterable((key, self.bins[key]) for key in keys)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, relative_accuracy: float = 0.01, max_bins: int = 2048) -> DDSketch:
+        sketch = cls(relative_accuracy, max_bins)
+        values = struct.unpack(f"<{len(data) // 4}i", data)
+        sketch.zero_count = values[0]
+        sketch.bins = dict(zip(values[1::2], values[2::2]))
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
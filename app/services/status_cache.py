@@ -0,0 +1,88 @@
+# app/services/status_cache.py
+"""Response cache for the public status endpoints, invalidated by a results generation counter."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+
+class CachedBody(NamedTuple):
+    generation: int
+    body: bytes
+    etag: str  # strong validator: quoted hash of the body
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class ResponseCache:
+    """Rendered response bodies that stay valid until the next ``bump()``.
+
+    The result writer bumps the generation after every committed batch, and
+    the service routes after edits. ``get()`` serves the cached body while
+    its generation is current. Otherwise one task rebuilds it, and every
+    request that arrives meanwhile awaits that same task (single flight),
+    so a burst of traffic after a write costs one query, not one per
+    request. The task is shielded, so a disconnecting caller does not
+    cancel the rebuild for the others.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._entries: dict[str, CachedBody] = {}
+        self._rebuilds: dict[str, tuple[int, asyncio.Task]] = {}
+        self.stats: Counter[str] = Counter()
+
+    def bump(self) -> None:
+        self.generation += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._rebuilds.clear()
+
+    async def get(self, key: str, build: Callable[[], Awaitable[bytes]]) -> CachedBody:
+        generation = self.generation
+        entry = self._entries.get(key)
+        if entry is not None and entry.generation == generation:
+            self.stats["hits"] += 1
+            return entry
+        rebuild = self._rebuilds.get(key)
+        if rebuild is not None and rebuild[0] == generation:
+            self.stats["coalesced"] += 1
+            task = rebuild[1]
+        else:
+            self.stats["rebuilds"] += 1
+            task = asyncio.create_task(self._rebuild(key, generation, build))
+            self._rebuilds[key] = (generation, task)
+        return await asyncio.shield(task)
+
+    async def _rebuild(self, key: str, generation: int, build: Callable[[], Awaitable[bytes]]) -> CachedBody:
+        try:
+            body = await build()
+            entry = CachedBody(generation, body, _etag(body))
+            current = self._entries.get(key)
+            if current is None or current.generation <= generation:
+                self._entries[key] = entry
+            return entry
+        finally:
+            if self._rebuilds.get(key, (None, None))[1] is asyncio.current_task():
+                del self._rebuilds[key]
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "generation": self.generation, "entries": len(self._entries)}
+
+
+def if_none_match(header: str | None, etag: str) -> bool:
+    """True when an ``If-None-Match`` header matches ``etag`` (weak comparison, per RFC 9110)."""
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+status_cache = ResponseCache()
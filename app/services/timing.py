@@ -0,0 +1,57 @@
+# app/services/timing.py
+"""Per-phase request timing collected from httpcore trace events."""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+
+# Order of the compact phase tuple carried with each result (milliseconds, None = not performed)
+PHASES = ("dns", "connect", "tls", "ttfb", "download")
+PHASE_COLUMNS = tuple(f"{phase}_ms" for phase in PHASES)
+
+Phases = tuple[float | None, float | None, float | None, float | None, float | None]
+NO_PHASES: Phases = (None, None, None, None, None)
+
+
+class PhaseTimer:
+    """Collects timestamps for one request attempt.
+
+    ``trace`` is passed as httpx's ``trace`` extension and only records a
+    timestamp per event, so it is cheap enough to stay always-on. DNS time is
+    reported separately by the caching network backend through ``current_timer``.
+    Connect, TLS and DNS are absent when the request reused a pooled connection.
+    """
+
+    __slots__ = ("dns", "_marks")
+
+    def __init__(self) -> None:
+        self.dns: float | None = None
+        self._marks: dict[str, float] = {}
+
+    async def trace(self, event: str, info: dict) -> None:
+        # "connection.connect_tcp.started" -> "connect_tcp.started" (same for http11./http2.)
+        self._marks[event.partition(".")[2]] = time.perf_counter()
+
+    def _span(self, start: str, end: str) -> float | None:
+        marks = self._marks
+        if start in marks and end in marks:
+            return (marks[end] - marks[start]) * 1000
+        return None
+
+    def phases(self, finished_at: float) -> Phases:
+        """Phase durations in ms; ``finished_at`` is when the body read ended (perf_counter)."""
+        connect = self._span("connect_tcp.started", "connect_tcp.complete")
+        if connect is not None and self.dns is not None:
+            connect = max(connect - self.dns, 0.0)
+        headers_done = self._marks.get("receive_response_headers.complete")
+        return (
+            self.dns,
+            connect,
+            self._span("start_tls.started", "start_tls.complete"),
+            self._span("send_request_headers.started", "receive_response_headers.complete"),
+            (finished_at - headers_done) * 1000 if headers_done is not None else None,
+        )
+
+
+current_timer: ContextVar[PhaseTimer | None] = ContextVar("current_timer", default=None)
@@ -2,41 +2,45 @@
 
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import AsyncWriteSessionLocal
 from app.core.logging import logging
-from app.core.security import get_password_hash
+from app.core.security import password_pool
 from app.models.user import User
 from app.repositories.user import (
-    get_user_by_email,
-    get_user_by_username,
-    save_user,
+    get_user_by_email_async,
+    get_user_by_username_async,
+    save_user_async,
 )
 from app.schemas.auth import RegisterIn
 
 logger = logging.getLogger(__name__)
 
 
-def register_user(data: RegisterIn, db: Session) -> User:
-    if get_user_by_username(data.username, db):
+async def register_user(data: RegisterIn, db: AsyncSession) -> User:
+    if await get_user_by_username_async(data.username, db):
         logger.warning(
             f"Registration failed: Username '{data.username}' already exists."
         )
         raise HTTPException(
             status_code=400, detail="Username already registered"
         )
-    if get_user_by_email(data.email, db):
+    if await get_user_by_email_async(data.email, db):
         logger.warning(
             f"Registration failed: Email '{data.email}' already exists."
         )
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(data.password)
+    # Hand the connection back before the slow bcrypt hash
+    await db.close()
+    hashed_password = await password_pool.hash(data.password)
     user = User(
         **data.model_dump(exclude="password"),
         hashed_password=hashed_password,
     )
-    saved_user = save_user(user, db)
+    async with AsyncWriteSessionLocal() as write_db:
+        saved_user = await save_user_async(user, write_db)
     logger.info(
         f"New user registered: username='{user.username}', email='{user.email}'"
     )
@@ -0,0 +1,345 @@
+# app/services/workers.py
+"""Optional multi-process checker: shards probes across worker processes.
+
+Each worker runs its own event loop (uvloop when installed) with its own
+``httpx.AsyncClient``, concurrency semaphore and retry budget, so TLS
+handshakes and body decoding spread across CPU cores. URLs are sharded by
+host, the key the circuit breaker uses, so each host's breaker, per-origin
+limits and keep-alive connections live in a single worker. On every service
+refresh each worker sizes its keep-alive pool to its shard's origins, and
+workers report their checker counters back every ``STATS_INTERVAL_SECONDS``
+so ``/metrics`` covers all processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import threading
+import zlib
+from collections import Counter
+
+from app.core.config import settings
+from app.core.logging import logging
+from app.services import checker
+from app.services.hosts import host_of
+from app.services.timing import NO_PHASES, PHASES, Phases
+
+logger = logging.getLogger(__name__)
+
+# Compact wire formats: jobs are (job_id, url, keywords, retries, delay, timeout)
+# or the shard's set of origins, and results are (job_id, code, latency,
+# found_keywords, phases) or (None, worker_id, checker.counters()).
+Job = tuple[int, str, tuple[str, ...], int, float, float | None]
+Result = tuple[int, int | None, float | None, tuple[str, ...], Phases]
+Counters = tuple[None, int, dict]
+
+STATS_INTERVAL_SECONDS = 1.0
+# How often the parent checks that every worker process is still alive
+WATCH_INTERVAL_SECONDS = 1.0
+
+
+def _shard(url: str, workers: int) -> int:
+    return zlib.crc32(host_of(url).encode()) % workers
+
+
+def _split(total: int, parts: int) -> list[int]:
+    """``total`` shared out as evenly as possible, at least 1 each."""
+    return [max(1, total // parts + (index < total % parts)) for index in range(parts)]
+
+
+def _worker_main(worker_id: int, jobs: multiprocessing.Queue, results: multiprocessing.Queue, concurrency: int) -> None:
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(_worker_loop(worker_id, jobs, results, concurrency))
+    else:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(_worker_loop(worker_id, jobs, results, concurrency))
+
+
+async def _run_job(job: Job, results: multiprocessing.Queue) -> None:
+    job_id, url, keywords, retries, delay, timeout = job
+    try:
+        code, latency, found, phases = await checker.probe_url(url, frozenset(keywords), retries, delay, timeout)
+    except Exception:
+        logger.exception("[Worker] %s", url)
+        code, latency, found, phases = None, None, frozenset(), NO_PHASES
+    results.put((job_id, code, latency, tuple(found), phases))
+
+
+async def _report_counters(worker_id: int, results: multiprocessing.Queue) -> None:
+    while True:
+        await asyncio.sleep(STATS_INTERVAL_SECONDS)
+        results.put((None, worker_id, checker.counters()))
+
+
+async def _worker_loop(
+    worker_id: int, jobs: multiprocessing.Queue, results: multiprocessing.Queue, concurrency: int
+) -> None:
+    # This worker's share of poll_concurrency, so the cap holds across all workers
+    checker.semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    stopped = loop.create_future()
+    tasks: set[asyncio.Task] = set()
+
+    def _spawn(batch: list[Job | set[str]]) -> None:
+        for job in batch:
+            task = loop.create_task(checker.configure_pool(job) if isinstance(job, set) else _run_job(job, results))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    def _read_jobs() -> None:
+        # Blocking reads happen off the event loop; jobs are handed over in batches
+        while True:
+            batch = [jobs.get()]
+            while not jobs.empty() and batch[-1] is not None:
+                batch.append(jobs.get())
+            if batch[-1] is None:
+                loop.call_soon_threadsafe(_spawn, batch[:-1])
+                loop.call_soon_threadsafe(stopped.set_result, None)
+                return
+            loop.call_soon_threadsafe(_spawn, batch)
+
+    threading.Thread(target=_read_jobs, name="checker-jobs", daemon=True).start()
+    reporter = loop.create_task(_report_counters(worker_id, results))
+    await stopped
+    await asyncio.gather(*tasks, return_exceptions=True)
+    reporter.cancel()
+    results.put((None, worker_id, checker.counters()))
+    await checker.close_clients()
+
+
+class CheckerPool:
+    """Parent-side handle that dispatches probes to worker processes.
+
+    ``poll_concurrency`` is split across the workers. A watcher restarts any
+    worker that dies: the probes it was running fail at once (so they are
+    recorded as errors instead of waiting out the poll timeout), and the
+    replacement gets the shard's origins again. Each worker has its own
+    results queue, so one killed mid-write cannot wedge the others.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._concurrency = _split(settings.poll_concurrency, workers)
+        self._jobs: list[multiprocessing.Queue | None] = [None] * workers
+        self._processes: list[multiprocessing.Process | None] = [None] * workers
+        self._worker_ids: list[int] = [-1] * workers
+        self._results: list[multiprocessing.Queue | None] = [None] * workers
+        # job id -> (shard index, future)
+        self._pending: dict[int, tuple[int, asyncio.Future]] = {}
+        self._counters: dict[int, dict] = {}
+        # What dead workers had counted, so the totals never go backwards
+        self._retired: dict = {
+            "stats": Counter(),
+            "phase_totals": [0.0] * len(PHASES),
+            "phase_counts": [0] * len(PHASES),
+            "open_hosts": 0,
+            "keepalive_pool_size": 0,
+        }
+        self._origins: set[str] | None = None
+        self._ids = itertools.count()
+        self._spawned = itertools.count()
+        self._watcher: asyncio.Task | None = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        for index in range(self.workers):
+            self._spawn(index, loop)
+        self._watcher = loop.create_task(self._watch())
+        logger.info("[Workers] Started %d checker processes.", self.workers)
+
+    def _spawn(self, index: int, loop: asyncio.AbstractEventLoop) -> None:
+        worker_id = next(self._spawned)
+        jobs, results = self._context.Queue(), self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, jobs, results, self._concurrency[index]),
+            name=f"checker-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._jobs[index] = jobs
+        self._processes[index] = process
+        self._worker_ids[index] = worker_id
+        self._results[index] = results
+        reader = threading.Thread(
+            target=self._read_results, args=(loop, index, results), name=f"checker-results-{index}", daemon=True
+        )
+        reader.start()
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL_SECONDS)
+            for index, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                try:
+                    self._restart(index)
+                except Exception:
+                    logger.exception("[Workers] Could not restart %s; retrying.", process.name)
+
+    def _restart(self, index: int) -> None:
+        process = self._processes[index]
+        error = RuntimeError(f"{process.name} exited with code {process.exitcode}")
+        lost = [job_id for job_id, (shard, _) in self._pending.items() if shard == index]
+        logger.error("[Workers] %s; failing its %d probes and restarting it.", error, len(lost))
+        for job_id in lost:
+            _, future = self._pending.pop(job_id)
+            if not future.done():
+                future.set_exception(error)
+
+        retired = self._counters.pop(self._worker_ids[index], None)
+        if retired is not None:
+            self._retired["stats"].update(retired["stats"])
+            for i in range(len(PHASES)):
+                self._retired["phase_totals"][i] += retired["phase_totals"][i]
+                self._retired["phase_counts"][i] += retired["phase_counts"][i]
+
+        # Jobs still queued for the dead worker were failed above; its results
+        # reader notices the replacement and stops on its own
+        self._jobs[index].cancel_join_thread()
+        self._jobs[index].close()
+        self._spawn(index, asyncio.get_running_loop())
+        self.restarts += 1
+        if self._origins is not None:
+            self._jobs[index].put(self._shards(self._origins)[index])
+
+    def _read_results(self, loop: asyncio.AbstractEventLoop, index: int, results: multiprocessing.Queue) -> None:
+        while self._results[index] is results:
+            try:
+                batch = [results.get(timeout=WATCH_INTERVAL_SECONDS)]
+            except queue.Empty:
+                continue
+            while not results.empty() and batch[-1] is not None:
+                batch.append(results.get())
+            if batch[-1] is None:
+                loop.call_soon_threadsafe(self._resolve, batch[:-1])
+                return
+            loop.call_soon_threadsafe(self._resolve, batch)
+
+    def _resolve(self, batch: list[Result | Counters]) -> None:
+        for message in batch:
+            if message[0] is None:
+                # Late reports from a worker that was already replaced are dropped
+                if message[1] in self._worker_ids:
+                    self._counters[message[1]] = message[2]
+                continue
+            job_id, code, latency, found, phases = message
+            _, future = self._pending.pop(job_id, (None, None))
+            if future is not None and not future.done():
+                future.set_result(checker.Probe(code, latency, frozenset(found), phases))
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def worker_counters(self) -> list[dict]:
+        """The latest ``checker.counters()`` of each live worker, plus what dead ones had counted."""
+        return [*self._counters.values(), self._retired]
+
+    def _shards(self, origins: set[str]) -> list[set[str]]:
+        shards: list[set[str]] = [set() for _ in range(self.workers)]
+        for origin in origins:
+            shards[_shard(origin, self.workers)].add(origin)
+        return shards
+
+    def configure_pool(self, origins: set[str]) -> None:
+        """Send each worker the origins of its shard to size its keep-alive pool."""
+        self._origins = origins
+        for jobs, shard in zip(self._jobs, self._shards(origins)):
+            jobs.put(shard)
+
+    async def probe_url(
+        self,
+        url: str,
+        keywords: frozenset[str] = frozenset(),
+        retries: int = 3,
+        delay: float = 0.5,
+        timeout: float | None = None,
+    ) -> checker.Probe:
+        job_id = next(self._ids)
+        index = _shard(url, self.workers)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = index, future
+        self._jobs[index].put((job_id, url, tuple(keywords), retries, delay, timeout))
+        try:
+            return await future
+        finally:
+            self._pending.pop(job_id, None)
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process, results in zip(self._processes, self._results):
+            await asyncio.to_thread(process.join, settings.http_timeout_seconds)
+            if process.is_alive():
+                process.terminate()
+            elif process.exitcode == 0:
+                # Lets the reader pick up the worker's final counters first
+                results.put(None)
+        for _, future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        logger.info("[Workers] Stopped checker processes.")
+
+
+checker_pool: CheckerPool | None = None
+
+
+async def start_checker_pool() -> None:
+    """Start the worker processes when ``checker_workers`` is set."""
+    global checker_pool
+    if settings.checker_workers > 0:
+        checker_pool = CheckerPool(settings.checker_workers)
+        checker_pool.start()
+
+
+async def stop_checker_pool() -> None:
+    global checker_pool
+    if checker_pool is not None:
+        await checker_pool.stop()
+        checker_pool = None
+
+
+async def probe_url(
+    url: str,
+    keywords: frozenset[str] = frozenset(),
+    retries: int = 3,
+    delay: float = 0.5,
+    timeout: float | None = None,
+) -> checker.Probe:
+    """Probe through the worker processes when they are running, else in-process."""
+    if checker_pool is not None:
+        return await checker_pool.probe_url(url, keywords, retries, delay, timeout)
+    return await checker.probe_url(url, keywords, retries, delay, timeout)
+
+
+async def configure_pool(origins: set[str]) -> None:
+    """Size the keep-alive pools to the monitored origins, each worker's to its own shard.
+
+    This process's pool is sized too; manual checks of a single service still run here.
+    """
+    if checker_pool is not None:
+        checker_pool.configure_pool(origins)
+    await checker.configure_pool(origins)
+
+
+def worker_counters() -> list[dict]:
+    """Checker counters reported by the worker processes, for ``checker.checker_stats``."""
+    return checker_pool.worker_counters if checker_pool else []
+
+
+def pool_stats() -> dict:
+    return {
+        "workers": checker_pool.workers if checker_pool else 0,
+        "in_flight": checker_pool.in_flight if checker_pool else 0,
+    }
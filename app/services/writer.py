@@ -0,0 +1,352 @@
+# app/services/writer.py
+"""Result writer: persists check results in micro-batches as they complete."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy.exc import DBAPIError, DisconnectionError, OperationalError
+
+from app.core.config import settings
+from app.core.database import AsyncWriteSessionLocal
+from app.core.logging import logging
+from app.models.service import ServiceState
+from app.repositories.service import (
+    extend_statuses_async,
+    insert_statuses_async,
+    upsert_current_statuses_async,
+)
+from app.services.broadcast import status_hub
+from app.services.history import ChangeEncoder
+from app.services.journal import ResultJournal
+from app.services.rollups import open_buckets, record_rollups_async
+from app.services.status_cache import status_cache
+from app.services.timing import NO_PHASES, PHASE_COLUMNS, Phases
+
+logger = logging.getLogger(__name__)
+
+
+class CheckResult(NamedTuple):
+    service_id: int
+    status: ServiceState
+    response_time: float | None
+    phases: Phases = NO_PHASES
+    checked_at: datetime | None = None  # stamped at write time when unset
+
+
+class BatchWrite(NamedTuple):
+    """Results queued to be written together; ``done`` resolves to True once committed."""
+
+    results: list[CheckResult]
+    done: asyncio.Future  # False when they were journaled (or dropped) instead
+
+
+def status_rows(results: list[CheckResult], checked_at: datetime) -> list[dict]:
+    """Plain parameter dicts for a Core insert into service_status."""
+    return [
+        {
+            "service_id": service_id,
+            "status": status,
+            "response_time": response_time,
+            "checked_at": result_checked_at or checked_at,
+            "last_seen": result_checked_at or checked_at,
+            "sample_count": 1,
+            **dict(zip(PHASE_COLUMNS, phases)),
+        }
+        for service_id, status, response_time, phases, result_checked_at in results
+    ]
+
+
+change_encoder = ChangeEncoder(settings.history_latency_band, settings.history_heartbeat_seconds)
+
+
+def to_record(result: CheckResult) -> list:
+    """Compact JSON form of a result for the journal."""
+    service_id, status, response_time, phases, checked_at = result
+    return [service_id, status.value, response_time, list(phases), checked_at.isoformat()]
+
+
+def from_record(record: list) -> CheckResult:
+    service_id, status, response_time, phases, checked_at = record
+    return CheckResult(
+        service_id, ServiceState(status), response_time, tuple(phases), datetime.fromisoformat(checked_at)
+    )
+
+
+async def store_results_batch(results: list[CheckResult]):
+    """Persist results (Core bulk insert), current statuses and rollups in one transaction.
+
+    History gets one row per result, or interval rows in ``history_mode="changes"``;
+    current statuses and rollups always see every result. Raises when the
+    transaction fails, after rolling back and resetting the in-memory caches.
+    """
+    rows = status_rows(results, datetime.now(timezone.utc))
+    async with AsyncWriteSessionLocal() as db:
+        try:
+            if settings.history_mode == "changes":
+                inserts, updates = change_encoder.encode(rows)
+                await insert_statuses_async(inserts, db)
+                await extend_statuses_async(updates, db)
+            else:
+                await insert_statuses_async(rows, db)
+            await upsert_current_statuses_async(rows, db)
+            await record_rollups_async(rows, db)
+            await db.commit()
+            status_hub.notify(row["service_id"] for row in rows)
+            status_cache.bump()
+        except Exception:
+            await db.rollback()
+            open_buckets.clear()
+            change_encoder.clear()
+            raise
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for failures of the database connection, which are worth retrying as they are.
+
+    Anything else (an IntegrityError for a deleted service, a DataError for
+    a bad row) fails the same way every time it is retried.
+    """
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (OperationalError, DisconnectionError, OSError, asyncio.TimeoutError))
+
+
+async def store_or_reject(records: list[list]) -> list[list]:
+    """Store journal records, splitting around those the database rejects outright.
+
+    Returns the rejected records. Transient errors propagate so the caller
+    retries the whole chunk later (replay is at-least-once anyway).
+    """
+    try:
+        await store_results_batch([from_record(record) for record in records])
+        return []
+    except Exception as error:
+        if is_transient(error):
+            raise
+        if len(records) == 1:
+            logger.error("[Journal] Rejecting result %s: %s", records[0], error)
+            return records
+    middle = len(records) // 2
+    return await store_or_reject(records[:middle]) + await store_or_reject(records[middle:])
+
+
+class ResultWriter:
+    """Single consumer of a bounded result queue.
+
+    Producers ``await put()`` each result as its check completes (blocking only
+    when the queue is full), and ``run()`` flushes whatever has accumulated once
+    ``batch_size`` results are queued or ``flush_interval`` seconds have passed,
+    so writes trickle out continuously instead of bursting at the end of a cycle.
+
+    With a ``journal``, a batch the database rejects is appended to it instead
+    of being dropped, and so is every later batch until a background task has
+    replayed the backlog in order. Appends are cheap, so the queue keeps
+    draining (and probes keep running) through a database outage.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.result_queue_size,
+        batch_size: int = settings.result_batch_size,
+        flush_interval: float = settings.result_flush_interval_seconds,
+        journal: ResultJournal | None = None,
+        replay_batch_size: int = settings.result_journal_replay_batch_size,
+        retry_interval: float = settings.result_journal_retry_seconds,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.replay_batch_size = replay_batch_size
+        self.retry_interval = retry_interval
+        self._queue: asyncio.Queue[CheckResult | BatchWrite] = asyncio.Queue(maxsize=maxsize)
+        self._replay: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def _persist(self, batch: list[CheckResult], done: asyncio.Future | None = None) -> None:
+        stored = False
+        try:
+            stored = await self._store(batch)
+        finally:
+            if done is not None and not done.done():
+                done.set_result(stored)
+
+    async def _store(self, batch: list[CheckResult]) -> bool:
+        """Write a batch, or journal it while the database is failing; True when it was committed."""
+        journal = self.journal
+        if journal is None:
+            try:
+                await store_results_batch(batch)
+                return True
+            except Exception:
+                logger.exception("Failed to persist some statuses.")
+            return False
+
+        # Stamp results now: a journaled result must keep the time it was checked, not replayed
+        now = datetime.now(timezone.utc)
+        batch = [result if result.checked_at else result._replace(checked_at=now) for result in batch]
+        if not journal.backlog:
+            try:
+                await store_results_batch(batch)
+                return True
+            except Exception:
+                logger.exception("[Journal] Database write failed; journaling results until it recovers.")
+        if not await journal.append([to_record(result) for result in batch]):
+            logger.error("[Journal] Journal is full; dropped %d results.", len(batch))
+        if self._replay is None or self._replay.done():
+            self._replay = asyncio.create_task(self._replay_journal())
+        return False
+
+    async def _replay_journal(self) -> None:
+        """Drain the journal into the database in large batches, retrying while it is down.
+
+        Records the database rejects for good are moved to the journal's
+        rejected file instead of being retried, so one bad row cannot hold
+        back everything queued behind it.
+        """
+        journal = self.journal
+        while journal.backlog:
+            records, offset = await journal.read(self.replay_batch_size)
+            started = time.perf_counter()
+            try:
+                rejected = await store_or_reject(records)
+            except Exception as error:
+                logger.warning(
+                    "[Journal] Replay failed (%d results pending): %s; retrying in %.0fs.",
+                    journal.pending,
+                    error,
+                    self.retry_interval,
+                )
+                await asyncio.sleep(self.retry_interval)
+                continue
+            await journal.consume(offset, len(records), time.perf_counter() - started, rejected)
+        logger.info("[Journal] Replay complete (%d results replayed so far).", journal.stats["replayed"])
+
+    async def _open_journal(self) -> None:
+        if self.journal is not None:
+            await self.journal.open()
+            if self.journal.backlog:
+                self._replay = asyncio.create_task(self._replay_journal())
+
+    async def _close_journal(self) -> None:
+        if self._replay is not None:
+            # Whatever is left stays in the journal for the next start
+            self._replay.cancel()
+            await asyncio.gather(self._replay, return_exceptions=True)
+        if self.journal is not None:
+            await self.journal.close()
+
+    def journal_stats(self) -> dict:
+        if self.journal is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.journal.snapshot()}
+
+    async def put(self, result: CheckResult) -> None:
+        await self._queue.put(result)
+
+    async def write(self, results: list[CheckResult]) -> bool:
+        """Queue ``results`` to be written as one transaction, after everything queued before them.
+
+        Returns True once they are committed, False when they went to the
+        journal (or were dropped) instead. Needs ``run()`` to be running.
+        """
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put(BatchWrite(results, done))
+        return await done
+
+    async def _fill(self, batch: list[CheckResult]) -> BatchWrite | None:
+        """Add queued results to ``batch`` until it is full or the flush interval passes.
+
+        Stops early at a ``BatchWrite`` and returns it, to be written after ``batch``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if isinstance(item, BatchWrite):
+                return item
+            batch.append(item)
+        return None
+
+    async def _drain(self) -> None:
+        """Write whatever is still queued, in order (used on shutdown)."""
+        batch: list[CheckResult] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if isinstance(item, BatchWrite):
+                if batch:
+                    await self._persist(batch)
+                    batch = []
+                await self._persist(item.results, item.done)
+            else:
+                batch.append(item)
+        if batch:
+            logger.info("[Writer] Flushing %d pending results on shutdown.", len(batch))
+            await self._persist(batch)
+
+    async def run(self) -> None:
+        """Flush micro-batches forever; on cancellation, flush what is still queued.
+
+        Results queued with ``write()`` end the micro-batch in progress and are
+        then written as a transaction of their own, so queue order is kept.
+        """
+        batch: list[CheckResult] = []
+        parked: BatchWrite | None = None
+        store: asyncio.Future | None = None
+        await self._open_journal()
+        try:
+            while True:
+                item = await self._queue.get()
+                if isinstance(item, BatchWrite):
+                    parked = item
+                else:
+                    batch.append(item)
+                    parked = await self._fill(batch)
+                # Hand each write off before awaiting so a cancel mid-write cannot flush it twice,
+                # and shield it so cancelling the writer does not abort a commit halfway
+                if batch:
+                    pending, batch = batch, []
+                    store = asyncio.ensure_future(self._persist(pending))
+                    await asyncio.shield(store)
+                if parked is not None:
+                    write, parked = parked, None
+                    store = asyncio.ensure_future(self._persist(write.results, write.done))
+                    await asyncio.shield(store)
+        except asyncio.CancelledError:
+            if store is not None:
+                await store
+            if batch:
+                await self._persist(batch)
+            if parked is not None:
+                await self._persist(parked.results, parked.done)
+            await self._drain()
+            await self._close_journal()
+            raise
+
+
+result_writer = ResultWriter(
+    journal=(
+        ResultJournal(
+            settings.result_journal_path,
+            fsync_interval=settings.result_journal_fsync_interval_seconds,
+            max_bytes=settings.result_journal_max_bytes,
+        )
+        if settings.result_journal_path
+        else None
+    )
+)
@@ -0,0 +1,130 @@
+# benchmarks/bench_archive.py
+"""Archive throughput, size on disk, and a one-service range read: hot table vs. segments.
+
+Seeds ``--days`` of per-minute history for ``--services`` services, times a
+30-day single-service read from ``service_status``, archives everything, then
+times the same read from the segment files (all columns, and two columns).
+
+Usage:
+    python -m benchmarks.bench_archive --services 200 --days 30
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from sqlalchemy import insert, select, text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine, async_write_engine  # noqa: E402
+from app.models.service import ServiceState, ServiceStatus  # noqa: E402
+from app.models.user import User  # noqa: E402, F401 (registers the users table)
+from app.services.archive import ARCHIVE_FIELDS, archive_old_statuses, read_archive  # noqa: E402
+
+ARCHIVE_DIR = "bench-archive"
+TABLE_BYTES = (
+    "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'service_status')"
+)
+
+
+async def _seed(services: int, days: int, start: datetime) -> int:
+    rng = random.Random(3)
+    rows = 0
+    async with AsyncSessionLocal() as db:
+        for minute in range(0, days * 24 * 60, 60):
+            batch = []
+            for offset in range(60):
+                checked_at = start + timedelta(minutes=minute + offset)
+                for service_id in range(1, services + 1):
+                    up = rng.random() > 0.01
+                    batch.append(
+                        {
+                            "service_id": service_id,
+                            "status": ServiceState.UP if up else ServiceState.DOWN,
+                            "response_time": rng.gauss(120, 15) if up else None,
+                            "checked_at": checked_at,
+                            "last_seen": checked_at,
+                            "sample_count": 1,
+                            "ttfb_ms": rng.gauss(80, 10) if up else None,
+                        }
+                    )
+            await db.execute(insert(ServiceStatus.__table__), batch)
+            rows += len(batch)
+        await db.commit()
+    return rows
+
+
+async def _hot_read(service_id: int, start: datetime, end: datetime) -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ServiceStatus)
+            .where(ServiceStatus.service_id == service_id)
+            .where(ServiceStatus.checked_at >= start, ServiceStatus.checked_at < end)
+            .order_by(ServiceStatus.checked_at)
+        )
+        return len(result.scalars().all())
+
+
+def _timed(function, repeat: int) -> tuple[float, object]:
+    timings, value = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start = now - timedelta(days=args.days + 8)
+    end = start + timedelta(days=args.days)
+    shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        rows = await _seed(args.services, args.days, start)
+        async with async_engine.connect() as conn:
+            table_bytes = await conn.scalar(text(TABLE_BYTES))
+        print(f"{rows} rows ({args.services} services x {args.days} days, 1/min)")
+        print(f"service_status + indexes: {table_bytes / 1e6:.1f} MB")
+
+        hot_ms = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            count = await _hot_read(1, start, end)
+            hot_ms.append((time.perf_counter() - started) * 1000)
+        print(f"hot table read, 1 service x {args.days} days : {statistics.median(hot_ms):8.1f} ms ({count} rows)")
+
+        moved, seconds = await archive_old_statuses(days=7, directory=ARCHIVE_DIR)
+        archive_bytes = sum(path.stat().st_size for path in Path(ARCHIVE_DIR).rglob("*.seg"))
+        print(f"archived {moved} rows in {seconds:.1f}s ({moved / seconds:.0f} rows/s)")
+        print(f"segments: {archive_bytes / 1e6:.1f} MB")
+        await async_write_engine.dispose()
+        await async_engine.dispose()
+
+    asyncio.run(bench())
+
+    for label, fields in (("all columns", list(ARCHIVE_FIELDS)), ("2 columns  ", ["checked_at", "status"])):
+        elapsed, (rows, scanned) = _timed(lambda: read_archive(1, start, end, fields, ARCHIVE_DIR), args.repeat)
+        print(f"archive read, {label}            : {elapsed:8.1f} ms ({len(rows)} rows, {scanned} segments)")
+    shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
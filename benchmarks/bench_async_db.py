@@ -0,0 +1,115 @@
+# benchmarks/bench_async_db.py
+"""Event-loop lag and queries per second: sync Session on the loop vs. AsyncSession.
+
+Runs the dashboard "latest status per service" query from ``--clients``
+concurrent tasks (as websocket handlers do) while a ticker task measures how
+late the loop wakes it up.
+
+Usage:
+    python -m benchmarks.bench_async_db --services 500 --statuses 40 --clients 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.models.service import Service, ServiceState, ServiceStatus  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.repositories.service import backfill_current_statuses  # noqa: E402
+from app.services.dashboard import (  # noqa: E402
+    get_services_with_latest_status,
+    get_services_with_latest_status_async,
+)
+
+TICK = 0.005
+
+
+def _seed(services: int, statuses: int) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        for index in range(services):
+            service = Service(name=f"svc-{index}", url=f"https://svc-{index}.example", user_id=user.id)
+            db.add(service)
+            db.flush()
+            db.add_all(
+                ServiceStatus(service_id=service.id, status=ServiceState.UP, checked_at=now - timedelta(minutes=n))
+                for n in range(statuses)
+            )
+        db.commit()
+        backfill_current_statuses(db)
+
+
+async def _sync_query() -> None:
+    with SessionLocal() as db:
+        get_services_with_latest_status(db)
+
+
+async def _async_query() -> None:
+    async with AsyncSessionLocal() as db:
+        await get_services_with_latest_status_async(db)
+
+
+async def _measure(query, clients: int, seconds: float) -> tuple[float, list[float]]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    lags: list[float] = []
+    done = 0
+
+    async def ticker() -> None:
+        while loop.time() < deadline:
+            expected = loop.time() + TICK
+            await asyncio.sleep(TICK)
+            lags.append((loop.time() - expected) * 1000)
+
+    async def client() -> None:
+        nonlocal done
+        while loop.time() < deadline:
+            await query()
+            done += 1
+            await asyncio.sleep(0)  # stands in for the websocket send
+
+    await asyncio.gather(ticker(), *(client() for _ in range(clients)))
+    return done / seconds, lags
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--statuses", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    _seed(args.services, args.statuses)
+    print(f"{args.services} services x {args.statuses} statuses, {args.clients} clients, {args.seconds}s per run")
+
+    async def bench() -> None:
+        await _async_query()  # warm up the async pool
+        for name, query in (("sync Session ", _sync_query), ("AsyncSession ", _async_query)):
+            rate, lags = await _measure(query, args.clients, args.seconds)
+            lags.sort()
+            print(
+                f"{name}: {rate:7.1f} queries/s | loop lag p50 {statistics.median(lags):7.1f} ms,"
+                f" p99 {lags[int(len(lags) * 0.99)]:7.1f} ms, max {lags[-1]:7.1f} ms ({len(lags)} ticks)"
+            )
+        await async_engine.dispose()
+
+    start = time.perf_counter()
+    asyncio.run(bench())
+    print(f"total {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_auth_cache.py
+"""Authentication overhead per request: token decode + user query vs. the token cache.
+
+Times ``get_current_user`` alone, then a full authenticated ``GET /services/``,
+for ``--tokens`` users cycling through their tokens, with the cache disabled
+(every request decodes the JWT and loads the user) and enabled.
+
+Usage:
+    python -m benchmarks.bench_auth_cache --requests 20000 --tokens 5
+"""
+
+import argparse
+import os
+import statistics
+import time
+from collections import Counter
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.dependencies import get_current_user  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.user_cache import user_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.service import Service  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def _seed(tokens: int) -> list[str]:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        # Enough other users that the email lookup is a real index probe
+        db.execute(
+            insert(User.__table__),
+            [
+                {"id": n, "username": f"user{n}", "email": f"user{n}@mailbox.org", "hashed_password": "x"}
+                for n in range(1, 10_001)
+            ],
+        )
+        db.execute(
+            insert(Service.__table__),
+            [{"name": f"svc-{n}", "url": f"https://svc-{n}.example", "user_id": n} for n in range(1, tokens + 1)],
+        )
+        db.commit()
+    return [create_access_token({"sub": f"user{n}@mailbox.org"}) for n in range(1, tokens + 1)]
+
+
+def _dependency(tokens: list[str], requests: int) -> list[float]:
+    timings = []
+    for n in range(requests):
+        started = time.perf_counter()
+        with SessionLocal() as db:  # what get_db hands the dependency
+            get_current_user(tokens[n % len(tokens)], db)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _endpoint(client: TestClient, tokens: list[str], requests: int) -> list[float]:
+    timings = []
+    for n in range(requests):
+        started = time.perf_counter()
+        response = client.get("/services/", headers={"Authorization": f"Bearer {tokens[n % len(tokens)]}"})
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--tokens", type=int, default=5)
+    args = parser.parse_args()
+    tokens = _seed(args.tokens)
+    client = TestClient(app)  # not entered: no lifespan, so no scheduler
+    print(f"{args.tokens} tokens, {args.requests} dependency calls, {args.requests // 10} requests per mode")
+
+    # Alternate the modes in rounds so drift over the run (WAL growth, allocator) hits both alike
+    modes = {"no cache": 0, "cache   ": 1024}
+    results = {label: ([], [], Counter()) for label in modes}
+    rounds = 20
+    for _ in range(rounds):
+        for label, maxsize in modes.items():
+            dependency, endpoint, stats = results[label]
+            user_cache.maxsize = maxsize
+            user_cache.clear()
+            user_cache.stats.clear()
+            dependency.extend(_dependency(tokens, args.requests // rounds))
+            endpoint.extend(_endpoint(client, tokens, args.requests // 10 // rounds))
+            stats.update(user_cache.stats)
+    for label, (dependency, endpoint, stats) in results.items():
+        print(
+            f"{label}: get_current_user {statistics.mean(dependency) * 1e6:7.1f} us"
+            f" | GET /services/ p50 {statistics.median(endpoint) * 1000:6.2f} ms"
+            f" | hit rate {stats['hits'] / (stats['hits'] + stats['misses']):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_batch_check.py
+"""Checking many services on demand: one ``GET /services/{id}/status`` each vs. ``POST /services/check``.
+
+Registers ``--services`` services against the fake farm (each upstream
+answers after ``--delay`` seconds), then checks all of them twice: with
+concurrent single-service requests, as a deploy pipeline would without the
+batch endpoint, and with one streamed batch check. Reports the wall time,
+when the first result arrived, and how many write transactions each took.
+
+Usage:
+    python -m benchmarks.bench_batch_check --services 300 --delay 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.core.database import Base, SessionLocal, async_engine, async_write_engine, engine  # noqa: E402
+from app.core.dependencies import get_current_user  # noqa: E402
+from app.core.user_cache import CurrentUser  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.service import Service  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.writer import result_writer  # noqa: E402
+from benchmarks.fake_farm import FakeFarm  # noqa: E402
+
+PORT = 8766
+
+
+def _seed(urls: list[str]) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.execute(
+            insert(User.__table__), [{"id": 1, "username": "u", "email": "u@mailbox.org", "hashed_password": "x"}]
+        )
+        db.execute(
+            insert(Service.__table__),
+            [{"id": n, "name": f"svc-{n}", "url": url, "user_id": 1, "retries": 1} for n, url in enumerate(urls, 1)],
+        )
+        db.commit()
+
+
+async def _one_per_request(client: httpx.AsyncClient, services: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    first: list[float] = []
+
+    async def check(service_id: int) -> None:
+        (await client.get(f"/services/{service_id}/status")).raise_for_status()
+        first.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(check(n) for n in range(1, services + 1)))
+    return time.perf_counter() - started, min(first)
+
+
+async def _batch(client: httpx.AsyncClient, services: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    first = None
+    async with client.stream("POST", "/services/check", json={"ids": list(range(1, services + 1))}) as response:
+        async for line in response.aiter_lines():
+            if first is None:
+                first = time.perf_counter() - started
+            if line and json.loads(line)["type"] == "done":
+                assert json.loads(line)["stored"], "batch was not stored"
+    return time.perf_counter() - started, first
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=300)
+    parser.add_argument("--delay", type=float, default=0.05, help="upstream response time (s)")
+    args = parser.parse_args()
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(1, "u", "u@mailbox.org", True, False)
+    commits = {"count": 0}
+    event.listen(
+        async_write_engine.sync_engine, "commit", lambda conn: commits.__setitem__("count", commits["count"] + 1)
+    )
+
+    with FakeFarm(ports=16, delay=args.delay) as farm:
+        _seed(farm.urls(args.services))
+
+        async def bench() -> None:
+            # A real server, so streamed lines reach the client as they are written; no lifespan, so no scheduler,
+            # and the result writer is started by hand
+            server = uvicorn.Server(uvicorn.Config(app, port=PORT, lifespan="off", log_level="warning"))
+            server_task = asyncio.create_task(server.serve())
+            writer_task = asyncio.create_task(result_writer.run())
+            while not server.started:
+                await asyncio.sleep(0.05)
+            limits = httpx.Limits(max_connections=None)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None, limits=limits) as client:
+                print(f"{args.services} services, upstreams answer in {args.delay * 1000:.0f} ms")
+                for name, run in (("one per request", _one_per_request), ("batch check    ", _batch)):
+                    before = commits["count"]
+                    elapsed, first = await run(client, args.services)
+                    print(
+                        f"{name}: {elapsed:.2f}s total | first result {first * 1000:.0f} ms"
+                        f" | {commits['count'] - before} write transactions"
+                    )
+            server.should_exit = True
+            await server_task
+            writer_task.cancel()
+            await asyncio.gather(writer_task, return_exceptions=True)
+            await async_write_engine.dispose()
+            await async_engine.dispose()
+
+        asyncio.run(bench())
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_bulk_import.py
+"""Service import: one ``POST /services/`` per service vs. ``POST /services/bulk``.
+
+Registers ``--legacy`` services one request at a time (the only way before
+the bulk endpoint), then imports ``--services`` services in a single bulk
+request as NDJSON, CSV and a JSON array, each for its own user, and finally
+re-sends the NDJSON body to time the all-duplicates path.
+
+Usage:
+    python -m benchmarks.bench_bulk_import --services 10000 --legacy 1000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import Base, SessionLocal, async_engine, async_write_engine, engine  # noqa: E402
+from app.core.dependencies import get_current_user  # noqa: E402
+from app.core.user_cache import CurrentUser  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+FORMATS = ("application/x-ndjson", "text/csv", "application/json")
+
+
+def _records(count: int, prefix: str) -> list[dict]:
+    return [
+        {"name": f"{prefix}-{n:05d}", "url": f"https://{prefix}-{n}.example/health", "interval_seconds": 60 + n % 240}
+        for n in range(count)
+    ]
+
+
+def _body(records: list[dict], media_type: str) -> bytes:
+    if media_type == "application/json":
+        return json.dumps(records).encode()
+    if media_type == "text/csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+        return buffer.getvalue().encode()
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+def _chunked(body: bytes, size: int = 64 * 1024):
+    async def chunks():
+        for start in range(0, len(body), size):
+            yield body[start : start + size]
+
+    return chunks()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=10_000)
+    parser.add_argument("--legacy", type=int, default=1000, help="services registered one request at a time")
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.execute(
+            insert(User.__table__),
+            [{"id": n, "username": f"u{n}", "email": f"u{n}@mailbox.org", "hashed_password": "x"} for n in range(1, 6)],
+        )
+        db.commit()
+    user = {"id": 1}
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(user["id"], "u", "u@mailbox.org", True, False)
+
+    async def bench() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            for record in _records(args.legacy, "one"):
+                (await client.post("/services/", json=record)).raise_for_status()
+            per_service = (time.perf_counter() - started) / args.legacy
+            print(
+                f"one per request: {args.legacy} in {per_service * args.legacy:.2f}s"
+                f" ({1 / per_service:.0f}/s, {args.services} would take ~{per_service * args.services:.0f}s)"
+            )
+
+            records = _records(args.services, "bulk")
+            for user_id, media_type in enumerate(FORMATS, start=2):
+                user["id"] = user_id
+                body = _body(records, media_type)
+                started = time.perf_counter()
+                response = await client.post(
+                    "/services/bulk", content=_chunked(body), headers={"Content-Type": media_type}
+                )
+                elapsed = time.perf_counter() - started
+                report = response.raise_for_status().json()
+                print(
+                    f"bulk {media_type:<20}: {report['created']} created in {elapsed:.2f}s"
+                    f" ({report['created'] / elapsed:.0f}/s, {len(body) / 1e6:.1f} MB)"
+                )
+
+            user["id"] = 2
+            body = _body(records, FORMATS[0])
+            started = time.perf_counter()
+            response = await client.post("/services/bulk", content=_chunked(body), headers={"Content-Type": FORMATS[0]})
+            elapsed = time.perf_counter() - started
+            print(f"bulk re-send (all exist): {response.json()['exists']} reported in {elapsed:.2f}s")
+        await async_write_engine.dispose()
+        await async_engine.dispose()
+
+    asyncio.run(bench())
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_export.py
+"""Peak Python memory and throughput of a history export: streamed vs. fully materialized.
+
+Usage:
+    python -m benchmarks.bench_export --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.models.service import ServiceState, ServiceStatus  # noqa: E402
+from app.models.user import User  # noqa: E402, F401 (registers the users table)
+from app.services.export import _ndjson, export_status_history  # noqa: E402
+
+
+async def _seed(rows: int) -> None:
+    start = datetime.now(timezone.utc) - timedelta(minutes=rows)
+    async with AsyncSessionLocal() as db:
+        for offset in range(0, rows, 10_000):
+            await db.execute(
+                insert(ServiceStatus.__table__),
+                [
+                    {
+                        "service_id": 1,
+                        "status": ServiceState.UP,
+                        "response_time": 100.0 + n % 50,
+                        "checked_at": start + timedelta(minutes=n),
+                        "last_seen": start + timedelta(minutes=n),
+                        "sample_count": 1,
+                    }
+                    for n in range(offset, min(offset + 10_000, rows))
+                ],
+            )
+        await db.commit()
+
+
+async def _streamed() -> int:
+    size = 0
+    async for chunk in export_status_history(1, None, None, "ndjson"):
+        size += len(chunk)
+    return size
+
+
+async def _materialized() -> int:
+    """The naive approach: load every row, then encode the whole body at once."""
+    async with AsyncSessionLocal() as db:
+        table = ServiceStatus.__table__
+        rows = (await db.execute(select(table).where(table.c.service_id == 1).order_by(table.c.checked_at))).all()
+    return len(_ndjson(rows))
+
+
+async def _measure(export) -> tuple[float, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await export()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(args.rows)
+        print(f"{args.rows} rows, NDJSON")
+        for name, export in (("streamed    ", _streamed), ("materialized", _materialized)):
+            elapsed, peak, size = await _measure(export)
+            print(
+                f"{name}: {args.rows / elapsed:8.0f} rows/s | peak traced memory {peak / 1e6:7.1f} MB"
+                f" | {size / 1e6:.0f} MB body"
+            )
+        await async_engine.dispose()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
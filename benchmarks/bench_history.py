@@ -0,0 +1,109 @@
+# benchmarks/bench_history.py
+"""History rows, table size and write time: ``history_mode`` "full" vs. "changes".
+
+Simulates ``--services`` services checked once a minute for ``--cycles``
+minutes: latencies jitter around a per-service baseline and a small share of
+checks flap to DOWN.
+
+Usage:
+    python -m benchmarks.bench_history --services 1000 --cycles 240
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from sqlalchemy import delete, func, select, text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.models.service import ServiceCurrentStatus, ServiceRollup, ServiceState, ServiceStatus  # noqa: E402
+from app.models.user import User  # noqa: E402, F401 (registers the users table)
+from app.services import writer  # noqa: E402
+from app.services.rollups import open_buckets  # noqa: E402
+from app.services.writer import CheckResult  # noqa: E402
+
+
+def _cycles(services: int, cycles: int, flap: float) -> list[list[CheckResult]]:
+    rng = random.Random(42)
+    baselines = [rng.uniform(50, 400) for _ in range(services)]
+    start = datetime.now(timezone.utc) - timedelta(minutes=cycles)
+    batches = []
+    for cycle in range(cycles):
+        checked_at = start + timedelta(minutes=cycle)
+        batches.append(
+            [
+                (
+                    CheckResult(service_id + 1, ServiceState.DOWN, None, checked_at=checked_at)
+                    if rng.random() < flap
+                    else CheckResult(
+                        service_id + 1, ServiceState.UP, rng.gauss(base, base * 0.1), checked_at=checked_at
+                    )
+                )
+                for service_id, base in enumerate(baselines)
+            ]
+        )
+    return batches
+
+
+async def _run(mode: str, batches: list[list[CheckResult]], batch_size: int) -> tuple[int, int, float]:
+    writer.settings.history_mode = mode
+    writer.change_encoder.clear()
+    open_buckets.clear()
+    async with AsyncSessionLocal() as db:
+        for model in (ServiceStatus, ServiceCurrentStatus, ServiceRollup):
+            await db.execute(delete(model))
+        await db.commit()
+        await db.execute(text("VACUUM"))
+
+    start = time.perf_counter()
+    for results in batches:
+        for offset in range(0, len(results), batch_size):
+            await writer.store_results_batch(results[offset : offset + batch_size])
+    elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as db:
+        rows = await db.scalar(select(func.count()).select_from(ServiceStatus))
+        size = await db.scalar(
+            text(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE tbl_name = 'service_status')"
+            )
+        )
+    return rows, size, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=1000)
+    parser.add_argument("--cycles", type=int, default=240)
+    parser.add_argument("--flap", type=float, default=0.002)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    batches = _cycles(args.services, args.cycles, args.flap)
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        print(f"{args.services} services x {args.cycles} one-minute cycles, flap rate {args.flap}")
+        baseline = None
+        for mode in ("full", "changes"):
+            rows, size, elapsed = await _run(mode, batches, args.batch)
+            baseline = baseline or (rows, size)
+            print(
+                f"{mode:8s}: {rows:9d} rows ({baseline[0] / rows:5.1f}x fewer), "
+                f"{size / 1e6:7.1f} MB incl. indexes ({baseline[1] / size:5.1f}x smaller), {elapsed:6.1f}s to write"
+            )
+        await async_engine.dispose()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
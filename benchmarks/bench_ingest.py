@@ -0,0 +1,91 @@
+# benchmarks/bench_ingest.py
+"""Rows per second for status ingestion: ORM ``add_all`` vs. the Core bulk insert.
+
+``writer`` is the full result-writer transaction (history, current status and rollups).
+
+Usage:
+    python -m benchmarks.bench_ingest --rows 50000 --batch 500
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from sqlalchemy import delete  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.models.service import ServiceCurrentStatus, ServiceRollup, ServiceState, ServiceStatus  # noqa: E402
+from app.models.user import User  # noqa: E402, F401 (registers the users table)
+from app.repositories.service import insert_statuses_async  # noqa: E402
+from app.services.rollups import open_buckets  # noqa: E402
+from app.services.timing import PHASE_COLUMNS  # noqa: E402
+from app.services.writer import CheckResult, status_rows, store_results_batch  # noqa: E402
+
+
+async def _orm_batch(results: list[CheckResult]) -> None:
+    """The previous path: one ORM object per result."""
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            ServiceStatus(
+                service_id=service_id,
+                status=status,
+                response_time=response_time,
+                **dict(zip(PHASE_COLUMNS, phases)),
+            )
+            for service_id, status, response_time, phases, _ in results
+        )
+        await db.commit()
+
+
+async def _core_batch(results: list[CheckResult]) -> None:
+    async with AsyncSessionLocal() as db:
+        await insert_statuses_async(status_rows(results, datetime.now(timezone.utc)), db)
+        await db.commit()
+
+
+async def _run(store, rows: int, batch: int) -> float:
+    results = [CheckResult(index % 1000 + 1, ServiceState.UP, 12.5, (0.1, 1.0, 2.0, 5.0, 0.5)) for index in range(rows)]
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        await store(results[offset : offset + batch])
+    elapsed = time.perf_counter() - start
+    async with AsyncSessionLocal() as db:
+        for model in (ServiceStatus, ServiceCurrentStatus, ServiceRollup):
+            await db.execute(delete(model))
+        await db.commit()
+    open_buckets.clear()
+    return rows / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        stores = {"ORM add_all": _orm_batch, "Core insert": _core_batch, "writer": store_results_batch}
+        rates: dict[str, list[float]] = {name: [] for name in stores}
+        for _ in range(args.rounds):
+            for name, store in stores.items():
+                rates[name].append(await _run(store, args.rows, args.batch))
+        await async_engine.dispose()
+
+        print(f"{args.rows} rows in batches of {args.batch}, best of {args.rounds}")
+        baseline = max(rates["ORM add_all"])
+        for name, values in rates.items():
+            print(f"{name:12s}: {max(values):9.0f} rows/s  ({max(values) / baseline:.2f}x)")
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_journal.py
+"""Journal append rate (per fsync interval) and replay throughput into the database.
+
+Appends ``--rows`` results in writer-sized batches, as during a database
+outage, then replays them through the result writer's replay loop.
+
+Usage:
+    python -m benchmarks.bench_journal --rows 100000 --batch 500
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.core.database import Base, async_engine, async_write_engine  # noqa: E402
+from app.models.service import ServiceState  # noqa: E402
+from app.models.user import User  # noqa: E402, F401 (registers the users table)
+from app.services.journal import ResultJournal  # noqa: E402
+from app.services.writer import CheckResult, ResultWriter, to_record  # noqa: E402
+
+JOURNAL = "bench-journal.ndjson"
+
+
+def _cleanup() -> None:
+    for path in (JOURNAL, JOURNAL + ".offset"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def _append(rows: int, batch: int, fsync_interval: float) -> tuple[float, ResultJournal]:
+    _cleanup()
+    journal = ResultJournal(JOURNAL, fsync_interval=fsync_interval, max_bytes=1 << 34)
+    await journal.open()
+    now = datetime.now(timezone.utc)
+    records = [
+        to_record(CheckResult(index % 1000 + 1, ServiceState.UP, 12.5, (0.1, 1.0, 2.0, 5.0, 0.5), now))
+        for index in range(rows)
+    ]
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        await journal.append(records[offset : offset + batch])
+    elapsed = time.perf_counter() - start
+    await journal.close()
+    return rows / elapsed, journal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--replay-batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        print(f"{args.rows} results in batches of {args.batch}")
+        for fsync_interval in (0.0, 1.0):
+            rate, journal = await _append(args.rows, args.batch, fsync_interval)
+            label = "every append" if fsync_interval == 0 else f"every {fsync_interval:g}s"
+            print(f"append, fsync {label:12s}: {rate:9.0f} results/s ({journal.stats['fsyncs']} fsyncs)")
+
+        journal = ResultJournal(JOURNAL, fsync_interval=1.0, max_bytes=1 << 34)
+        await journal.open()
+        writer = ResultWriter(journal=journal, replay_batch_size=args.replay_batch)
+        start = time.perf_counter()
+        await writer._replay_journal()
+        elapsed = time.perf_counter() - start
+        print(
+            f"replay in chunks of {args.replay_batch}: {journal.stats['replayed'] / elapsed:9.0f} results/s"
+            f" (pending after: {journal.pending})"
+        )
+        await journal.close()
+        await async_write_engine.dispose()
+        await async_engine.dispose()
+        _cleanup()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
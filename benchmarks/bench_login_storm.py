@@ -0,0 +1,172 @@
+# benchmarks/bench_login_storm.py
+"""Latency of an ordinary authenticated route during a login storm.
+
+Serves the app with uvicorn in-process. One probe client calls
+``GET /services/`` every ``--probe-interval`` seconds while ``--storm``
+clients, in a separate process, hammer a login endpoint for ``--seconds``.
+There are three phases:
+
+- no storm;
+- the previous login path, a sync route running bcrypt inline on the shared
+  threadpool (registered here as ``/bench/login-inline``);
+- ``/auth/login``, with bcrypt on the bounded password process pool.
+
+Usage:
+    python -m benchmarks.bench_login_storm --storm 64 --seconds 10
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+from collections import Counter
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import Depends, HTTPException  # noqa: E402
+from fastapi.security import OAuth2PasswordRequestForm  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.dependencies import get_db  # noqa: E402
+from app.core.security import create_access_token, get_password_hash, password_pool, verify_password  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.service import Service  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.repositories.user import get_user_by_username  # noqa: E402
+
+PORT = 8766
+PHASES = {
+    "none": ("no storm     ", None),
+    "inline": ("inline bcrypt", "/bench/login-inline"),
+    "pool": ("password pool", "/auth/login"),
+}
+
+
+@app.post("/bench/login-inline")
+def login_inline(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> dict:
+    """The login route as it was: bcrypt inline in a threadpool worker."""
+    user = get_user_by_username(form_data.username, db)
+    if not user or not verify_password(form_data.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return {"access_token": create_access_token({"sub": user.email}), "token_type": "bearer"}
+
+
+def _seed() -> str:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        probe = User(username="probe", email="probe@mailbox.org", hashed_password="x")
+        storm = User(username="storm", email="storm@mailbox.org", hashed_password=get_password_hash("storm-pass"))
+        db.add_all([probe, storm, Service(name="svc", url="https://svc.example", owner=probe)])
+        db.commit()
+    return create_access_token({"sub": "probe@mailbox.org"})
+
+
+async def _probe(client: httpx.AsyncClient, token: str, interval: float, stop: asyncio.Event) -> tuple[list, int]:
+    latencies, failures = [], 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/services/", headers={"Authorization": f"Bearer {token}"})
+        latencies.append(time.perf_counter() - started)
+        failures += response.status_code != 200
+        await asyncio.sleep(interval)
+    return latencies, failures
+
+
+async def _stormer(client: httpx.AsyncClient, path: str, deadline: float, codes: Counter) -> None:
+    while time.perf_counter() < deadline:
+        response = await client.post(path, data={"username": "storm", "password": "storm-pass"})
+        codes[response.status_code] += 1
+        if response.status_code == 429:
+            await asyncio.sleep(0.05)  # a client backing off briefly, as Retry-After asks
+
+
+def _storm_main(path: str, clients: int, seconds: float, results: multiprocessing.Queue) -> None:
+    """Runs the login storm in its own process, so it does not share the server's event loop."""
+
+    async def storm() -> Counter:
+        codes: Counter = Counter()
+        deadline = time.perf_counter() + seconds
+        limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=120) as client:
+            results.put("started")
+            await asyncio.gather(*(_stormer(client, path, deadline, codes) for _ in range(clients)))
+        return codes
+
+    results.put(asyncio.run(storm()))
+
+
+async def _phase(args, token: str, path: str | None) -> tuple[list[float], int, Counter]:
+    codes: Counter = Counter()
+    if path is not None:
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        # The storm outlasts the probe so the whole measurement runs under load
+        storm = context.Process(target=_storm_main, args=(path, args.storm, args.seconds + 2, results))
+        storm.start()
+        await asyncio.to_thread(results.get)
+        await asyncio.sleep(1)
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=120) as client:
+        probe = asyncio.create_task(_probe(client, token, args.probe_interval, stop))
+        await asyncio.sleep(args.seconds)
+        stop.set()
+        latencies, failures = await probe
+    if path is not None:
+        codes = await asyncio.to_thread(results.get)
+        storm.join()
+    return latencies, failures, codes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storm", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    parser.add_argument("--phases", nargs="+", choices=list(PHASES), default=list(PHASES))
+    args = parser.parse_args()
+    token = _seed()
+    logging.getLogger("app").setLevel(logging.ERROR)  # one line per login would dominate the run
+
+    async def bench() -> None:
+        # No lifespan: the scheduler is not needed; start the password pool by hand
+        password_pool.start()
+        server = uvicorn.Server(uvicorn.Config(app, port=PORT, lifespan="off", log_level="warning"))
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        # Warm the worker processes so spawning them is not measured
+        await asyncio.gather(*(password_pool.verify("x", get_password_hash("y")) for _ in range(password_pool.workers)))
+
+        print(
+            f"GET /services/ every {args.probe_interval * 1000:.0f} ms, {args.storm} login clients,"
+            f" {password_pool.workers} password workers, queue {password_pool.max_pending}"
+        )
+        for phase in args.phases:
+            label, path = PHASES[phase]
+            latencies, failures, codes = await _phase(args, token, path)
+            quantiles = (
+                statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+            )
+            print(
+                f"{label}: /services {len(latencies)} calls, {failures} failed, p50 {quantiles[49] * 1000:7.1f} ms"
+                f" p99 {quantiles[98] * 1000:7.1f} ms max {max(latencies) * 1000:7.1f} ms"
+                f" | logins {codes[200] / (args.seconds + 2):5.1f}/s, 429s {codes[429]}"
+                f", errors {sum(codes.values()) - codes[200] - codes[429]}"
+            )
+        server.should_exit = True
+        await server_task
+        password_pool.close()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
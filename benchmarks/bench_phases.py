@@ -0,0 +1,59 @@
+# benchmarks/bench_phases.py
+"""Checks per second with per-phase timing on vs. off, plus the recorded phase averages.
+
+Usage:
+    python -m benchmarks.bench_phases --checks 5000 --rounds 3
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("POLL_CONCURRENCY", "200")
+
+from app.services import checker  # noqa: E402
+from benchmarks.fake_farm import FakeFarm  # noqa: E402
+
+
+async def _run(urls: list[str], enabled: bool) -> float:
+    checker.settings.phase_timing_enabled = enabled
+    start = time.perf_counter()
+    results = await asyncio.gather(*(checker.probe_url(url, frozenset({"OK"}), retries=1) for url in urls))
+    elapsed = time.perf_counter() - start
+    assert all(probe.code == 200 for probe in results), "some probes failed"
+    return len(urls) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--ports", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"checks per run: {args.checks}, rounds: {args.rounds}")
+    with FakeFarm(ports=args.ports) as farm:
+        urls = farm.urls(args.checks)
+
+        async def bench() -> dict[bool, list[float]]:
+            await _run(urls[:200], True)  # open keep-alive connections first
+            rates: dict[bool, list[float]] = {False: [], True: []}
+            for _ in range(args.rounds):
+                for enabled in (False, True):
+                    rates[enabled].append(await _run(urls, enabled))
+            await checker.close_clients()
+            return rates
+
+        rates = asyncio.run(bench())
+
+    off, on = max(rates[False]), max(rates[True])
+    print(f"timing off : {off:8.0f} checks/s")
+    print(f"timing on  : {on:8.0f} checks/s  ({(on - off) / off:+.1%})")
+    print(f"phase averages (ms): {checker.checker_stats()['phase_avg_ms']}")
+
+
+if __name__ == "__main__":
+    main()
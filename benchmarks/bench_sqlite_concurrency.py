@@ -0,0 +1,129 @@
+# benchmarks/bench_sqlite_concurrency.py
+"""Writer throughput and reader latency under contention, per SQLite profile.
+
+One task streams result batches through the result writer while ``--readers``
+threads run the dashboard query through the sync engine (as the threadpool
+routes do), pausing ``--think`` seconds between queries. Each profile runs in a fresh subprocess because the engines are
+configured at import time.
+
+Usage:
+    python -m benchmarks.bench_sqlite_concurrency --services 500 --readers 8 --seconds 10
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+PROFILES = ("default", "production")
+
+
+def _child(args: argparse.Namespace) -> None:
+    from sqlalchemy.exc import OperationalError
+
+    from app.core.database import Base, SessionLocal, async_engine, async_write_engine, engine
+    from app.models.service import Service, ServiceState
+    from app.models.user import User
+    from app.services.dashboard import get_services_with_latest_status
+    from app.services.writer import CheckResult, store_results_batch
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            Service(name=f"svc-{index}", url=f"https://svc-{index}.example", user_id=user.id)
+            for index in range(args.services)
+        )
+        db.commit()
+
+    stop = threading.Event()
+    latencies: list[float] = []
+    errors = {"read": 0, "write": 0}
+
+    def reader() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    get_services_with_latest_status(db)
+            except OperationalError:
+                errors["read"] += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            stop.wait(args.think)
+
+    async def writer() -> int:
+        written = 0
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            batch = [
+                CheckResult(service_id, ServiceState.UP, 10.0 + written % 50, (0.1, 1.0, 2.0, 5.0, 0.5))
+                for service_id in range(1, args.services + 1)
+            ][: args.batch]
+            try:
+                await store_results_batch(batch)
+            except OperationalError:
+                errors["write"] += 1
+                continue
+            written += len(batch)
+        await async_write_engine.dispose()
+        await async_engine.dispose()
+        return written
+
+    threads = [threading.Thread(target=reader, daemon=True) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    written = asyncio.run(writer())
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("nan")
+    print(
+        f"{os.environ['SQLITE_PROFILE']:10s}: {written / args.seconds:8.0f} writes/s |"
+        f" {len(latencies) / args.seconds:7.1f} reads/s, read p99 {p99:7.1f} ms |"
+        f" lock errors: {errors['write']} write, {errors['read']} read"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--think", type=float, default=0.05, help="pause between one reader's queries (s)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        _child(args)
+        return
+
+    print(f"{args.services} services, batches of {args.batch}, {args.readers} reader threads, {args.seconds}s per run")
+    for profile in PROFILES:
+        # journal_mode=WAL sticks to the file, so every profile starts from a new database
+        path = f"bench-{profile}.db"
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///./{path}", "SECRET_KEY": "bench", "SQLITE_PROFILE": profile}
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_sqlite_concurrency", *sys.argv[1:], "--profile", profile],
+                env=env,
+                check=True,
+            )
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/bench_status_cache.py
+"""Public status endpoint throughput: per-request query vs. generation cache vs. 304 revalidation.
+
+Seeds ``--services`` services, then runs ``--clients`` concurrent clients
+against ``/status/api`` (or ``--path``) through the ASGI app for
+``--seconds`` per mode, while the result writer commits a batch every
+``--write-every`` seconds, as the scheduler would.
+
+Usage:
+    python -m benchmarks.bench_status_cache --services 500 --clients 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine, async_write_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.service import Service, ServiceState  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.status_cache import CachedBody, status_cache  # noqa: E402
+from app.services.writer import CheckResult, store_results_batch  # noqa: E402
+
+
+async def _seed(services: int, start: datetime) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User.__table__),
+            [{"id": 1, "username": "bench", "email": "bench@mailbox.org", "hashed_password": "x"}],
+        )
+        await db.execute(
+            insert(Service.__table__),
+            [
+                {"id": n, "name": f"svc-{n:05d}", "url": f"https://svc-{n}.example", "user_id": 1}
+                for n in range(1, services + 1)
+            ],
+        )
+        await db.commit()
+    await store_results_batch(
+        [CheckResult(n, ServiceState.UP, 100.0, checked_at=start) for n in range(1, services + 1)]
+    )
+
+
+async def _uncached_get(key, build) -> CachedBody:
+    """What every request cost before: one query and one encode each."""
+    status_cache.stats["rebuilds"] += 1
+    return CachedBody(status_cache.generation, await build(), '"uncached"')
+
+
+async def _writes(services: int, every: float, start: datetime, stop: asyncio.Event) -> None:
+    rng = random.Random(2)
+    tick = 0
+    while not stop.is_set():
+        tick += 1
+        await store_results_batch(
+            [
+                CheckResult(n, ServiceState.UP, rng.uniform(50, 500), checked_at=start + timedelta(seconds=tick))
+                for n in rng.sample(range(1, services + 1), min(services, 50))
+            ]
+        )
+        try:
+            await asyncio.wait_for(stop.wait(), every)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _client(client: httpx.AsyncClient, path: str, revalidate: bool, deadline: float, latencies: list) -> None:
+    etag = None
+    while time.perf_counter() < deadline:
+        headers = {"If-None-Match": etag} if revalidate and etag else {}
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        etag = response.headers.get("etag", etag)
+        # A cache hit never suspends in-process; yield so the writer gets to run, as it would over a socket
+        await asyncio.sleep(0)
+
+
+async def _run_mode(args, revalidate: bool, start: datetime) -> tuple[list, int]:
+    stop = asyncio.Event()
+    writer_task = asyncio.create_task(_writes(args.services, args.write_every, start, stop))
+    latencies: list[float] = []
+    rebuilds = status_cache.stats["rebuilds"]
+    deadline = time.perf_counter() + args.seconds
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(
+            *(_client(client, args.path, revalidate, deadline, latencies) for _ in range(args.clients))
+        )
+    stop.set()
+    await writer_task
+    return latencies, status_cache.stats["rebuilds"] - rebuilds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-every", type=float, default=1.0)
+    parser.add_argument("--path", default="/status/api")
+    args = parser.parse_args()
+    start = datetime(2026, 1, 1)
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(args.services, start)
+        print(
+            f"{args.path}: {args.services} services, {args.clients} clients, a result batch every {args.write_every}s"
+        )
+
+        cached_get = status_cache.get
+        for name, get, revalidate in (
+            ("uncached  ", _uncached_get, False),
+            ("cached    ", cached_get, False),
+            ("revalidate", cached_get, True),
+        ):
+            status_cache.get = get
+            latencies, rebuilds = await _run_mode(args, revalidate, start)
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{name}: {len(latencies) / args.seconds:7.0f} req/s | p50 {quantiles[49] * 1000:6.1f} ms"
+                f" p99 {quantiles[98] * 1000:6.1f} ms | {rebuilds} queries"
+            )
+        status_cache.get = cached_get
+        await async_write_engine.dispose()
+        await async_engine.dispose()
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
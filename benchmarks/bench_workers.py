@@ -0,0 +1,54 @@
+# benchmarks/bench_workers.py
+"""Checks per second: in-process checker vs. the multi-process CheckerPool.
+
+Usage:
+    python -m benchmarks.bench_workers --checks 5000 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("POLL_CONCURRENCY", "200")
+
+from app.services import workers  # noqa: E402
+from benchmarks.fake_farm import FakeFarm  # noqa: E402
+
+
+async def _run(urls: list[str], pool_size: int) -> float:
+    if pool_size:
+        workers.checker_pool = workers.CheckerPool(pool_size)
+        workers.checker_pool.start()
+        # Warm up the worker processes before timing
+        await asyncio.gather(*(workers.probe_url(url, frozenset({"OK"}), retries=1) for url in urls[:50]))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(workers.probe_url(url, frozenset({"OK"}), retries=1) for url in urls))
+    elapsed = time.perf_counter() - start
+    assert all(probe.code == 200 for probe in results), "some probes failed"
+    if pool_size:
+        await workers.stop_checker_pool()
+    return len(urls) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--ports", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"cpu cores: {os.cpu_count()}, checks per run: {args.checks}")
+    with FakeFarm(ports=args.ports) as farm:
+        urls = farm.urls(args.checks)
+        baseline = asyncio.run(_run(urls, 0))
+        print(f"in-process     : {baseline:8.0f} checks/s")
+        for count in args.workers:
+            rate = asyncio.run(_run(urls, count))
+            print(f"{count:2d} worker(s)   : {rate:8.0f} checks/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# benchmarks/bench_ws_broadcast.py
+"""Status websocket fan-out under load: many clients, one broadcast hub.
+
+Serves the app with uvicorn in-process, connects ``--clients`` websocket
+clients to ``/ws/status``, then stores a batch of ``--changes`` results every
+``--tick`` seconds through the result writer. Reports how long the initial
+snapshots took, the delay from storing a result to each client receiving it,
+and how many database queries the hub issued for all of that.
+
+Usage:
+    python -m benchmarks.bench_ws_broadcast --clients 1000 --services 500 --seconds 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, async_engine, async_write_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.service import Service, ServiceState  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.broadcast import status_hub  # noqa: E402
+from app.services.writer import CheckResult, store_results_batch  # noqa: E402
+
+PORT = 8765
+
+
+async def _seed(services: int, start: datetime) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User.__table__),
+            [{"id": 1, "username": "bench", "email": "bench@mailbox.org", "hashed_password": "x"}],
+        )
+        await db.execute(
+            insert(Service.__table__),
+            [
+                {"id": n, "name": f"svc-{n:05d}", "url": f"https://svc-{n}.example", "user_id": 1}
+                for n in range(1, services + 1)
+            ],
+        )
+        await db.commit()
+    await store_results_batch(
+        [CheckResult(n, ServiceState.UP, 100.0, checked_at=start) for n in range(1, services + 1)]
+    )
+
+
+async def _client(uri: str, written: dict[str, float], latencies: list[float], stats: dict) -> None:
+    async with websockets.connect(uri, max_size=None) as websocket:
+        message = json.loads(await websocket.recv())
+        stats["snapshots"] += message["type"] == "snapshot"
+        if stats["snapshots"] == stats["clients"]:
+            stats["connected"].set()
+        async for raw in websocket:
+            received = time.perf_counter()
+            message = json.loads(raw)
+            if message["type"] == "snapshot":
+                stats["resyncs"] += 1
+                continue
+            for service in message["services"]:
+                if service["checked_at"] in written:
+                    latencies.append(received - written[service["checked_at"]])
+
+
+async def _feed(services: int, changes: int, tick: float, seconds: float, start: datetime, written: dict) -> int:
+    rng = random.Random(5)
+    deadline = time.perf_counter() + seconds
+    batches = 0
+    while time.perf_counter() < deadline:
+        batches += 1
+        checked_at = start + timedelta(seconds=batches)
+        written[checked_at.isoformat()] = time.perf_counter()
+        await store_results_batch(
+            [
+                CheckResult(
+                    service_id,
+                    rng.choice((ServiceState.UP, ServiceState.DOWN)),
+                    rng.uniform(50, 500),
+                    checked_at=checked_at,
+                )
+                for service_id in rng.sample(range(1, services + 1), changes)
+            ]
+        )
+        await asyncio.sleep(tick)
+    return batches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=50, help="results stored per tick")
+    parser.add_argument("--tick", type=float, default=0.5)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=1.0, help="hub publish interval")
+    args = parser.parse_args()
+    status_hub.publish_interval = args.interval
+    start = datetime(2026, 1, 1)
+
+    async def bench() -> None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(args.services, start)
+
+        # No lifespan: the scheduler would start probing the fake URLs
+        server = uvicorn.Server(uvicorn.Config(app, port=PORT, lifespan="off", log_level="warning"))
+        server_task = asyncio.create_task(server.serve())
+        hub_task = asyncio.create_task(status_hub.run())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        written: dict[str, float] = {}
+        latencies: list[float] = []
+        stats = {"clients": args.clients, "snapshots": 0, "resyncs": 0, "connected": asyncio.Event()}
+        started = time.perf_counter()
+        clients = []
+        for _ in range(args.clients):
+            clients.append(asyncio.create_task(_client(f"ws://127.0.0.1:{PORT}/ws/status", written, latencies, stats)))
+            await asyncio.sleep(0)
+        await stats["connected"].wait()
+        connect_seconds = time.perf_counter() - started
+        queries_before = status_hub.stats["queries"]
+
+        batches = await _feed(args.services, args.changes, args.tick, args.seconds, start, written)
+        await asyncio.sleep(args.interval + 1)  # let the last delta drain
+        hub_stats = status_hub.snapshot_stats()
+
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+        server.should_exit = True
+        await server_task
+        hub_task.cancel()
+        await asyncio.gather(hub_task, return_exceptions=True)
+        await async_write_engine.dispose()
+        await async_engine.dispose()
+
+        expected = batches * args.changes * args.clients
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+        queries = hub_stats["queries"] - queries_before
+        print(f"{args.clients} clients, {args.services} services, {args.changes} results every {args.tick}s")
+        print(f"snapshots: {stats['snapshots']} delivered in {connect_seconds:.2f}s")
+        print(
+            f"updates  : {len(latencies)}/{expected} delivered (repeats within a cycle coalesce) | latency p50 {quantiles[49] * 1000:.0f} ms"
+            f" p99 {quantiles[98] * 1000:.0f} ms max {max(latencies, default=0) * 1000:.0f} ms"
+        )
+        print(
+            f"hub      : {hub_stats['deltas']} deltas, {queries} queries in {args.seconds:.0f}s"
+            f" (per-client polling every 5s: {args.clients * args.seconds / 5:.0f}) | resyncs {stats['resyncs']}"
+        )
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/fake_farm.py
+"""Local fake HTTP server farm used by the benchmarks.
+
+Runs ``ports`` minimal keep-alive HTTP/1.1 servers in a separate process, each
+answering every request with a fixed 200 response whose body contains "OK".
+"""
+
+import asyncio
+import multiprocessing
+import socket
+import time
+
+
+def _free_ports(count: int) -> list[int]:
+    sockets = [socket.socket() for _ in range(count)]
+    for sock in sockets:
+        sock.bind(("127.0.0.1", 0))
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+
+async def _serve(ports: list[int], body_bytes: int, delay: float) -> None:
+    body = b"OK " + b"x" * max(body_bytes - 3, 0)
+    response = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    servers = [await asyncio.start_server(handle, "127.0.0.1", port, backlog=1024) for port in ports]
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+def _run(ports: list[int], body_bytes: int, delay: float) -> None:
+    asyncio.run(_serve(ports, body_bytes, delay))
+
+
+class FakeFarm:
+    """Context manager that serves ``ports`` fake upstreams from a child process."""
+
+    def __init__(self, ports: int = 8, body_bytes: int = 2048, delay: float = 0.0) -> None:
+        self.ports = _free_ports(ports)
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_run, args=(self.ports, body_bytes, delay), daemon=True
+        )
+
+    def urls(self, count: int) -> list[str]:
+        return [f"http://127.0.0.1:{self.ports[i % len(self.ports)]}/check/{i}" for i in range(count)]
+
+    def __enter__(self) -> "FakeFarm":
+        self._process.start()
+        for port in self.ports:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._process.terminate()
+        self._process.join()
@@ -1,13 +1,18 @@
 # tests/conftest.py
 
+from contextlib import asynccontextmanager
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.core.database import Base
 from app.core.dependencies import get_db
 from app.main import app
+from app.services.rollups import open_buckets
 
 # Use an in-memory SQLite DB for fast tests
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -25,6 +30,12 @@ def setup_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_open_buckets():
+    # Each test uses its own database, so cached rollup buckets must not leak between them
+    open_buckets.clear()
+
+
 @pytest.fixture()
 def db():
     session = TestingSessionLocal()
@@ -34,6 +45,26 @@ def db():
         session.close()
 
 
+@pytest.fixture()
+def async_db():
+    """Opens a fresh in-memory async database; enter it inside the test's event loop.
+
+    Yields a session factory, e.g. ``async with async_db() as session_factory: ...``.
+    """
+
+    @asynccontextmanager
+    async def open_database():
+        async_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            yield async_sessionmaker(async_engine, expire_on_commit=False)
+        finally:
+            await async_engine.dispose()
+
+    return open_database
+
+
 @pytest.fixture()
 def client():
     app.dependency_overrides[get_db] = lambda: TestingSessionLocal()
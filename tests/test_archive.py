@@ -0,0 +1,105 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.models.service import Service, ServiceState, ServiceStatus
+from app.services.archive import archive_old_statuses, prune_archive, read_archive
+from app.services.segments import Segment, SegmentWriter
+
+
+def _group(service_ids, checked_at, response_times):
+    nan = math.nan
+    rows = len(service_ids)
+    return {
+        "service_id": service_ids,
+        "checked_at": checked_at,
+        "last_seen": [0] * rows,
+        "sample_count": [1] * rows,
+        "status": ["UP" if latency == latency else "DOWN" for latency in response_times],
+        "response_time": response_times,
+        **{name: [nan] * rows for name in ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")},
+    }
+
+
+def test_segment_reads_one_service_range_and_only_requested_columns(tmp_path):
+    path = tmp_path / "day.seg"
+    writer = SegmentWriter(path)
+    writer.write_row_group(_group([1, 1, 2, 2], [1000, 2000, 1000, 2000], [10.0, 11.0, 20.0, math.nan]))
+    writer.write_row_group(_group([3, 3], [1500, 2500], [30.0, 31.0]))
+    writer.close()
+
+    with Segment(path) as segment:
+        assert segment.footer["service_id"] == [1, 3]
+        assert segment.footer["checked_at"] == [1000, 2500]
+        assert not segment.overlaps(4, 0, 10_000)
+        assert not segment.overlaps(2, 3000, 4000)
+        assert segment.read(2, 1500, 3000, ["response_time", "status"]) == {
+            "response_time": [None],
+            "status": ["DOWN"],
+        }
+        assert segment.read(3, 0, 10_000, ["checked_at"]) == {"checked_at": [1500, 2500]}
+
+
+def test_archive_moves_aged_rows_into_day_segments(async_db, tmp_path):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    old_day = (now - timedelta(days=10)).replace(hour=6, minute=0, second=0)
+
+    async def run():
+        async with async_db() as session_factory, session_factory() as db:
+            db.add_all([Service(id=1, name="a", url="https://a.example", user_id=1)])
+            db.add_all(
+                [
+                    ServiceStatus(service_id=1, status=ServiceState.UP, response_time=10.0, checked_at=old_day),
+                    ServiceStatus(
+                        service_id=1,
+                        status=ServiceState.DOWN,
+                        checked_at=old_day + timedelta(hours=1),
+                        last_seen=old_day + timedelta(hours=2),
+                        sample_count=3,
+                    ),
+                    ServiceStatus(
+                        service_id=1,
+                        status=ServiceState.UP,
+                        response_time=12.0,
+                        checked_at=old_day + timedelta(days=1),
+                        dns_ms=1.5,
+                    ),
+                    ServiceStatus(service_id=1, status=ServiceState.UP, response_time=9.0, checked_at=now),
+                ]
+            )
+            await db.commit()
+
+            moved, _ = await archive_old_statuses(days=7, directory=str(tmp_path), db=db)
+            hot = await db.scalar(select(func.count()).select_from(ServiceStatus))
+            return moved, hot
+
+    moved, hot = asyncio.run(run())
+    assert (moved, hot) == (3, 1)
+    assert len(list(tmp_path.glob("*/*/*/*.seg"))) == 2
+
+    rows, scanned = read_archive(
+        1, now - timedelta(days=30), now, ["checked_at", "status", "last_seen", "sample_count", "dns_ms"], str(tmp_path)
+    )
+    assert scanned == 2
+    assert rows == [
+        {"checked_at": old_day, "status": "UP", "last_seen": None, "sample_count": 1, "dns_ms": None},
+        {
+            "checked_at": old_day + timedelta(hours=1),
+            "status": "DOWN",
+            "last_seen": old_day + timedelta(hours=2),
+            "sample_count": 3,
+            "dns_ms": None,
+        },
+        {
+            "checked_at": old_day + timedelta(days=1),
+            "status": "UP",
+            "last_seen": None,
+            "sample_count": 1,
+            "dns_ms": 1.5,
+        },
+    ]
+
+    assert prune_archive(retention_days=9, directory=str(tmp_path)) == 1
+    assert len(list(tmp_path.glob("*/*/*/*.seg"))) == 1
@@ -0,0 +1,177 @@
+import asyncio
+import json
+
+import httpx
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.dependencies import get_async_db, get_current_user
+from app.core.user_cache import CurrentUser
+from app.main import app
+from app.models.service import Service, ServiceState, ServiceStatus
+from app.services import batch_check, scheduler, writer
+from app.services import service as service_module
+from app.services.checker import Probe
+from app.services.status_cache import ResponseCache
+from app.services.timing import NO_PHASES
+from app.services.writer import CheckResult, ResultWriter
+
+
+def _serve(session_factory, monkeypatch, probes) -> asyncio.Task:
+    async def fake_probe(url, keywords=frozenset(), **kwargs):
+        probes.append(url)
+        await asyncio.sleep(0.01 if "slow" in url else 0)
+        return Probe(503 if "down" in url else 200, 40.0, frozenset(), NO_PHASES)
+
+    async def session():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(scheduler, "probe_url", fake_probe)
+    monkeypatch.setattr(writer, "AsyncWriteSessionLocal", session_factory)
+    monkeypatch.setattr(writer, "status_cache", ResponseCache())
+    app.dependency_overrides[get_async_db] = session
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(1, "u", "u@example.org", True, False)
+    result_writer = ResultWriter(flush_interval=0.01)
+    monkeypatch.setattr(batch_check, "result_writer", result_writer)
+    return asyncio.create_task(result_writer.run())
+
+
+async def _seed(session_factory) -> None:
+    async with session_factory() as db:
+        db.add_all(
+            [
+                Service(id=1, name="checkout-api", url="https://slow.example/api", user_id=1),
+                Service(id=2, name="checkout-web", url="https://slow.example/", user_id=1),
+                Service(id=3, name="search", url="https://down.example", user_id=1),
+                Service(id=4, name="checkout-other-user", url="https://x.example", user_id=2),
+            ]
+        )
+        await db.commit()
+
+
+def test_batch_check_streams_ndjson_and_stores_once(async_db, monkeypatch):
+    probes = []
+
+    async def run():
+        async with async_db() as session_factory:
+            writer_task = _serve(session_factory, monkeypatch, probes)
+            await _seed(session_factory)
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    async with client.stream("POST", "/services/check", json={"ids": [1, 2, 3, 4, 99]}) as response:
+                        events = [json.loads(line) async for line in response.aiter_lines() if line]
+            finally:
+                writer_task.cancel()
+                await asyncio.gather(writer_task, return_exceptions=True)
+                app.dependency_overrides.pop(get_async_db)
+                app.dependency_overrides.pop(get_current_user)
+            async with session_factory() as db:
+                stored = list(await db.scalars(select(ServiceStatus)))
+            return response, events, stored
+
+    response, events, stored = asyncio.run(run())
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [(event["type"], event.get("service_id")) for event in events[:2]] == [("missing", 4), ("missing", 99)]
+    # The fast URL lands first
+    assert (events[2]["service_id"], events[2]["status"]) == (3, "DOWN")
+    assert {(event["service_id"], event["status"]) for event in events[3:5]} == {(1, "UP"), (2, "UP")}
+    assert sorted(probes) == ["https://down.example", "https://slow.example/", "https://slow.example/api"]
+    assert events[5] == {"type": "done", "checked": 3, "status_counts": {"DOWN": 1, "UP": 2}, "stored": True}
+    assert sorted(status.service_id for status in stored) == [1, 2, 3]
+    assert len({status.checked_at for status in stored}) == 1
+
+
+def test_batch_check_sse_by_name_pattern(async_db, monkeypatch):
+    probes = []
+
+    async def run():
+        async with async_db() as session_factory:
+            writer_task = _serve(session_factory, monkeypatch, probes)
+            await _seed(session_factory)
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    sse = await client.post("/services/check?format=sse", json={"name": "checkout-*"})
+                    none = await client.post("/services/check", json={"name": "check_ut*"})
+            finally:
+                writer_task.cancel()
+                await asyncio.gather(writer_task, return_exceptions=True)
+                app.dependency_overrides.pop(get_async_db)
+                app.dependency_overrides.pop(get_current_user)
+            return sse, none
+
+    sse, none = asyncio.run(run())
+    assert sse.headers["content-type"].startswith("text/event-stream")
+    frames = [frame.split("\n") for frame in sse.text.strip().split("\n\n")]
+    assert [frame[0] for frame in frames] == ["event: result", "event: result", "event: done"]
+    assert {json.loads(frame[1].removeprefix("data: "))["service_id"] for frame in frames[:2]} == {1, 2}
+    assert none.status_code == 404  # "_" is literal, not a LIKE wildcard
+
+
+def test_disconnect_closes_the_running_checks_at_once(monkeypatch):
+    closed, written, running = [], [], []
+    service = Service(id=1, name="api", url="https://slow.example/api", user_id=1)
+
+    async def iter_checks(now):
+        try:
+            yield service, CheckResult(1, ServiceState.UP, 40.0, NO_PHASES, now)
+            await asyncio.sleep(60)
+        finally:
+            closed.append(True)
+
+    def checks(services, now):
+        # Held here so only an explicit aclose, not garbage collection, can close it
+        running.append(iter_checks(now))
+        return running[-1]
+
+    class FakeWriter:
+        async def write(self, results):
+            written.append(results)
+            return True
+
+    monkeypatch.setattr(batch_check, "iter_service_checks", checks)
+    monkeypatch.setattr(batch_check, "result_writer", FakeWriter())
+
+    async def run():
+        stream = batch_check.stream_checks([service], [], "ndjson")
+        first = await anext(stream)
+        # What the response does when the client goes away
+        await stream.aclose()
+        return first, list(closed)
+
+    first, closed_on_disconnect = asyncio.run(run())
+    assert json.loads(first)["service_id"] == 1
+    assert closed_on_disconnect == [True]
+    assert len(written) == 1
+
+
+def test_status_check_goes_through_the_result_writer(async_db, monkeypatch):
+    async def fake_check(url, **kwargs):
+        return "UP", 40.0, NO_PHASES
+
+    async def run():
+        async with async_db() as session_factory:
+            writer_task = _serve(session_factory, monkeypatch, [])
+            monkeypatch.setattr(service_module, "check_service", fake_check)
+            monkeypatch.setattr(service_module, "result_writer", batch_check.result_writer)
+            monkeypatch.setattr(settings, "history_mode", "changes")
+            await _seed(session_factory)
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    checks = [(await client.get("/services/1/status")).json() for _ in range(2)]
+            finally:
+                writer_task.cancel()
+                await asyncio.gather(writer_task, return_exceptions=True)
+                app.dependency_overrides.pop(get_async_db)
+                app.dependency_overrides.pop(get_current_user)
+            async with session_factory() as db:
+                stored = list(await db.scalars(select(ServiceStatus)))
+            return checks, stored
+
+    checks, stored = asyncio.run(run())
+    # Change-only history folds the second UP into the interval the first one opened
+    assert [(check["status"], check["sample_count"]) for check in checks] == [("UP", 1), ("UP", 2)]
+    assert len(stored) == 1 and checks[1]["id"] == stored[0].id
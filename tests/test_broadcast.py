@@ -0,0 +1,69 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from app.models.service import Service, ServiceState
+from app.services import broadcast, writer
+from app.services.broadcast import StatusHub
+from app.services.writer import CheckResult
+
+
+def test_hub_sends_one_shared_delta_of_changed_services(async_db, monkeypatch):
+    checked_at = datetime(2026, 5, 1, 12, 0, 0)
+
+    async def run():
+        async with async_db() as session_factory:
+            monkeypatch.setattr(broadcast, "AsyncSessionLocal", session_factory)
+            monkeypatch.setattr(writer, "AsyncWriteSessionLocal", session_factory)
+            hub = StatusHub(publish_interval=0, full_refresh_interval=60, client_queue_size=8)
+            monkeypatch.setattr(writer, "status_hub", hub)
+            async with session_factory() as db:
+                db.add_all(
+                    [
+                        Service(id=1, name="api", url="https://api.example", user_id=1),
+                        Service(id=2, name="web", url="https://web.example", user_id=1),
+                    ]
+                )
+                await db.commit()
+            await writer.store_results_batch(
+                [
+                    CheckResult(1, ServiceState.UP, 10.0, checked_at=checked_at),
+                    CheckResult(2, ServiceState.UP, 20.0, checked_at=checked_at),
+                ]
+            )
+
+            async with hub.subscribe() as first, hub.subscribe() as second:
+                snapshot = json.loads(await hub.snapshot())
+                await writer.store_results_batch(
+                    [CheckResult(2, ServiceState.DOWN, None, checked_at=checked_at + timedelta(minutes=1))]
+                )
+                await hub._cycle(full=False)
+                messages = await first.get(), await second.get()
+                return snapshot, messages, json.loads(await hub.snapshot()), hub.stats["queries"]
+
+    snapshot, (first, second), later, queries = asyncio.run(run())
+    assert snapshot["type"] == "snapshot"
+    assert [(svc["name"], svc["status"]) for svc in snapshot["services"]] == [("api", "UP"), ("web", "UP")]
+    assert first is second  # serialized once for every subscriber
+    delta = json.loads(first)
+    assert delta["type"] == "delta" and delta["removed"] == []
+    assert [(svc["id"], svc["status"], svc["response_time"]) for svc in delta["services"]] == [(2, "DOWN", None)]
+    assert [svc["status"] for svc in later["services"]] == ["UP", "DOWN"]
+    assert queries == 2  # one full load, one query for the changed service
+
+
+def test_slow_subscriber_is_resynced_with_a_snapshot():
+    async def run():
+        hub = StatusHub(publish_interval=0, full_refresh_interval=60, client_queue_size=2)
+        hub._state = {1: {"id": 1, "name": "api", "status": "UP"}}
+        hub._loaded = True
+        async with hub.subscribe() as subscriber:
+            for n in range(5):
+                hub.publish([{"id": 1, "name": "api", "status": "UP", "n": n}], [])
+            message = await subscriber.get()
+            return json.loads(message), subscriber._queue.qsize(), hub.stats["resyncs"]
+
+    message, queued, resyncs = asyncio.run(run())
+    assert message["type"] == "snapshot"
+    assert queued == 0
+    assert resyncs >= 1
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.dependencies import get_current_user
+from app.core.user_cache import CurrentUser
+from app.main import app
+from app.models.service import Service
+from app.services import bulk
+from app.services.status_cache import ResponseCache
+
+
+async def _chunks(body: bytes, size: int):
+    # Odd chunk boundaries split lines and multi-byte characters
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def test_ndjson_import_reports_every_record(async_db, monkeypatch):
+    lines = [
+        {"name": "api", "url": "https://api.example"},
+        {"name": "api again", "url": "https://api.example"},
+        {"name": "old", "url": "https://old.example"},
+        "{not json",
+        {"name": "bad", "url": "nope", "retries": 0, "interval_seconds": 5},
+        {"name": "café", "url": "https://cafe.example", "interval_seconds": 30},
+    ]
+    body = "\n\n".join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False) for line in lines)
+
+    async def run():
+        async with async_db() as session_factory:
+            cache = ResponseCache()
+            monkeypatch.setattr(bulk, "AsyncWriteSessionLocal", session_factory)
+            monkeypatch.setattr(bulk, "status_cache", cache)
+            async with session_factory() as db:
+                db.add(Service(name="old", url="https://old.example/", user_id=1))
+                await db.commit()
+            report = await bulk.import_services("application/x-ndjson", _chunks(body.encode(), 7), 1, batch_size=2)
+            with pytest.raises(HTTPException) as too_many:
+                await bulk.import_services("application/json", _chunks(b'[{"name": "x"}, {}]', 64), 1, max_items=1)
+            async with session_factory() as db:
+                stored = {service.url: service for service in await db.scalars(select(Service))}
+            return report, stored, cache.generation, too_many.value
+
+    report, stored, generation, too_many = asyncio.run(run())
+    assert (report["created"], report["exists"], report["duplicate"], report["invalid"]) == (2, 1, 1, 2)
+    statuses = [(result["index"], result["status"]) for result in report["results"]]
+    assert statuses == [(0, "created"), (1, "duplicate"), (2, "exists"), (3, "invalid"), (4, "invalid"), (5, "created")]
+    assert report["results"][3]["errors"][0].startswith("Invalid JSON")
+    assert {error.split(":")[0] for error in report["results"][4]["errors"]} == {"url", "retries", "interval_seconds"}
+    assert report["results"][0]["id"] == stored["https://api.example/"].id
+    assert stored["https://cafe.example/"].name == "café" and stored["https://cafe.example/"].interval_seconds == 30
+    assert len(stored) == 3 and generation == 1
+    assert too_many.status_code == 413
+
+
+def test_bulk_route_imports_csv_by_content_type(async_db, monkeypatch):
+    body = 'name,url,interval_seconds,keyword\n"multi\nline",https://a.example,,\nb,https://b.example,45,ok\n'
+
+    async def run():
+        async with async_db() as session_factory:
+            monkeypatch.setattr(bulk, "AsyncWriteSessionLocal", session_factory)
+            monkeypatch.setattr(bulk, "status_cache", ResponseCache())
+            app.dependency_overrides[get_current_user] = lambda: CurrentUser(1, "u", "u@example.org", True, False)
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    imported = await client.post("/services/bulk", content=body, headers={"Content-Type": "text/csv"})
+                    again = await client.post(
+                        "/services/bulk", content=body, headers={"Content-Type": "text/csv; charset=utf-8"}
+                    )
+                    unsupported = await client.post(
+                        "/services/bulk", content=b"x", headers={"Content-Type": "text/xml"}
+                    )
+                    not_array = await client.post("/services/bulk", json={"name": "a"})
+            finally:
+                app.dependency_overrides.pop(get_current_user)
+            async with session_factory() as db:
+                stored = list(await db.scalars(select(Service).order_by(Service.url)))
+            return imported, again, unsupported, not_array, stored
+
+    imported, again, unsupported, not_array, stored = asyncio.run(run())
+    assert imported.status_code == 200 and imported.json()["created"] == 2
+    assert again.json()["exists"] == 2 and again.json()["created"] == 0
+    assert (unsupported.status_code, not_array.status_code) == (415, 422)
+    assert [(service.name, service.interval_seconds, service.keyword) for service in stored] == [
+        ("multi\nline", 60, None),
+        ("b", 45, "ok"),
+    ]
@@ -1,5 +1,11 @@
+import asyncio
+
+import httpx
+
 from app.models.service import ServiceState
-from app.services.checker import classify_status
+from app.services import checker, timing
+from app.services.checker import RetryBudget, classify_status
+from app.services.hosts import HostCircuitBreaker
 
 
 def test_classify_up():
@@ -48,3 +54,143 @@ def test_classify_error_fallback():
     # Simulate an exception in check_service and ensure ERROR is used in poll_services
     # This would require mocking check_service to raise an exception
     pass  # You can use pytest-mock or unittest.mock for this
+
+
+def test_retry_budget_limits_retries_to_ratio():
+    budget = RetryBudget(ratio=0.1, reserve=2)
+    # The reserve allows a small burst, then 10 first attempts earn one retry
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    for _ in range(10):
+        budget.record_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_backoff_does_not_hold_concurrency_slot(monkeypatch):
+    slots_free_during_backoff = []
+
+    def failing_get(request):
+        raise httpx.ConnectError("refused")
+
+    async def fake_sleep(delay):
+        slots_free_during_backoff.append(not checker.semaphore.locked())
+
+    monkeypatch.setattr(checker, "client", httpx.AsyncClient(transport=httpx.MockTransport(failing_get)))
+    monkeypatch.setattr(checker.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(checker, "semaphore", asyncio.Semaphore(1))
+    monkeypatch.setattr(checker, "retry_budget", RetryBudget(ratio=0.1, reserve=10))
+    monkeypatch.setattr(checker, "host_breaker", HostCircuitBreaker(failure_threshold=10, cooldown=30))
+
+    code, _, _, _ = asyncio.run(checker._perform_request("https://down.example", retries=3))
+    assert code is None
+    assert slots_free_during_backoff == [True, True]
+
+
+def _streaming_client(chunks: list[bytes], consumed: list[bytes]) -> httpx.AsyncClient:
+    async def body():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body())))
+
+
+def test_keyword_found_across_chunk_boundary(monkeypatch):
+    consumed = []
+    monkeypatch.setattr(checker, "client", _streaming_client([b"xx nee", b"dle yy", b"never read"], consumed))
+
+    code, _, found, _ = asyncio.run(checker._perform_request("https://ok.example", keywords=frozenset({"needle"})))
+    assert (code, found) == (200, frozenset({"needle"}))
+    assert consumed == [b"xx nee", b"dle yy"]
+
+
+def test_keyword_scan_stops_at_body_cap(monkeypatch):
+    consumed = []
+    monkeypatch.setattr(checker, "client", _streaming_client([b"a" * 10] * 10, consumed))
+    monkeypatch.setattr(checker.settings, "max_body_bytes", 25)
+
+    code, _, found, _ = asyncio.run(checker._perform_request("https://big.example", keywords=frozenset({"needle"})))
+    assert (code, found) == (200, frozenset())
+    assert len(consumed) == 3
+
+
+def test_keyword_scan_reports_each_keyword(monkeypatch):
+    consumed = []
+    monkeypatch.setattr(checker, "client", _streaming_client([b"<h1>Wel", b"come</h1>", b"footer"], consumed))
+
+    code, _, found, _ = asyncio.run(
+        checker._perform_request("https://ok.example", keywords=frozenset({"Welcome", "Checkout"}))
+    )
+    assert (code, found) == (200, frozenset({"Welcome"}))
+    assert len(consumed) == 3
+
+
+def test_keyword_found_in_utf16_body(monkeypatch):
+    body = "<p>all ok</p>".encode("utf-16")
+    chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    def respond(request):
+        return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-16"}, content=stream())
+
+    monkeypatch.setattr(checker, "client", httpx.AsyncClient(transport=httpx.MockTransport(respond)))
+
+    code, _, found, _ = asyncio.run(
+        checker._perform_request("https://ok.example", keywords=frozenset({"ok", "missing"}))
+    )
+    assert (code, found) == (200, frozenset({"ok"}))
+
+
+def test_host_breaker_fails_fast_for_other_urls_on_host(monkeypatch):
+    attempted = []
+
+    def refuse(request):
+        attempted.append(str(request.url))
+        raise httpx.ConnectError("refused")
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(checker, "client", httpx.AsyncClient(transport=httpx.MockTransport(refuse)))
+    monkeypatch.setattr(checker.asyncio, "sleep", no_sleep)
+    monkeypatch.setattr(checker, "host_breaker", HostCircuitBreaker(failure_threshold=3, cooldown=30))
+
+    async def run():
+        first = await checker._perform_request("https://dead.example/a", retries=3)
+        second = await checker._perform_request("https://dead.example/b", retries=3)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first[0] is None and second[0] is None
+    assert attempted == ["https://dead.example/a"] * 3
+
+
+def test_phase_timer_splits_request_into_phases(monkeypatch):
+    clock = iter([1.000, 1.010, 1.012, 1.030, 1.031, 1.081])
+    monkeypatch.setattr(timing.time, "perf_counter", lambda: next(clock))
+    timer = timing.PhaseTimer()
+    timer.dns = 4.0
+
+    async def run():
+        for event in (
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.complete",
+            "connection.start_tls.started",
+            "connection.start_tls.complete",
+            "http11.send_request_headers.started",
+            "http11.receive_response_headers.complete",
+        ):
+            await timer.trace(event, {})
+
+    asyncio.run(run())
+    dns, connect, tls, ttfb, download = timer.phases(finished_at=1.091)
+    assert (dns, round(connect, 3), round(tls, 3), round(ttfb, 3), round(download, 3)) == (4.0, 6.0, 18.0, 50.0, 10.0)
+
+
+def test_reused_connection_reports_no_connect_phases():
+    timer = timing.PhaseTimer()
+    assert timer.phases(finished_at=0.0) == timing.NO_PHASES
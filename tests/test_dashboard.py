@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, async_url
+from app.models.service import Service, ServiceCurrentStatus, ServiceState, ServiceStatus
+from app.models.user import User
+from app.repositories.service import backfill_current_statuses
+from app.services import writer
+from app.services.dashboard import get_services_with_latest_status_async
+from app.services.writer import CheckResult
+
+
+def test_async_url_maps_sync_drivers():
+    assert async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_dashboard_reads_newest_current_status(monkeypatch):
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(writer, "AsyncWriteSessionLocal", session_factory)
+
+        async with session_factory() as db:
+            user = User(username="dash", email="dash@example.com", hashed_password="x")
+            db.add(Service(id=1, name="api", url="https://api.example", owner=user))
+            await db.commit()
+
+        await writer.store_results_batch(
+            [
+                CheckResult(1, ServiceState.DOWN, None, checked_at=now - timedelta(minutes=2)),
+                CheckResult(1, ServiceState.UP, 20.0, checked_at=now),
+            ]
+        )
+        # A late batch carrying an older result must not move the current status back
+        await writer.store_results_batch(
+            [CheckResult(1, ServiceState.SLOW, 3000.0, checked_at=now - timedelta(minutes=1))]
+        )
+
+        async with session_factory() as db:
+            rows = await get_services_with_latest_status_async(db)
+        await engine.dispose()
+        return rows
+
+    rows = asyncio.run(run())
+    assert [(svc.name, st.status, st.response_time) for svc, st in rows] == [("api", ServiceState.UP, 20.0)]
+
+
+def test_backfill_picks_one_latest_row_per_service(db):
+    user = User(username="backfill", email="backfill@example.com", hashed_password="x")
+    service = Service(name="tied", url="https://tied.example", owner=user)
+    checked_at = datetime(2026, 1, 1, 12, 0, 0)
+    db.add_all(
+        [
+            ServiceStatus(service=service, status=ServiceState.DOWN, checked_at=checked_at - timedelta(minutes=1)),
+            ServiceStatus(service=service, status=ServiceState.SLOW, checked_at=checked_at),
+            ServiceStatus(service=service, status=ServiceState.UP, checked_at=checked_at),
+        ]
+    )
+    db.commit()
+
+    assert backfill_current_statuses(db) >= 1
+    assert db.get(ServiceCurrentStatus, service.id).status == ServiceState.UP
+    assert backfill_current_statuses(db) == 0
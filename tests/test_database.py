@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base, tune_sqlite, upgrade_schema
+from app.models.service import Service, ServiceStatus
+
+# Tables as the first release created them, before per-service intervals, phase timings and change-only history
+FIRST_RELEASE_SCHEMA = [
+    """CREATE TABLE users (id INTEGER NOT NULL, username VARCHAR NOT NULL, email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL, is_active BOOLEAN NOT NULL, is_admin BOOLEAN NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, PRIMARY KEY (id))""",
+    """CREATE TABLE services (id INTEGER NOT NULL, name VARCHAR NOT NULL, url VARCHAR(2048) NOT NULL,
+    is_active BOOLEAN NOT NULL, user_id INTEGER NOT NULL, keyword VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, PRIMARY KEY (id),
+    CONSTRAINT uniq_user_service UNIQUE (url, user_id), FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE)""",
+    """CREATE TABLE service_status (id INTEGER NOT NULL, service_id INTEGER NOT NULL, status VARCHAR(15) NOT NULL,
+    response_time FLOAT, checked_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, PRIMARY KEY (id),
+    FOREIGN KEY(service_id) REFERENCES services (id) ON DELETE CASCADE)""",
+    "CREATE INDEX ix_service_status_service_id ON service_status (service_id)",
+    "INSERT INTO users VALUES (1, 'u', 'u@example.com', 'x', 1, 0, CURRENT_TIMESTAMP)",
+    "INSERT INTO services VALUES (1, 'api', 'https://api.example', 1, 1, NULL, CURRENT_TIMESTAMP)",
+    "INSERT INTO service_status VALUES (1, 1, 'UP', 42.0, CURRENT_TIMESTAMP)",
+]
+
+
+def test_tuned_sqlite_connections_use_wal_and_busy_timeout(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    tune_sqlite(engine)
+    with engine.connect() as conn:
+        assert conn.scalar(text("PRAGMA journal_mode")) == "wal"
+        assert conn.scalar(text("PRAGMA synchronous")) == 1  # NORMAL
+        assert conn.scalar(text("PRAGMA busy_timeout")) == settings.sqlite_busy_timeout_ms
+    engine.dispose()
+
+
+def test_immediate_writer_takes_the_lock_when_the_transaction_begins(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "sqlite_busy_timeout_ms", 0)
+    path = tmp_path / "writer.db"
+    writer = create_engine(f"sqlite:///{path}")
+    tune_sqlite(writer, immediate=True)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    with writer.begin() as conn:
+        conn.execute(text("SELECT 1"))
+        # A read-only statement already holds the write lock, so another writer is refused
+        other = sqlite3.connect(path, timeout=0)
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("INSERT INTO t VALUES (1)")
+        other.close()
+    writer.dispose()
+
+
+def test_upgrade_schema_adds_new_columns_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in FIRST_RELEASE_SCHEMA:
+            conn.execute(text(statement))
+
+    Base.metadata.create_all(bind=engine)
+    changes = upgrade_schema(engine)
+    assert any("interval_seconds" in change for change in changes)
+    assert "CREATE INDEX ix_service_status_service_id_checked_at" in changes
+    assert upgrade_schema(engine) == []
+
+    columns = {column["name"] for column in inspect(engine).get_columns("service_status")}
+    assert {"dns_ms", "download_ms", "last_seen", "sample_count"} <= columns
+    with Session(engine) as db:
+        service = db.get(Service, 1)
+        assert (service.interval_seconds, service.retries, service.timeout) == (60, 3, None)
+        assert db.scalar(select(ServiceStatus.sample_count)) == 1
+    engine.dispose()
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.dns import DnsCache, build_transport
+
+
+class StubResolver:
+    def __init__(self, records: dict[str, list[str]], ttl: float | None = 30.0, delay: float = 0.0):
+        self.records = records
+        self.ttl = ttl
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def __call__(self, host: str):
+        self.calls.append(host)
+        await asyncio.sleep(self.delay)
+        if host not in self.records:
+            raise LookupError(f"{host}: NXDOMAIN")
+        return self.records[host], self.ttl
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(resolver, clock=None):
+    return DnsCache(resolver, default_ttl=60, negative_ttl=10, maxsize=100, clock=clock or FakeClock())
+
+
+def test_cache_hits_until_ttl_expires():
+    clock = FakeClock()
+    resolver = StubResolver({"svc.test": ["10.0.0.1"]}, ttl=30)
+    cache = _cache(resolver, clock)
+
+    async def run():
+        assert await cache.resolve("svc.test") == ["10.0.0.1"]
+        clock.now = 29
+        await cache.resolve("svc.test")
+        clock.now = 31
+        await cache.resolve("svc.test")
+
+    asyncio.run(run())
+    assert resolver.calls == ["svc.test", "svc.test"]
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_concurrent_lookups_are_coalesced():
+    resolver = StubResolver({"svc.test": ["10.0.0.1"]}, delay=0.05)
+    cache = _cache(resolver)
+
+    async def run():
+        return await asyncio.gather(*(cache.resolve("svc.test") for _ in range(20)))
+
+    assert asyncio.run(run()) == [["10.0.0.1"]] * 20
+    assert resolver.calls == ["svc.test"]
+    assert cache.stats["coalesced"] == 19
+
+
+def test_failed_lookups_are_cached_negatively():
+    clock = FakeClock()
+    resolver = StubResolver({})
+    cache = _cache(resolver, clock)
+
+    async def run():
+        for now in (0, 5, 11):
+            clock.now = now
+            with pytest.raises(LookupError):
+                await cache.resolve("missing.test")
+
+    asyncio.run(run())
+    assert resolver.calls == ["missing.test", "missing.test"]
+    assert cache.stats["negative_hits"] == 1
+
+
+def test_transport_connects_through_cached_address():
+    resolver = StubResolver({"uptime.test": ["127.0.0.1"]})
+    cache = _cache(resolver)
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nOK")
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=1)
+        async with server, httpx.AsyncClient(transport=build_transport(cache, limits)) as client:
+            response = await client.get(f"http://uptime.test:{port}/")
+        return response.status_code, response.text
+
+    assert asyncio.run(run()) == (200, "OK")
+    assert resolver.calls == ["uptime.test"]
+
+
+def test_slow_lookup_times_out_as_connect_timeout():
+    resolver = StubResolver({"slow.test": ["127.0.0.1"]}, delay=0.2)
+    cache = _cache(resolver)
+
+    async def run():
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=1)
+        timeout = httpx.Timeout(5.0, connect=0.05)
+        async with httpx.AsyncClient(transport=build_transport(cache, limits), timeout=timeout) as client:
+            with pytest.raises(httpx.ConnectTimeout):
+                await client.get("http://slow.test/")
+            # The abandoned lookup still completes and is cached for the next caller
+            await asyncio.sleep(0.3)
+            return await cache.resolve("slow.test")
+
+    assert asyncio.run(run()) == ["127.0.0.1"]
+    assert resolver.calls == ["slow.test"]
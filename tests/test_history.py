@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.service import ServiceState, ServiceStatus
+from app.services import writer
+from app.services.history import ChangeEncoder
+from app.services.writer import CheckResult
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(minute: int, status: ServiceState = ServiceState.UP, latency: float | None = 120.0) -> dict:
+    return {
+        "service_id": 1,
+        "status": status,
+        "response_time": latency,
+        "checked_at": START + timedelta(minutes=minute),
+    }
+
+
+def test_encoder_opens_intervals_on_change_band_and_heartbeat():
+    encoder = ChangeEncoder(latency_band=0.5, heartbeat_seconds=600)
+    inserts, updates = encoder.encode(
+        [
+            _row(0),
+            _row(1, latency=130.0),
+            _row(2, latency=400.0),  # outside the band
+            _row(3, ServiceState.DOWN, None),  # state change
+            _row(4, ServiceState.DOWN, None),
+        ]
+    )
+    assert updates == []
+    assert [(row["status"], row["sample_count"], row["response_time"]) for row in inserts] == [
+        (ServiceState.UP, 2, 125.0),
+        (ServiceState.UP, 1, 400.0),
+        (ServiceState.DOWN, 2, None),
+    ]
+
+    # The stored DOWN interval is extended until the heartbeat forces a new row
+    inserts, updates = encoder.encode([_row(minute, ServiceState.DOWN, None) for minute in range(5, 15)])
+    assert [(update["b_first_seen"], update["sample_count"]) for update in updates] == [
+        (START + timedelta(minutes=3), 10)
+    ]
+    assert [(row["checked_at"], row["sample_count"]) for row in inserts] == [(START + timedelta(minutes=13), 2)]
+
+
+def test_change_mode_writes_intervals(monkeypatch):
+    monkeypatch.setattr(writer.settings, "history_mode", "changes")
+    monkeypatch.setattr(writer, "change_encoder", ChangeEncoder(latency_band=0.5, heartbeat_seconds=3600))
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        monkeypatch.setattr(writer, "AsyncWriteSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+
+        for cycle in range(30):
+            status = ServiceState.DOWN if 10 <= cycle < 12 else ServiceState.UP
+            latency = None if status == ServiceState.DOWN else 100.0 + cycle % 3
+            await writer.store_results_batch(
+                [CheckResult(1, status, latency, checked_at=START + timedelta(minutes=cycle))]
+            )
+
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(ServiceStatus).order_by(ServiceStatus.checked_at))).all()
+        await engine.dispose()
+        return rows
+
+    rows = asyncio.run(run())
+    assert [(row.status, row.sample_count) for row in rows] == [
+        (ServiceState.UP, 10),
+        (ServiceState.DOWN, 2),
+        (ServiceState.UP, 18),
+    ]
+    assert rows[2].last_seen == (START + timedelta(minutes=29)).replace(tzinfo=None)
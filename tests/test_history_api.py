@@ -0,0 +1,80 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.service import Service, ServiceState, ServiceStatus
+from app.services import export
+from app.services.export import EXPORT_COLUMNS, export_status_history
+from app.services.service import get_service_status_history
+
+
+def test_history_pages_follow_the_keyset_across_ties(db):
+    service = Service(name="Paged", url="https://paged.example.com", user_id=1)
+    db.add(service)
+    db.commit()
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    # Pairs of rows share a timestamp, so pages must break ties on id
+    db.add_all(
+        ServiceStatus(service_id=service.id, status=ServiceState.UP, checked_at=base + timedelta(minutes=n // 2))
+        for n in range(25)
+    )
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = get_service_status_history(service.id, db, cursor=cursor, limit=10)
+        seen.extend(page)
+        if cursor is None:
+            break
+    keys = [(status.checked_at, status.id) for status in seen]
+    assert len(seen) == 25
+    assert keys == sorted(keys, reverse=True)
+
+    window, cursor = get_service_status_history(
+        service.id, db, start=base + timedelta(minutes=2), end=base + timedelta(minutes=4), limit=10
+    )
+    assert len(window) == 4 and cursor is None
+    assert {status.checked_at for status in window} == {base + timedelta(minutes=2), base + timedelta(minutes=3)}
+
+    with pytest.raises(HTTPException) as error:
+        get_service_status_history(service.id, db, cursor="not-a-cursor")
+    assert error.value.status_code == 400
+
+
+def test_export_streams_ndjson_and_csv_in_chunks(async_db, monkeypatch):
+    base = datetime(2026, 3, 1, 12, 0, 0)
+
+    async def run():
+        async with async_db() as session_factory:
+            monkeypatch.setattr(export, "AsyncSessionLocal", session_factory)
+            async with session_factory() as db:
+                db.add(Service(id=1, name="export", url="https://export.example", user_id=1))
+                db.add_all(
+                    ServiceStatus(
+                        service_id=1,
+                        status=ServiceState.DOWN if n == 3 else ServiceState.UP,
+                        response_time=None if n == 3 else 10.0 + n,
+                        checked_at=base + timedelta(minutes=n),
+                    )
+                    for n in range(5)
+                )
+                await db.commit()
+            ndjson = [chunk async for chunk in export_status_history(1, None, None, "ndjson", chunk_size=2)]
+            csv_chunks = [chunk async for chunk in export_status_history(1, base, None, "csv", chunk_size=2)]
+            return ndjson, csv_chunks
+
+    ndjson, csv_chunks = asyncio.run(run())
+    assert len(ndjson) == 3  # 5 rows fetched two at a time
+    records = [json.loads(line) for chunk in ndjson for line in chunk.decode().splitlines()]
+    assert [record["response_time"] for record in records] == [10.0, 11.0, 12.0, None, 14.0]
+    assert records[3]["status"] == "DOWN"
+
+    rows = list(csv.reader(io.StringIO(b"".join(csv_chunks).decode())))
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert len(rows) == 6
+    assert rows[4][rows[0].index("response_time")] == ""
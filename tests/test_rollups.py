@@ -0,0 +1,106 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.service import ServiceRollup, ServiceState
+from app.services import writer
+from app.services.cleanup import compact_rollups
+from app.services.rollups import DAY, HOUR, MINUTE, plan_window, window_stats
+from app.services.sketch import DDSketch
+from app.services.writer import CheckResult
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(4, 1) for _ in range(20_000))
+    left, right = DDSketch(0.01), DDSketch(0.01)
+    for index, value in enumerate(values):
+        (left if index % 2 else right).add(value)
+    left.merge(DDSketch.from_bytes(right.to_bytes(), 0.01))
+
+    assert left.count == len(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(left.quantile(q) - exact) <= 0.01 * exact * 1.01
+
+
+def test_window_plan_uses_coarsest_buckets():
+    now = 100 * DAY
+    start = now - DAY - 90 * MINUTE - 30  # mid-minute, a day and 1.5 hours ago
+    assert plan_window(start, now, now) == [
+        (MINUTE, start - start % MINUTE, 99 * DAY - HOUR),
+        (HOUR, 99 * DAY - HOUR, 99 * DAY),
+        (DAY, 99 * DAY, 100 * DAY),
+    ]
+
+
+def test_window_plan_rounds_out_where_minutes_are_compacted():
+    now = 100 * DAY
+    start = now - 2 * DAY - 90 * MINUTE  # older than the 48h minute retention
+    assert plan_window(start, now, now) == [(HOUR, 98 * DAY - 2 * HOUR, 98 * DAY), (DAY, 98 * DAY, 100 * DAY)]
+
+
+def test_uptime_and_percentiles_from_written_rollups(monkeypatch, db):
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(writer, "AsyncWriteSessionLocal", session_factory)
+
+        # Two batches landing in the same buckets must merge, not overwrite
+        for batch in range(2):
+            await writer.store_results_batch(
+                [
+                    CheckResult(1, ServiceState.UP, float(ms), checked_at=now - timedelta(seconds=batch))
+                    for ms in range(1, 91)
+                ]
+                + [CheckResult(1, ServiceState.DOWN, None, checked_at=now - timedelta(minutes=90))] * 5
+                + [CheckResult(1, ServiceState.SLOW, 5000.0, checked_at=now)] * 5
+            )
+        async with session_factory() as session:
+            stats = await window_stats(1, now - timedelta(hours=3), now + timedelta(seconds=1), session)
+        await engine.dispose()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["checks"] == 200
+    assert stats["status_counts"] == {"UP": 180, "DOWN": 10, "SLOW": 10}
+    assert stats["uptime_percent"] == 95.0
+    assert stats["min_response_time_ms"] == 1.0 and stats["max_response_time_ms"] == 5000.0
+    assert abs(stats["p50_ms"] - 48) <= 1
+    assert abs(stats["p99_ms"] - 5000) <= 50
+
+
+def test_compaction_drops_buckets_past_retention(async_db):
+    now = 1000 * DAY
+    old_minute = ServiceRollup(
+        service_id=1,
+        resolution=MINUTE,
+        bucket_start=now - 3 * DAY,
+        status_counts={"UP": 1},
+        latency_sketch=DDSketch().to_bytes(),
+    )
+    old_hour = ServiceRollup(
+        service_id=1,
+        resolution=HOUR,
+        bucket_start=now - 3 * DAY,
+        status_counts={"UP": 1},
+        latency_sketch=DDSketch().to_bytes(),
+    )
+
+    async def run():
+        async with async_db() as session_factory, session_factory() as db:
+            db.add_all([old_minute, old_hour])
+            await db.commit()
+            deleted = await compact_rollups(now=now, db=db)
+            return deleted, await db.scalar(select(func.count()).select_from(ServiceRollup))
+
+    assert asyncio.run(run()) == (1, 1)
@@ -0,0 +1,108 @@
+import asyncio
+
+from app.models.service import Service, ServiceState
+from app.services import scheduler
+from app.services.checker import Probe
+from app.services.deadlines import DeadlineHeap
+from app.services.timing import NO_PHASES
+from app.services.writer import ResultWriter
+
+
+def test_deadlines_follow_interval_without_drift():
+    heap = DeadlineHeap()
+    heap.sync({1: ("https://a.example", 10.0)}, now=0.0)
+    first = heap.next_due()
+    assert 0.0 <= first < 10.0
+
+    # Dispatching late must not push later deadlines back
+    assert heap.pop_due(first + 3.0) == [1]
+    assert heap.next_due() == first + 10.0
+
+
+def test_deadlines_skip_missed_slots():
+    heap = DeadlineHeap()
+    heap.sync({1: ("https://a.example", 10.0)}, now=0.0)
+    first = heap.next_due()
+    assert heap.pop_due(first + 35.0) == [1]
+    assert heap.next_due() == first + 40.0
+
+
+def test_services_sharing_a_url_are_due_together():
+    heap = DeadlineHeap()
+    heap.sync(
+        {
+            1: ("https://shared.example", 30.0),
+            2: ("https://shared.example", 30.0),
+            3: ("https://other.example", 300.0),
+        },
+        now=0.0,
+    )
+    assert sorted(heap.pop_due(heap.next_due())) == [1, 2]
+
+
+def test_removed_services_are_not_dispatched():
+    heap = DeadlineHeap()
+    heap.sync({1: ("https://a.example", 10.0), 2: ("https://b.example", 10.0)}, now=0.0)
+    heap.sync({2: ("https://b.example", 10.0)}, now=0.0)
+    assert heap.pop_due(100.0) == [2]
+    assert len(heap) == 1
+
+
+def test_services_still_being_checked_skip_their_slot():
+    heap = DeadlineHeap()
+    services = {n: Service(id=n, url="https://slow.example", interval_seconds=30) for n in (1, 2)}
+    heap.sync({s.id: (s.url, 30.0) for s in services.values()}, now=0.0)
+    first = heap.next_due()
+    assert [s.id for s in scheduler.take_due_services(heap, services, {1}, first)] == [2]
+    # The skipped slot is not queued up; the service is due again on its next one
+    assert scheduler.take_due_services(heap, services, set(), first + 15.0) == []
+    assert sorted(s.id for s in scheduler.take_due_services(heap, services, set(), first + 30.0)) == [1, 2]
+
+
+def test_shared_url_is_fetched_once_and_judged_per_keyword(monkeypatch):
+    probes = []
+
+    async def fake_probe(url, keywords=frozenset(), **kwargs):
+        probes.append((url, keywords))
+        return Probe(200, 50.0, frozenset({"Welcome"}) & keywords, NO_PHASES)
+
+    monkeypatch.setattr(scheduler, "probe_url", fake_probe)
+    result_writer = ResultWriter()
+    monkeypatch.setattr(scheduler, "result_writer", result_writer)
+
+    services = [
+        Service(id=1, url="https://popular.example", keyword="Welcome", retries=3),
+        Service(id=2, url="https://popular.example", keyword="Checkout", retries=3),
+        Service(id=3, url="https://popular.example", keyword=None, retries=3),
+    ]
+    asyncio.run(scheduler.check_due_services(services))
+
+    assert probes == [("https://popular.example", frozenset({"Welcome", "Checkout"}))]
+    results = {}
+    while result_writer.pending:
+        result = result_writer._queue.get_nowait()
+        results[result.service_id] = result.status
+    assert results == {1: ServiceState.UP, 2: ServiceState.INVALID_CONTENT, 3: ServiceState.UP}
+
+
+def test_failed_refresh_keeps_the_schedule(monkeypatch):
+    service = Service(id=1, url="https://a.example", interval_seconds=10, retries=3)
+    fetches = iter([{1: service}, None])
+
+    async def fake_fetch():
+        return next(fetches)
+
+    async def no_pool(origins):
+        pass
+
+    monkeypatch.setattr(scheduler, "_fetch_active_services", fake_fetch)
+    monkeypatch.setattr(scheduler, "configure_pool", no_pool)
+
+    async def run():
+        heap = DeadlineHeap()
+        services = await scheduler.refresh_services({}, heap, now=0.0)
+        # Database down: the known services stay scheduled
+        services = await scheduler.refresh_services(services, heap, now=5.0)
+        return services, heap.pop_due(100.0)
+
+    assert asyncio.run(run()) == ({1: service}, [1])
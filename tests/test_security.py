@@ -1,14 +1,23 @@
 # tests/test_security.py
+import asyncio
+import time
 from datetime import timedelta
 
+from fastapi import HTTPException
 from jose import jwt
+from passlib.context import CryptContext
+from sqlalchemy import select
 
+from app.core import security
 from app.core.config import settings
 from app.core.security import (
+    PasswordPool,
     create_access_token,
     get_password_hash,
     verify_password,
 )
+from app.models.user import User
+from app.services import auth
 
 
 def test_password_hash_and_verify():
@@ -26,3 +35,37 @@ def test_create_access_token_contains_exp_and_sub():
     )
     assert "exp" in decoded
     assert decoded["sub"] == "user123"
+
+
+def test_password_pool_rejects_when_saturated():
+    async def run():
+        pool = PasswordPool(workers=0, max_pending=1)
+        results = await asyncio.gather(pool._run(time.sleep, 0.05), pool._run(time.sleep, 0.05), return_exceptions=True)
+        return results, pool.snapshot()
+
+    (first, second), stats = asyncio.run(run())
+    assert first is None
+    assert isinstance(second, HTTPException) and second.status_code == 429
+    assert second.headers["Retry-After"] == "1"
+    assert stats["rejected"] == 1 and stats["pending"] == 0
+
+
+def test_login_rehashes_password_when_cost_changes(async_db, monkeypatch):
+    old_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+    monkeypatch.setattr(auth, "password_pool", PasswordPool(workers=0, max_pending=4))
+
+    async def run():
+        async with async_db() as session_factory:
+            monkeypatch.setattr(auth, "AsyncWriteSessionLocal", session_factory)
+            async with session_factory() as db:
+                db.add(User(username="old", email="old@example.com", hashed_password=old_context.hash("secret")))
+                await db.commit()
+            async with session_factory() as db:
+                await auth.authenticate_user("old", "secret", db)
+            async with session_factory() as db:
+                return (await db.scalar(select(User).where(User.username == "old"))).hashed_password
+
+    stored = asyncio.run(run())
+    assert stored.startswith("$2b$05$")
+    assert verify_password("secret", stored)
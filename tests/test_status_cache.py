@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.main import app
+from app.models.service import Service, ServiceState
+from app.routers import dashboard
+from app.services import writer
+from app.services.status_cache import ResponseCache, if_none_match
+from app.services.writer import CheckResult
+
+
+def test_concurrent_misses_share_one_rebuild():
+    builds = []
+
+    async def build() -> bytes:
+        builds.append(1)
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    async def run():
+        cache = ResponseCache()
+        first = await asyncio.gather(*(cache.get("api", build) for _ in range(20)))
+        again = await cache.get("api", build)
+        cache.bump()
+        after_bump = await cache.get("api", build)
+        return first, again, after_bump, cache.stats
+
+    first, again, after_bump, stats = asyncio.run(run())
+    assert len(builds) == 2
+    assert len({entry.etag for entry in first}) == 1 and again == first[0]
+    assert after_bump.generation == 1 and after_bump.etag == again.etag  # same body, same validator
+    assert (stats["rebuilds"], stats["coalesced"], stats["hits"]) == (2, 19, 1)
+
+
+def test_if_none_match_parsing():
+    assert if_none_match('"a", W/"b"', '"b"')
+    assert if_none_match("*", '"a"')
+    assert not if_none_match('"a"', '"b"') and not if_none_match(None, '"a"')
+
+
+def test_status_endpoints_revalidate_until_results_change(async_db, monkeypatch):
+    checked_at = datetime(2026, 6, 1, 9, 0, 0)
+
+    async def run():
+        async with async_db() as session_factory:
+            cache = ResponseCache()
+            monkeypatch.setattr(dashboard, "AsyncSessionLocal", session_factory)
+            monkeypatch.setattr(dashboard, "status_cache", cache)
+            monkeypatch.setattr(writer, "AsyncWriteSessionLocal", session_factory)
+            monkeypatch.setattr(writer, "status_cache", cache)
+            async with session_factory() as db:
+                db.add(Service(id=1, name="api", url="https://api.example", user_id=1))
+                await db.commit()
+            await writer.store_results_batch([CheckResult(1, ServiceState.UP, 10.0, checked_at=checked_at)])
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                fresh = await client.get("/status/api")
+                etag = fresh.headers["etag"]
+                unchanged = await client.get("/status/api", headers={"If-None-Match": etag})
+                page = await client.get("/status/dashboard")
+                await writer.store_results_batch(
+                    [CheckResult(1, ServiceState.DOWN, None, checked_at=checked_at + timedelta(minutes=1))]
+                )
+                changed = await client.get("/status/api", headers={"If-None-Match": etag})
+            return fresh, unchanged, page, changed, cache.stats
+
+    fresh, unchanged, page, changed, stats = asyncio.run(run())
+    assert fresh.status_code == 200 and fresh.json()[0]["status"] == "UP"
+    assert fresh.headers["cache-control"] == "no-cache"
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    assert unchanged.headers["etag"] == fresh.headers["etag"]
+    assert page.status_code == 200 and "text/html" in page.headers["content-type"] and "api" in page.text
+    assert changed.status_code == 200 and changed.json()[0]["status"] == "DOWN"
+    assert changed.headers["etag"] != fresh.headers["etag"]
+    assert stats["rebuilds"] == 3 and stats["hits"] == 1
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token
+from app.core.user_cache import CurrentUser, UserCache, user_cache
+from app.models.user import User
+
+
+class NoQuerySession:
+    def query(self, *args):
+        raise AssertionError("cache hit must not query")
+
+
+def test_current_user_is_cached_until_the_user_changes(db):
+    user_cache.clear()
+    user = User(username="cached", email="cached@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": user.email})
+
+    first = get_current_user(token, db)
+    assert first == CurrentUser(user.id, "cached", "cached@example.com", True, False)
+    assert get_current_user(token, NoQuerySession()) is first
+
+    # A flush is not a commit: another request may still read the old row
+    user.is_admin = True
+    db.flush()
+    assert get_current_user(token, NoQuerySession()) is first
+    db.commit()
+    promoted = get_current_user(token, db)
+    assert promoted.is_admin
+    assert user_cache.stats["invalidations"] == 1
+
+    # Rolled back changes leave the cache alone
+    user.username = "renamed"
+    db.flush()
+    db.rollback()
+    assert user_cache.stats["invalidations"] == 1
+
+    db.delete(user)
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        get_current_user(token, db)
+    assert error.value.status_code == 401
+
+
+def test_user_cache_evicts_lru_and_expires():
+    now = [0.0]
+    cache = UserCache(maxsize=2, ttl=60, clock=lambda: now[0])
+    users = {name: CurrentUser(n, name, f"{name}@example.com", True, False) for n, name in enumerate("abc")}
+
+    cache.put("ta", users["a"], 3600, cache.generation)
+    cache.put("tb", users["b"], 10, cache.generation)  # the token expires before the ttl
+    assert cache.get("ta") is users["a"]  # "tb" is now least recently used
+    cache.put("tc", users["c"], 3600, cache.generation)
+    assert cache.get("tb") is None and cache.stats["evictions"] == 1
+
+    now[0] = 61
+    assert cache.get("ta") is None and cache.stats["expired"] == 1
+
+    # A lookup that started before an invalidation must not cache what it read
+    generation = cache.generation
+    cache.invalidate("c@example.com")
+    assert cache.get("tc") is None
+    cache.put("tc", users["c"], 3600, generation)
+    assert cache.get("tc") is None
+    assert cache.snapshot()["hit_rate"] == round(1 / 5, 4)
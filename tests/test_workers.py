@@ -0,0 +1,113 @@
+import asyncio
+import queue
+
+from app.services import checker, workers
+from app.services.checker import Probe
+from app.services.timing import NO_PHASES
+
+
+def test_worker_configures_its_shard_and_reports_counters(monkeypatch):
+    configured = []
+
+    async def fake_probe(url, keywords=frozenset(), retries=3, delay=0.5, timeout=None):
+        checker.stats["requests"] += 1
+        checker.stats["retries"] += 1
+        return Probe(200, 12.0, frozenset(keywords), NO_PHASES)
+
+    async def fake_configure(origins):
+        configured.append(origins)
+
+    monkeypatch.setattr(checker, "probe_url", fake_probe)
+    monkeypatch.setattr(checker, "configure_pool", fake_configure)
+    monkeypatch.setattr(checker, "close_clients", lambda: asyncio.sleep(0))
+    monkeypatch.setattr(checker, "stats", checker.Counter())
+    monkeypatch.setattr(checker, "semaphore", checker.semaphore)
+
+    pool = workers.CheckerPool(2)
+    pool._jobs = [queue.Queue(), queue.Queue()]
+    origins = {"https://a.example", "https://a.example:8443", "http://b.example", "https://c.example"}
+    pool.configure_pool(origins)
+    shards = [pool._jobs[index].get() for index in range(2)]
+    # Every origin of a host lands in the same worker, the one its URLs are sent to
+    assert set().union(*shards) == origins
+    assert {"https://a.example", "https://a.example:8443"} <= shards[workers._shard("https://a.example/x", 2)]
+
+    jobs, results = queue.Queue(), queue.Queue()
+    for message in (shards[0], (7, "https://a.example/x", ("OK",), 3, 0.5, None), None):
+        jobs.put(message)
+    asyncio.run(workers._worker_loop(1, jobs, results, 4))
+    messages = [results.get() for _ in range(results.qsize())]
+    assert configured == [shards[0]]
+    assert messages[0] == (7, 200, 12.0, ("OK",), NO_PHASES)
+    assert messages[-1][:2] == (None, 1)
+    assert checker.semaphore._value == 4
+
+    # The parent adds each worker's latest counters to its own
+    async def resolve():
+        future = asyncio.get_running_loop().create_future()
+        pool._pending[7] = 0, future
+        pool._worker_ids = [0, 1]
+        pool._resolve(messages)
+        return await future
+
+    assert asyncio.run(resolve()) == Probe(200, 12.0, frozenset({"OK"}), NO_PHASES)
+    checker.stats["requests"] += 1
+    merged = checker.checker_stats(pool.worker_counters)
+    assert (merged["requests"], merged["retries"], merged["retry_amplification"]) == (3, 2, round(5 / 3, 4))
+
+
+class FakeQueue(queue.Queue):
+    def cancel_join_thread(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeProcess:
+    def __init__(self, target=None, args=(), name=None, daemon=None):
+        self.args, self.name, self.exitcode = args, name, None
+        self.alive = True
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return self.alive
+
+
+def test_dead_worker_fails_its_probes_and_is_replaced(monkeypatch):
+    monkeypatch.setattr(workers.settings, "poll_concurrency", 5)
+    monkeypatch.setattr(workers, "WATCH_INTERVAL_SECONDS", 0.01)
+
+    async def run():
+        pool = workers.CheckerPool(2)
+        monkeypatch.setattr(pool._context, "Process", FakeProcess)
+        monkeypatch.setattr(pool._context, "Queue", FakeQueue)
+        monkeypatch.setattr(pool, "_read_results", lambda loop, index, results: None)
+        pool.start()
+        # poll_concurrency is shared out between the workers, not given to each
+        assert [process.args[3] for process in pool._processes] == [3, 2]
+        pool.configure_pool({"https://a.example"})
+
+        index = workers._shard("https://a.example/x", 2)
+        probe = asyncio.create_task(pool.probe_url("https://a.example/x"))
+        await asyncio.sleep(0)
+        pool._counters[pool._worker_ids[index]] = checker.counters() | {"stats": {"requests": 9}}
+        dead = pool._processes[index]
+        dead.alive, dead.exitcode = False, -9
+
+        try:
+            await asyncio.wait_for(probe, 1)
+        except RuntimeError as error:
+            assert "exited with code -9" in str(error)
+        else:
+            raise AssertionError("the probe should fail with its worker")
+        assert pool.restarts == 1 and pool.in_flight == 0
+        assert pool._processes[index] is not dead and pool._processes[index].args[3] == dead.args[3]
+        # The replacement is sent its shard again, and the dead worker's counts are kept
+        assert pool._jobs[index].get_nowait() == {"https://a.example"}
+        assert sum(part["stats"].get("requests", 0) for part in pool.worker_counters) == 9
+        pool._watcher.cancel()
+
+    asyncio.run(run())
@@ -0,0 +1,219 @@
+import asyncio
+import json
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.service import Service, ServiceState, ServiceStatus
+from app.models.user import User
+from app.services import scheduler, writer
+from app.services.checker import Probe
+from app.services.journal import ResultJournal
+from app.services.timing import NO_PHASES
+from app.services.writer import CheckResult, ResultWriter
+
+
+def test_writer_flushes_in_micro_batches(monkeypatch):
+    flushed = []
+
+    async def fake_store(results):
+        flushed.append(list(results))
+
+    monkeypatch.setattr(writer, "store_results_batch", fake_store)
+
+    async def run():
+        result_writer = ResultWriter(maxsize=100, batch_size=3, flush_interval=0.05)
+        task = asyncio.create_task(result_writer.run())
+        for service_id in range(7):
+            await result_writer.put(CheckResult(service_id, ServiceState.UP, 10.0))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert [len(batch) for batch in flushed] == [3, 3, 1]
+
+
+def test_partial_results_survive_batch_timeout(monkeypatch):
+    async def fake_probe(url, **kwargs):
+        if "slow" in url:
+            await asyncio.sleep(10)
+        return Probe(200, 12.0, frozenset(), NO_PHASES)
+
+    monkeypatch.setattr(scheduler, "probe_url", fake_probe)
+    monkeypatch.setattr(scheduler.settings, "poll_timeout_seconds", 0.1)
+    result_writer = ResultWriter()
+    monkeypatch.setattr(scheduler, "result_writer", result_writer)
+
+    services = [
+        Service(id=1, url="https://fast.example", retries=3),
+        Service(id=2, url="https://fast.example", retries=3),
+        Service(id=3, url="https://slow.example", retries=3),
+    ]
+    counter = asyncio.run(scheduler.check_due_services(services))
+
+    results = {}
+    while result_writer.pending:
+        result = result_writer._queue.get_nowait()
+        results[result.service_id] = result.status
+    assert results == {1: ServiceState.UP, 2: ServiceState.UP, 3: ServiceState.UNREACHABLE}
+    assert counter == {ServiceState.UP: 2, ServiceState.UNREACHABLE: 1}
+
+
+def test_store_results_batch_bulk_inserts_rows(monkeypatch):
+    checked_at = datetime(2026, 1, 1, 12, 0, 0)
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        monkeypatch.setattr(writer, "AsyncWriteSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+
+        await writer.store_results_batch(
+            [
+                CheckResult(1, ServiceState.UP, 12.5, (1.0, 2.0, None, 8.0, 1.5), checked_at),
+                CheckResult(2, ServiceState.DOWN, None, NO_PHASES, checked_at),
+                CheckResult(3, ServiceState.UP, 9.0),
+            ]
+        )
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(ServiceStatus).order_by(ServiceStatus.service_id))).all()
+        await engine.dispose()
+        return rows
+
+    rows = asyncio.run(run())
+    assert [(row.service_id, row.status, row.checked_at == checked_at) for row in rows] == [
+        (1, ServiceState.UP, True),
+        (2, ServiceState.DOWN, True),
+        (3, ServiceState.UP, False),
+    ]
+    assert (rows[0].dns_ms, rows[0].tls_ms, rows[0].ttfb_ms) == (1.0, None, 8.0)
+
+
+def test_journal_resumes_from_offset_and_drops_torn_tail(tmp_path):
+    path = tmp_path / "results.ndjson"
+
+    async def run():
+        journal = ResultJournal(path, fsync_interval=0, max_bytes=1 << 20)
+        await journal.open()
+        for batch in ([[1], [2]], [[3]], [[4], [5]]):
+            await journal.append(batch)
+        records, offset = await journal.read(2)
+        await journal.consume(offset, len(records), 0.1)
+        await journal.close()
+        with open(path, "ab") as raw:
+            raw.write(b"[[6],[7")  # crashed mid-append
+
+        reopened = ResultJournal(path, fsync_interval=0, max_bytes=1 << 20)
+        await reopened.open()
+        pending = reopened.pending
+        records, offset = await reopened.read(100)
+        await reopened.consume(offset, len(records), 0.1)
+        return pending, records, reopened.backlog, path.stat().st_size
+
+    assert asyncio.run(run()) == (3, [[3], [4], [5]], False, 0)
+
+
+def test_writer_journals_during_outage_and_replays_in_order(monkeypatch, tmp_path):
+    stored = []
+    database_up = False
+
+    async def flaky_store(results):
+        if not database_up:
+            raise ConnectionError("database unavailable")
+        stored.extend(result.service_id for result in results)
+
+    monkeypatch.setattr(writer, "store_results_batch", flaky_store)
+
+    async def run():
+        nonlocal database_up
+        journal = ResultJournal(tmp_path / "results.ndjson", fsync_interval=0, max_bytes=1 << 20)
+        result_writer = ResultWriter(batch_size=2, flush_interval=0.01, journal=journal, retry_interval=0.02)
+        task = asyncio.create_task(result_writer.run())
+        for service_id in range(4):
+            await result_writer.put(CheckResult(service_id, ServiceState.UP, 10.0))
+        await asyncio.sleep(0.1)
+        # Once a backlog exists, later results queue behind it instead of trying the database
+        await result_writer.put(CheckResult(4, ServiceState.UP, 10.0))
+        await asyncio.sleep(0.05)
+        pending_during_outage = journal.pending
+
+        database_up = True
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return pending_during_outage, result_writer.journal_stats()
+
+    pending_during_outage, stats = asyncio.run(run())
+    assert pending_during_outage == 5
+    assert stored == [0, 1, 2, 3, 4]
+    assert (stats["pending_results"], stats["appended"], stats["replayed"]) == (0, 5, 5)
+
+
+def test_replay_sets_aside_results_of_deleted_services(monkeypatch, tmp_path):
+    checked_at = datetime(2026, 1, 1, 12, 0, 0)
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        event.listen(engine.sync_engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(writer, "AsyncWriteSessionLocal", session_factory)
+        async with session_factory() as db:
+            db.add(
+                Service(
+                    id=1,
+                    name="kept",
+                    url="https://kept.example",
+                    owner=User(username="u", email="u@x.org", hashed_password="x"),
+                )
+            )
+            await db.commit()
+
+        journal = ResultJournal(tmp_path / "results.ndjson", fsync_interval=0, max_bytes=1 << 20)
+        await journal.open()
+        # Service 2 was deleted while its results sat in the journal
+        await journal.append(
+            [
+                writer.to_record(CheckResult(service_id, ServiceState.UP, 10.0, NO_PHASES, checked_at))
+                for service_id in (1, 2, 1)
+            ]
+        )
+        result_writer = ResultWriter(journal=journal, retry_interval=0.01)
+        await asyncio.wait_for(result_writer._replay_journal(), 5)
+        async with session_factory() as db:
+            stored = [status.service_id for status in await db.scalars(select(ServiceStatus))]
+        await engine.dispose()
+        return stored, journal.backlog, result_writer.journal_stats(), journal.rejected_path.read_text()
+
+    stored, backlog, stats, rejected = asyncio.run(run())
+    assert stored == [1, 1] and not backlog
+    assert (stats["replayed"], stats["rejected"], stats["pending_results"]) == (2, 1, 0)
+    assert [record[0] for record in map(json.loads, rejected.splitlines())] == [2]
+
+
+def test_batch_writes_keep_queue_order_and_report_commit(monkeypatch):
+    flushed = []
+
+    async def fake_store(results):
+        flushed.append([result.service_id for result in results])
+
+    monkeypatch.setattr(writer, "store_results_batch", fake_store)
+
+    async def run():
+        result_writer = ResultWriter(batch_size=10, flush_interval=0.05)
+        task = asyncio.create_task(result_writer.run())
+        for service_id in range(3):
+            await result_writer.put(CheckResult(service_id, ServiceState.UP, 10.0))
+        committed = await result_writer.write([CheckResult(n, ServiceState.UP, 10.0) for n in (7, 8, 9)])
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return committed
+
+    assert asyncio.run(run()) is True
+    # The micro-batch in progress is cut at the batch write, which gets its own transaction
+    assert flushed == [[0, 1, 2], [7, 8, 9]]